@@ -23,23 +23,86 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     debug: bool = False
     environment: str = "development"
+    warm_start: bool = True  # Bind the port first, load models and index in the background
+    preload_models: bool = True  # gunicorn: load model/index once in the master before forking
     
     # Groq Settings (cloud LLM - fast & free tier)
     groq_api_key: str = ""  # Set via GROQ_API_KEY environment variable
     groq_model: str = "llama-3.1-8b-instant"
+    groq_base_url: str = ""  # Other OpenAI-compatible endpoint, e.g. scripts/fake_llm.py (empty = Groq)
     
     # Embeddings (using local sentence-transformers)
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"  # "torch" or "onnx" (int8, see scripts/export_onnx.py)
+    onnx_threads: int = 0  # onnxruntime intra-op threads (0 = default)
+    embedding_executor: str = "thread"  # "thread" or "process"
+    embedding_workers: int = 2  # Max concurrent encode calls
+    embedding_batch_window_ms: float = 5.0  # How long to wait for more queries
+    embedding_max_batch_size: int = 32  # Max queries per encode call
+    embedding_cache_size: int = 2048  # Cached query vectors (0 disables)
+    embedding_cache_ttl: int = 3600  # Seconds (0 = no expiry)
     
     # LLM Parameters
     llm_temperature: float = 0.1
     llm_max_tokens: int = 500
+    llm_max_concurrency: int = 32  # In-flight LLM calls per worker
+    llm_max_connections: int = 32  # Pooled keep-alive connections to Groq
+    llm_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    llm_connect_timeout: float = 5.0  # Seconds (also for waiting on the pool)
+    llm_read_timeout: float = 30.0  # Seconds between bytes of a response
+    llm_max_retries: int = 1  # Retries on connection errors and 429/5xx
     
     # RAG Settings
     chunk_size: int = 1000
     chunk_overlap: int = 200
     top_k_results: int = 5
+    retrieval_other_top_k: int = 2  # Extra results from other intents' buckets
     similarity_threshold: float = 0.15
+    chunk_store_verify_checksum: bool = True  # Verify chunks.bin on load
+    processed_data_dir: str = ""  # Vector store and response cache location (empty = backend/data/processed)
+    
+    # Prompt Assembly (context token budgets per intent, 0 = unlimited)
+    prompt_tokenizer: str = "cl100k_base"  # tiktoken encoding used to count tokens
+    context_token_budget_support: int = 1500
+    context_token_budget_sales: int = 1000
+    context_token_budget_internal: int = 2000
+    
+    # Intent Classification
+    intent_classifier: str = "prototype"  # "prototype" (query vector vs bucket centroids) or "keyword"
+    intent_prototypes_per_bucket: int = 1  # >1 clusters each bucket into several prototypes
+    intent_min_margin: float = 0.02  # Min similarity lead over other intents, else support
+    
+    # Hybrid Search (BM25 fused with dense results)
+    hybrid_search_enabled: bool = True
+    hybrid_candidates: int = 20  # Candidates per ranking before fusion
+    rrf_k: int = 60  # Reciprocal-rank fusion constant
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    
+    # Reranking (cross-encoder over the retrieved candidates)
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_candidates: int = 10  # Candidates retrieved for reranking
+    rerank_top_n: int = 3  # Chunks kept after reranking
+    rerank_budget_ms: float = 150.0  # Skip reranking past this budget
+    rerank_cache_size: int = 4096  # Cached (query, chunk) scores
+    
+    # Vector Index ("flat", "hnsw" or "ivfpq")
+    index_type: str = "flat"
+    index_mmap: bool = True  # Serve the index memory-mapped (shared across workers)
+    hnsw_m: int = 32  # Graph degree
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64  # Higher = better recall, slower queries
+    ivf_nlist: int = 0  # Inverted lists (0 = 4 * sqrt(num_chunks))
+    ivf_nprobe: int = 8  # Lists scanned per query
+    pq_m: int = 16  # PQ sub-quantizers (must divide the embedding dimension)
+    pq_nbits: int = 8
+    
+    # Semantic Response Cache (skips the LLM for near-duplicate questions)
+    response_cache_enabled: bool = True
+    response_cache_threshold: float = 0.93  # Min cosine similarity for a hit
+    response_cache_max_entries: int = 5000
+    response_cache_ttl: int = 86400  # Seconds (0 = no expiry)
     
     # Rate Limiting
     rate_limit_requests: int = 100
@@ -48,6 +111,13 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: list = ["*"]
     
+    # Admin / Hot Reload
+    admin_token: str = ""  # Enables /api/admin endpoints when set
+    reload_watch_interval: float = 0.0  # Seconds between change checks (0 = off)
+    
+    # Monitoring
+    metrics_enabled: bool = True  # Serve Prometheus metrics at /metrics
+    
     # Google Sheets (Lead Capture)
     google_sheets_enabled: bool = False
     google_sheets_id: Optional[str] = None
@@ -71,10 +141,27 @@ class Settings(BaseSettings):
         """Get absolute path to prompts directory."""
         return PROJECT_ROOT / ".claude"
     
+    @property
+    def processed_dir_path(self) -> Path:
+        """Get absolute path to the directory of built data (index, caches)."""
+        if self.processed_data_dir:
+            return Path(self.processed_data_dir).resolve()
+        return BACKEND_DIR / "data" / "processed"
+    
     @property
     def vector_store_dir(self) -> Path:
         """Get absolute path to vector store directory."""
-        return BACKEND_DIR / "data" / "processed" / "faiss_index"
+        return self.processed_dir_path / "faiss_index"
+    
+    @property
+    def onnx_model_dir(self) -> Path:
+        """Get absolute path to the exported ONNX embedding model."""
+        return BACKEND_DIR / "data" / "models" / f"{self.embedding_model.split('/')[-1]}-onnx"
+    
+    @property
+    def response_cache_dir(self) -> Path:
+        """Get absolute path to the persisted response cache."""
+        return self.processed_dir_path / "response_cache"
     
     class Config:
         env_file = ".env"
@@ -1,7 +1,16 @@
 """
 Project Dwight - Core Package
-"""
 
-from . import intent_classifier, rag_engine, llm_client, guardrails, embeddings
+Submodules are imported on use (``from core import rag_engine``) rather than
+here, so importing one of them does not load the whole stack.
+"""
 
-__all__ = ["intent_classifier", "rag_engine", "llm_client", "guardrails", "embeddings"]
+__all__ = [
+    "intent_classifier",
+    "rag_engine",
+    "llm_client",
+    "guardrails",
+    "embeddings",
+    "reranker",
+    "warmup",
+]
@@ -0,0 +1,244 @@
+"""
+Project Dwight - Chunk Store
+Versioned, memory-mapped columnar storage for chunk text and metadata.
+
+Layout of chunks.bin (little endian):
+
+    magic      8 bytes   b"DWCHUNKS"
+    version    uint32    FORMAT_VERSION
+    header_len uint32    length of the JSON header in bytes
+    header     JSON      counts, column table, category values, checksum
+    padding    to a 64-byte boundary
+    data       columns, each starting on a 64-byte boundary
+
+Columns (one row per chunk, rows sorted by chunk id):
+
+    ids          int64   FAISS id of the chunk
+    text_offsets int64   n + 1 offsets into the text blob
+    source       int32   code into categories["source"]
+    bucket       int16   code into categories["bucket"]
+    intent       int16   code into categories["intent"]
+    chunk_index  int32   position of the chunk within its file
+    text         uint8   UTF-8 text of all chunks, back to back
+
+The file is opened with a read-only memory map, so loading only parses the
+header and every lookup slices the mapped bytes directly. The checksum is a
+SHA-256 over the data section. Writes go to a temp file that is renamed into
+place, so readers never see a half-written store.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"DWCHUNKS"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+CHUNKS_FILE = "chunks.bin"
+
+_PREAMBLE = struct.Struct("<8sII")
+
+# Column name -> dtype, in on-disk order
+_COLUMNS = {
+    "ids": "<i8",
+    "text_offsets": "<i8",
+    "source": "<i4",
+    "bucket": "<i2",
+    "intent": "<i2",
+    "chunk_index": "<i4",
+    "text": "u1",
+}
+
+CATEGORICAL_COLUMNS = ("source", "bucket", "intent")
+
+
+class ChunkStoreError(Exception):
+    """Raised when a chunk store file is missing, corrupt or unsupported."""
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class ChunkStore:
+    """Read-only view over a memory-mapped chunks.bin file."""
+
+    def __init__(self, path: Path, buffer: np.ndarray, header: Dict[str, Any], data_start: int):
+        self.path = path
+        self.checksum: str = header["checksum"]
+        self.categories: Dict[str, List[str]] = header["categories"]
+        self._buffer = buffer
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, spec in header["columns"].items():
+            start = data_start + spec["offset"]
+            dtype = np.dtype(spec["dtype"])
+            self._columns[name] = np.frombuffer(
+                buffer, dtype=dtype, count=spec["length"], offset=start
+            )
+
+    @classmethod
+    def open(cls, path: Path, verify: bool = True) -> "ChunkStore":
+        """
+        Memory-map a chunk store.
+        
+        Args:
+            path: Path to chunks.bin
+            verify: Recompute the checksum over the data section
+        
+        Returns:
+            ChunkStore backed by the mapped file
+        """
+        path = Path(path)
+        if not path.exists():
+            raise ChunkStoreError(f"Chunk store not found: {path}")
+
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(buffer) < _PREAMBLE.size:
+            raise ChunkStoreError("Chunk store is truncated")
+
+        magic, version, header_len = _PREAMBLE.unpack(buffer[:_PREAMBLE.size].tobytes())
+        if magic != MAGIC:
+            raise ChunkStoreError("Not a chunk store file")
+        if version != FORMAT_VERSION:
+            raise ChunkStoreError(f"Unsupported chunk store version {version}")
+
+        header_end = _PREAMBLE.size + header_len
+        header = json.loads(buffer[_PREAMBLE.size:header_end].tobytes().decode("utf-8"))
+        data_start = _align(header_end)
+
+        if len(buffer) != data_start + header["data_length"]:
+            raise ChunkStoreError("Chunk store size does not match its header")
+        if verify:
+            actual = hashlib.sha256(buffer[data_start:]).hexdigest()
+            if actual != header["checksum"]:
+                raise ChunkStoreError("Chunk store checksum mismatch")
+
+        return cls(path, buffer, header, data_start)
+
+    @staticmethod
+    def write(path: Path, documents: Iterable[Dict[str, Any]]) -> str:
+        """
+        Write documents to a new chunk store atomically.
+        
+        Args:
+            path: Destination path (replaced via temp file + rename)
+            documents: Chunk dicts with id, content, source, bucket, intent, chunk_index
+        
+        Returns:
+            Checksum of the written data section
+        """
+        path = Path(path)
+        documents = sorted(documents, key=lambda doc: doc["id"])
+
+        categories: Dict[str, List[str]] = {}
+        codes: Dict[str, np.ndarray] = {}
+        for name in CATEGORICAL_COLUMNS:
+            values = sorted({doc[name] for doc in documents})
+            lookup = {value: code for code, value in enumerate(values)}
+            categories[name] = values
+            codes[name] = np.array([lookup[doc[name]] for doc in documents], dtype=_COLUMNS[name])
+
+        encoded = [doc["content"].encode("utf-8") for doc in documents]
+        offsets = np.zeros(len(encoded) + 1, dtype=_COLUMNS["text_offsets"])
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        arrays = {
+            "ids": np.array([doc["id"] for doc in documents], dtype=_COLUMNS["ids"]),
+            "text_offsets": offsets,
+            **codes,
+            "chunk_index": np.array([doc["chunk_index"] for doc in documents], dtype=_COLUMNS["chunk_index"]),
+            "text": np.frombuffer(b"".join(encoded), dtype=_COLUMNS["text"]),
+        }
+        if len(np.unique(arrays["ids"])) != len(documents):
+            raise ChunkStoreError("Duplicate chunk ids")
+
+        # Lay out the data section with aligned columns
+        columns = {}
+        data = bytearray()
+        for name, dtype in _COLUMNS.items():
+            data.extend(b"\0" * (_align(len(data)) - len(data)))
+            columns[name] = {"dtype": dtype, "offset": len(data), "length": len(arrays[name])}
+            data.extend(arrays[name].tobytes())
+
+        checksum = hashlib.sha256(data).hexdigest()
+        header = json.dumps({
+            "count": len(documents),
+            "columns": columns,
+            "categories": categories,
+            "data_length": len(data),
+            "checksum": checksum,
+        }).encode("utf-8")
+
+        preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header))
+        header_end = len(preamble) + len(header)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(preamble)
+            f.write(header)
+            f.write(b"\0" * (_align(header_end) - header_end))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return checksum
+
+    def __len__(self) -> int:
+        return len(self._columns["ids"])
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Chunk ids in row order (ascending)."""
+        return self._columns["ids"]
+
+    def codes(self, name: str) -> np.ndarray:
+        """Category codes of a categorical column, one per row."""
+        return self._columns[name]
+
+    def code_for(self, name: str, value: str) -> Optional[int]:
+        """Code of a category value, or None if no chunk has it."""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return None
+
+    def rows_for_ids(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Map FAISS ids to row numbers (vectorized).
+        
+        Returns:
+            Array of rows, with -1 where the id is unknown (or FAISS padding)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        store_ids = self.ids
+        if len(store_ids) == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        rows = np.searchsorted(store_ids, ids)
+        rows = np.minimum(rows, len(store_ids) - 1)
+        return np.where(store_ids[rows] == ids, rows, -1)
+
+    def text(self, row: int) -> str:
+        """Decode the text of one row straight from the mapped blob."""
+        offsets = self._columns["text_offsets"]
+        blob = self._columns["text"]
+        return blob[offsets[row]:offsets[row + 1]].tobytes().decode("utf-8")
+
+    def category(self, name: str, row: int) -> str:
+        """Value of a categorical column for one row."""
+        return self.categories[name][self._columns[name][row]]
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """Materialize one row as a chunk dict."""
+        return {
+            "id": int(self._columns["ids"][row]),
+            "content": self.text(row),
+            "source": self.category("source", row),
+            "bucket": self.category("bucket", row),
+            "intent": self.category("intent", row),
+            "chunk_index": int(self._columns["chunk_index"][row]),
+        }
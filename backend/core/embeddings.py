@@ -1,48 +1,325 @@
 """
 Project Dwight - Embeddings Module
 Handles text embedding generation using sentence-transformers (local, no API needed).
+
+Two backends are available (EMBEDDING_BACKEND): "torch" runs the model with
+sentence-transformers, "onnx" runs an exported int8-quantized copy with
+onnxruntime and never imports torch (see core/onnx_embeddings.py).
+
+Encoding is CPU-bound, so it runs on a bounded executor (threads or processes)
+instead of the event loop. This keeps the server responsive while a forward
+pass is in progress. Concurrent single-query requests are coalesced into one
+batched encode call by a small micro-batching queue, and repeated questions
+are served from an LRU/TTL cache without touching the model at all.
 """
 
-from typing import List
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import multiprocessing
+import re
+import threading
+import time
 import numpy as np
 import structlog
-from sentence_transformers import SentenceTransformer
 
 from config import settings
+from services.metrics import StageTimer
 
 logger = structlog.get_logger()
 
 # Lazy-loaded embedding model
 _embedding_model = None
+_model_lock = threading.Lock()
+
+# Lazy-created executor that runs model.encode off the event loop
+_executor: Optional[Executor] = None
+
+# Output dimension of the embedding model (known after the first encode)
+_embedding_dimension: Optional[int] = None
 
 
 def _get_model():
-    """Get or create the embedding model."""
+    """Get or create the embedding model for the configured backend."""
     global _embedding_model
     if _embedding_model is None:
-        logger.info("Loading embedding model", model=settings.embedding_model)
-        _embedding_model = SentenceTransformer(settings.embedding_model)
-        logger.info("Embedding model loaded successfully")
+        # Warm-up and the first requests may race to load it from several threads
+        with _model_lock:
+            if _embedding_model is None:
+                logger.info(
+                    "Loading embedding model",
+                    model=settings.embedding_model,
+                    backend=settings.embedding_backend
+                )
+                if settings.embedding_backend == "onnx":
+                    from core.onnx_embeddings import OnnxEmbeddingModel
+                    _embedding_model = OnnxEmbeddingModel(settings.onnx_model_dir, settings.onnx_threads)
+                else:
+                    # Imported here so the ONNX backend never loads torch
+                    from sentence_transformers import SentenceTransformer
+                    _embedding_model = SentenceTransformer(settings.embedding_model)
+                logger.info("Embedding model loaded successfully")
     return _embedding_model
 
 
-async def get_embedding(text: str) -> List[float]:
+def load_embedding_model():
+    """
+    Load the model in the current process without encoding anything.
+    
+    Used to preload weights in a parent process before it forks workers,
+    so they share the weights copy-on-write. No inference runs in the
+    parent, so no torch thread pools exist at fork time.
+    """
+    _get_model()
+
+
+def _encode(texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+    """
+    Encode texts with the local model.
+    
+    Runs inside an executor worker (thread or process), never on the event loop.
+    In process mode each worker loads its own copy of the model on first use.
+    """
+    model = _get_model()
+    return model.encode(texts, convert_to_numpy=True, show_progress_bar=show_progress_bar)
+
+
+def _get_executor() -> Executor:
+    """Get or create the bounded executor used for encoding."""
+    global _executor
+    if _executor is None:
+        workers = max(1, settings.embedding_workers)
+        if settings.embedding_executor == "process":
+            # spawn avoids forking a process that already holds torch threads
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="embedding",
+            )
+        logger.info(
+            "Embedding executor started",
+            kind=settings.embedding_executor,
+            workers=workers
+        )
+    return _executor
+
+
+async def _encode_async(texts: List[str], show_progress_bar: bool = False) -> np.ndarray:
+    """Run _encode on the executor and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _encode, texts, show_progress_bar)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent get_embedding calls into batched encode calls.
+    
+    The first queued text opens a batch window; texts arriving within
+    `window_ms` (or until `max_batch_size` is reached) share one forward pass.
+    Each caller awaits its own future and receives its own vector.
+    """
+    
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+    
+    async def submit(self, text: str) -> np.ndarray:
+        """Queue a text for the next batch and wait for its vector."""
+        future = self.loop.create_future()
+        self._queue.put_nowait((text, future))
+        if self._worker is None or self._worker.done():
+            self._worker = self.loop.create_task(self._collect())
+        return await future
+    
+    async def _collect(self):
+        """Gather queued texts into batches and dispatch them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self.loop.time() + self.window
+            
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Encode in the background so the next batch can start collecting
+            task = self.loop.create_task(self._encode_batch(batch))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    async def _encode_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Run one encode call for a batch and resolve each caller's future."""
+        live = [(text, future) for text, future in batch if not future.done()]
+        if not live:
+            return
+        
+        # Identical texts in the same window only need to be encoded once
+        unique_texts = list(dict.fromkeys(text for text, _ in live))
+        try:
+            vectors = await _encode_async(unique_texts)
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        row_for_text = {text: i for i, text in enumerate(unique_texts)}
+        for text, future in live:
+            if not future.done():
+                future.set_result(vectors[row_for_text[text]])
+        
+        logger.debug("Embedding batch encoded", batch_size=len(live), unique=len(unique_texts))
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a query for cache lookups.
+    
+    Lowercases, drops punctuation and collapses whitespace so that
+    "What is FCL?" and "what is  fcl" share one cache entry.
+    """
+    text = _PUNCTUATION_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query vectors with an optional TTL.
+    
+    Vectors are stored as read-only float32 arrays so callers can use them
+    without copying and cannot corrupt a cached entry by mistake.
+    """
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached vector for a normalized key, if fresh."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, vector = entry
+            if self.ttl <= 0 or time.monotonic() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, key: str, vector: np.ndarray) -> np.ndarray:
+        """Store a vector and return the cached read-only copy."""
+        cached = np.array(vector, dtype=np.float32)
+        cached.flags.writeable = False
+        if self.max_size <= 0:
+            return cached
+        self._entries[key] = (time.monotonic(), cached)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return cached
+    
+    def clear(self):
+        """Drop all cached vectors."""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_query_cache = QueryEmbeddingCache(
+    max_size=settings.embedding_cache_size,
+    ttl_seconds=settings.embedding_cache_ttl,
+)
+
+
+def get_embedding_cache_stats() -> Dict[str, float]:
+    """Get query embedding cache counters."""
+    return _query_cache.stats()
+
+
+# One batcher per running event loop
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+def _get_batcher() -> EmbeddingBatcher:
+    """Get or create the micro-batcher bound to the running event loop."""
+    global _batcher
+    if _batcher is None or _batcher.loop is not asyncio.get_running_loop():
+        _batcher = EmbeddingBatcher(
+            window_ms=settings.embedding_batch_window_ms,
+            max_batch_size=settings.embedding_max_batch_size,
+        )
+    return _batcher
+
+
+def shutdown_embedding_executor():
+    """Stop the embedding executor (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        logger.info("Embedding executor stopped")
+
+
+async def get_embedding(text: str) -> np.ndarray:
     """
     Generate embedding for a single text.
     
+    Repeated queries (after normalization) are served from the cache.
+    
     Args:
         text: Text to embed
         
     Returns:
-        List of floats representing the embedding vector
+        Read-only float32 numpy array representing the embedding vector
     """
-    try:
-        model = _get_model()
-        embedding = model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
-    except Exception as e:
-        logger.error("Embedding generation failed", error=str(e))
-        raise
+    with StageTimer("embedding"):
+        key = normalize_query(text)
+        cached = _query_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            embedding = await _get_batcher().submit(text)
+            return _query_cache.put(key, embedding)
+        except Exception as e:
+            logger.error("Embedding generation failed", error=str(e))
+            raise
 
 
 async def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
@@ -56,8 +333,7 @@ async def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
         List of embedding vectors
     """
     try:
-        model = _get_model()
-        embeddings = model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
+        embeddings = await _encode_async(texts, show_progress_bar=True)
         logger.info("Batch embeddings generated", count=len(texts))
         return embeddings.tolist()
     except Exception as e:
@@ -65,6 +341,15 @@ async def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
         raise
 
 
+async def get_embedding_dimension() -> int:
+    """Get the vector dimension produced by the configured embedding model."""
+    global _embedding_dimension
+    if _embedding_dimension is None:
+        probe = await _encode_async([""])
+        _embedding_dimension = int(probe.shape[1])
+    return _embedding_dimension
+
+
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
     Calculate cosine similarity between two vectors.
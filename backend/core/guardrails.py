@@ -1,13 +1,20 @@
 """
 Project Dwight - Guardrails Module
 Validates responses and enforces safety rules.
+
+Each rule set (forbidden phrases and apologies, speculation indicators,
+injection patterns) is compiled into a single regex at import, so a text
+is scanned once per rule set instead of once per rule.
 """
 
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Tuple
 import re
+import time
 import structlog
 
 from core.intent_classifier import IntentType
+from core.keywords import LEAD_TRIGGER_KEYWORDS, match_keywords  # noqa: F401 (re-exported)
+from services.metrics import StageTimer, observe_stage
 
 logger = structlog.get_logger()
 
@@ -38,18 +45,110 @@ SPECULATION_INDICATORS = [
     "standard practice is",
 ]
 
-# Lead capture trigger keywords
-LEAD_TRIGGER_KEYWORDS = [
-    "quote", "quotation", "pricing", "price", "cost",
-    "get started", "how do i start", "become a customer",
-    "sign up", "onboard", "contact", "speak to someone",
-    "interested in", "want to ship", "need shipping",
-]
-
 # Refusal template
 REFUSAL_RESPONSE = "I don't have confirmed information on that at the moment. I can connect you with our team if you'd like."
 
 
+# Apologies stripped from the start of sentences
+APOLOGY_PATTERN = r"i('m| am) (so |very )?sorry,? (but |that )?"
+
+# Prompt injection attempts filtered out of user input
+INJECTION_PATTERNS = [
+    r"ignore (?:all |previous |above )?instructions",
+    r"forget (?:all |previous |above )?instructions",
+    r"new instructions:",
+    r"system prompt:",
+    r"you are now",
+    r"act as",
+    r"pretend to be",
+]
+
+MAX_INPUT_LENGTH = 2000
+
+# Longest text a single rule can match ("i am very sorry, that " is 22).
+# A streamed answer is held back by this much so no phrase is split
+# between two emitted chunks.
+STREAM_HOLDBACK_CHARS = max(max(len(p) for p in FORBIDDEN_PHRASES), 22)
+
+
+def _phrase_pattern(phrases: Sequence[str]) -> str:
+    """Regex for a set of literal phrases, merged into a prefix tree."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A phrase ends here: the longer phrases are optional (and preferred)
+        return f"(?:{body})?" if "" in node else body
+    
+    return emit(trie)
+
+
+def _compile_rules(phrases: Sequence[str] = (), patterns: Sequence[str] = ()) -> "re.Pattern[str]":
+    """
+    Compile a rule set into one case-insensitive regex.
+    
+    Phrases share a prefix tree, so each position is tested once against
+    the whole set, and a lookahead on the letters a rule can start with
+    skips every other position quickly. Patterns are kept as named groups
+    r0, r1, ... (match.lastgroup tells which one hit; it is None for a
+    phrase) and must start with a literal letter.
+    
+    Args:
+        phrases: Literal phrases
+        patterns: Regular expressions
+        
+    Returns:
+        The compiled rule set
+    """
+    branches = [_phrase_pattern(phrases)] if phrases else []
+    branches += [f"(?P<r{i}>{pattern})" for i, pattern in enumerate(patterns)]
+    first_letters = sorted({p[0].lower() for p in phrases} | {p[0].lower() for p in patterns})
+    return re.compile(f"(?=[{re.escape(''.join(first_letters))}])(?:{'|'.join(branches)})", re.IGNORECASE)
+
+
+# Compiled once at import
+_CLEAN_RE = _compile_rules(FORBIDDEN_PHRASES, [APOLOGY_PATTERN])
+_SPECULATION_RE = _compile_rules(SPECULATION_INDICATORS)
+_INJECTION_RE = _compile_rules(patterns=INJECTION_PATTERNS)
+
+
+def _drop_rule_match(match: "re.Match[str]") -> str:
+    """re.sub callback removing a forbidden phrase or apology."""
+    if match.lastgroup is None:
+        logger.warning("Forbidden phrase detected", phrase=match.group().lower())
+    return ""
+
+
+def _clean_response(response: str) -> str:
+    """Remove forbidden phrases and apologies (no trimming)."""
+    return _CLEAN_RE.sub(_drop_rule_match, response)
+
+
+def _validate(response: str, context: str) -> str:
+    """Synchronous body of validate_response."""
+    # Check for speculation without context backing
+    if not context.strip() and _SPECULATION_RE.search(response):
+        logger.warning("Speculation detected without context")
+        return REFUSAL_RESPONSE
+    
+    validated = _clean_response(response)
+    
+    # Ensure response is not empty
+    if not validated.strip():
+        return REFUSAL_RESPONSE
+    
+    # Trim whitespace
+    return validated.strip()
+
+
 async def validate_response(response: str, context: str) -> str:
     """
     Validate and clean the response.
@@ -61,43 +160,97 @@ async def validate_response(response: str, context: str) -> str:
     Returns:
         Validated/cleaned response
     """
-    validated = response
-    
-    # Check for forbidden phrases
-    for phrase in FORBIDDEN_PHRASES:
-        if phrase.lower() in validated.lower():
-            logger.warning("Forbidden phrase detected", phrase=phrase)
-            validated = re.sub(
-                re.escape(phrase),
-                "",
-                validated,
-                flags=re.IGNORECASE
-            )
+    with StageTimer("guardrails"):
+        return _validate(response, context)
+
+
+class StreamingValidator:
+    """
+    Applies the validate_response rules to a streamed answer.
     
-    # Check for speculation without context backing
-    if not context.strip():
-        # If no context was provided, check for speculation
-        for indicator in SPECULATION_INDICATORS:
-            if indicator.lower() in validated.lower():
-                logger.warning("Speculation detected without context")
-                return REFUSAL_RESPONSE
-    
-    # Remove excessive apologies
-    validated = re.sub(
-        r"i('m| am) (so |very )?sorry,? (but |that )?",
-        "",
-        validated,
-        flags=re.IGNORECASE
-    )
+    Chunks are fed as they arrive from the LLM and the validator returns
+    the text that is safe to send. Only the last STREAM_HOLDBACK_CHARS of
+    raw text are kept back, since a forbidden phrase or apology that
+    starts there may still be completed by the next chunk; everything
+    before them is cleaned once and released, so each chunk costs time in
+    its own length, not the length of the answer so far. Trailing
+    whitespace is held until more text follows, so the answer comes out
+    trimmed. Without context a speculative answer is replaced by the
+    refusal as a whole, so nothing is released until the answer is
+    complete. The concatenated output equals validate_response() on the
+    full answer.
+    """
     
-    # Ensure response is not empty
-    if not validated.strip():
-        return REFUSAL_RESPONSE
+    def __init__(self, context: str):
+        self.context = context
+        self.buffer_all = not context.strip()
+        self.raw = ""  # Whole answer, only kept when buffering it all
+        self.pending = ""  # Raw text not cleaned yet
+        self.unsent = ""  # Cleaned trailing whitespace not sent yet
+        self.started = False
+        self.seconds = 0.0  # Time spent validating, recorded on finish
     
-    # Trim whitespace
-    validated = validated.strip()
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the answer.
+        
+        Returns:
+            Cleaned text that can be sent now (may be empty)
+        """
+        if self.buffer_all:
+            self.raw += chunk
+            return ""
+        start = time.perf_counter()
+        self.pending += chunk
+        text = self._release(self._clean_pending(len(self.pending) - STREAM_HOLDBACK_CHARS))
+        self.seconds += time.perf_counter() - start
+        return text
+    
+    def finish(self) -> str:
+        """
+        Close the stream.
+        
+        Returns:
+            The rest of the cleaned answer; the whole validated answer
+            (possibly the refusal) if nothing was sent yet
+        """
+        start = time.perf_counter()
+        if self.buffer_all:
+            text = _validate(self.raw, self.context)
+        else:
+            text = self._release(self._clean_pending(len(self.pending)))
+            if not self.started:
+                text = REFUSAL_RESPONSE
+        observe_stage("guardrails", self.seconds + time.perf_counter() - start)
+        return text
+    
+    def _clean_pending(self, end: int) -> str:
+        """Clean the pending text up to end and keep the rest pending."""
+        if end <= 0:
+            return ""
+        pieces, last = [], 0
+        for match in _CLEAN_RE.finditer(self.pending):
+            if match.start() >= end:
+                # May still grow into a longer match with the next chunk
+                break
+            # Starts before the holdback, so the whole match is already here
+            pieces.append(self.pending[last:match.start()])
+            _drop_rule_match(match)
+            last = match.end()
+        end = max(end, last)
+        pieces.append(self.pending[last:end])
+        self.pending = self.pending[end:]
+        return "".join(pieces)
     
-    return validated
+    def _release(self, cleaned: str) -> str:
+        text = self.unsent + cleaned
+        if not self.started:
+            text = text.lstrip()
+        body = text.rstrip()
+        self.unsent = text[len(body):]
+        if body:
+            self.started = True
+        return body
 
 
 async def check_lead_trigger(message: str, intent: IntentType) -> bool:
@@ -111,18 +264,18 @@ async def check_lead_trigger(message: str, intent: IntentType) -> bool:
     Returns:
         True if lead capture should be triggered
     """
-    # Sales intent always has potential for lead capture
-    if intent == IntentType.SALES:
-        return True
-    
-    # Check for lead trigger keywords
-    message_lower = message.lower()
-    for keyword in LEAD_TRIGGER_KEYWORDS:
-        if keyword in message_lower:
-            logger.info("Lead trigger detected", keyword=keyword)
+    with StageTimer("lead_trigger"):
+        # Sales intent always has potential for lead capture
+        if intent == IntentType.SALES:
             return True
-    
-    return False
+        
+        # Check for lead trigger keywords
+        keywords = match_keywords(message).keywords("lead")
+        if keywords:
+            logger.info("Lead trigger detected", keyword=keywords[0])
+            return True
+        
+        return False
 
 
 async def check_response_quality(response: str, query: str) -> Tuple[bool, str]:
@@ -165,26 +318,17 @@ def sanitize_input(text: str) -> str:
     Returns:
         Sanitized text
     """
+    # Truncate first, so the scan never sees more than the limit
+    sanitized = text[:MAX_INPUT_LENGTH]
+    
     # Remove any potential prompt injection attempts
-    injection_patterns = [
-        r"ignore (?:all |previous |above )?instructions",
-        r"forget (?:all |previous |above )?instructions",
-        r"new instructions:",
-        r"system prompt:",
-        r"you are now",
-        r"act as",
-        r"pretend to be",
-    ]
-    
-    sanitized = text
-    for pattern in injection_patterns:
-        if re.search(pattern, sanitized, re.IGNORECASE):
-            logger.warning("Potential injection attempt detected", pattern=pattern)
-            sanitized = re.sub(pattern, "[FILTERED]", sanitized, flags=re.IGNORECASE)
-    
-    # Limit length
-    max_length = 2000
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
+    sanitized = _INJECTION_RE.sub(_filter_injection, sanitized)
     
     return sanitized.strip()
+
+
+def _filter_injection(match: "re.Match[str]") -> str:
+    """re.sub callback replacing a prompt injection attempt."""
+    pattern = INJECTION_PATTERNS[int(match.lastgroup[1:])]
+    logger.warning("Potential injection attempt detected", pattern=pattern)
+    return "[FILTERED]"
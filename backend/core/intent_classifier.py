@@ -1,13 +1,35 @@
 """
 Project Dwight - Intent Classifier
 Automatically detects user intent to route to appropriate mode.
+
+Explicit phrasings ("can you send me a quote") and clear keyword hits are
+routed by the keyword matcher, which needs no query embedding, so the chat
+pipeline classifies these messages while the query is still being
+embedded. Only messages the keywords do not decide wait for the embedding
+(already computed for retrieval): it is compared with prototype vectors of
+the knowledge base buckets (the centroids of their chunk vectors), which
+costs one small matrix-vector product. When no prototype clearly wins, or
+no query vector is given, the message is a support query.
 """
 
 from enum import Enum
-from typing import List, Tuple
-import re
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 import structlog
 
+from config import settings
+from services.metrics import StageTimer
+
+# The keyword and pattern lists live in core.keywords (re-exported here)
+from core.keywords import (  # noqa: F401
+    INTERNAL_KEYWORDS,
+    INTERNAL_PATTERNS,
+    SALES_KEYWORDS,
+    SALES_PATTERNS,
+    KeywordHits,
+    match_keywords,
+)
+
 logger = structlog.get_logger()
 
 
@@ -18,82 +40,172 @@ class IntentType(Enum):
     INTERNAL = "internal"    # Internal knowledge queries
 
 
-# Keywords and patterns for intent classification
-SALES_KEYWORDS = [
-    "price", "pricing", "cost", "quote", "quotation", "rate", "rates",
-    "how much", "charges", "fee", "fees", "budget",
-    "get started", "become a customer", "onboard", "onboarding",
-    "sign up", "signup", "register", "contract", "agreement",
-    "payment terms", "credit", "partner", "partnership",
-    "interested in", "want to use", "looking for", "need shipping"
-]
-
-SALES_PATTERNS = [
-    r"how (?:much|do i|can i|to) (?:pay|start|begin|sign)",
-    r"(?:can you|could you) (?:give|send|provide) (?:me )?(?:a )?quote",
-    r"what (?:are|is) (?:the|your) (?:price|cost|rate|charge)",
-    r"i (?:want|need|am looking) to (?:ship|send|export|import)",
-    r"(?:pricing|quote|cost) for",
-]
-
-INTERNAL_KEYWORDS = [
-    "policy", "policies", "procedure", "procedures", "protocol",
-    "escalation", "escalate", "sla", "kpi", "standard",
-    "internal", "employee", "staff", "team", "department",
-    "quality standard", "compliance", "audit"
-]
-
-INTERNAL_PATTERNS = [
-    r"what is (?:the|our) (?:policy|procedure|protocol)",
-    r"how (?:do|should) (?:we|i|staff) (?:handle|process|escalate)",
-    r"(?:internal|staff|employee) (?:guide|guideline|policy)",
-]
-
-
-def _calculate_keyword_score(text: str, keywords: List[str]) -> float:
-    """Calculate how many keywords match in the text."""
-    text_lower = text.lower()
-    matches = sum(1 for keyword in keywords if keyword in text_lower)
-    return matches / len(keywords) if keywords else 0
-
-
-def _check_patterns(text: str, patterns: List[str]) -> bool:
-    """Check if any pattern matches the text."""
-    text_lower = text.lower()
-    return any(re.search(pattern, text_lower) for pattern in patterns)
-
-
-async def classify_intent(message: str) -> IntentType:
+class IntentPrototypes:
+    """Prototype vectors of the knowledge base buckets, labeled by intent."""
+    
+    def __init__(self, vectors: np.ndarray, intents: Sequence[IntentType], labels: Sequence[str]):
+        """
+        Args:
+            vectors: (num_prototypes, dim) L2-normalized prototypes
+            intents: Intent of each prototype
+            labels: Bucket of each prototype (for logs and reports)
+        """
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.intents = list(intents)
+        self.labels = list(labels)
+    
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        buckets: Sequence[str],
+        bucket_intents: Dict[str, IntentType],
+        per_bucket: int = 1
+    ) -> Optional["IntentPrototypes"]:
+        """
+        Build prototypes from chunk vectors.
+        
+        Args:
+            vectors: Chunk vectors (L2-normalized)
+            buckets: Bucket name of each chunk
+            bucket_intents: Intent served by each bucket
+            per_bucket: Prototypes per bucket; above 1, spherical k-means
+                centroids, so a bucket that covers several topics gets one
+                prototype per topic
+            
+        Returns:
+            The prototypes, or None if no chunk belongs to a known bucket
+        """
+        buckets = np.asarray(buckets)
+        prototypes, intents, labels = [], [], []
+        for bucket, intent in bucket_intents.items():
+            members = np.asarray(vectors[buckets == bucket], dtype=np.float32)
+            if len(members) == 0:
+                continue
+            # k-means needs a handful of points per centroid
+            k = max(1, min(per_bucket, len(members) // 10))
+            if k == 1:
+                centroids = members.mean(axis=0, keepdims=True)
+            else:
+                import faiss
+                kmeans = faiss.Kmeans(
+                    members.shape[1], k, niter=20, seed=1, spherical=True, min_points_per_centroid=10
+                )
+                kmeans.train(members)
+                centroids = kmeans.centroids
+            prototypes.append(centroids)
+            intents.extend([intent] * len(centroids))
+            labels.extend([bucket] * len(centroids))
+        
+        if not prototypes:
+            return None
+        matrix = np.concatenate(prototypes).astype(np.float32)
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+        return cls(matrix, intents, labels)
+    
+    def classify(self, query_vector: np.ndarray) -> Tuple[IntentType, float, float]:
+        """
+        Find the intent whose prototype is closest to a query.
+        
+        Returns:
+            Tuple of (intent, cosine similarity, margin over the best
+            prototype of any other intent)
+        """
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        scores = self.vectors @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        best = int(np.argmax(scores))
+        intent = self.intents[best]
+        others = [score for score, other in zip(scores, self.intents) if other != intent]
+        margin = float(scores[best] - max(others)) if others else float("inf")
+        return intent, float(scores[best]), margin
+
+
+def _keyword_score(hits: KeywordHits, group: str, keywords: List[str]) -> float:
+    """Fraction of a group's keywords found in the message."""
+    return len(hits.keywords(group)) / len(keywords) if keywords else 0
+
+
+async def classify_intent(message: str, query_vector: Optional[np.ndarray] = None) -> IntentType:
     """
     Classify user intent based on message content.
     
     Args:
         message: User's message text
+        query_vector: Embedding of the message, enables prototype matching
         
     Returns:
         IntentType indicating support, sales, or internal mode
     """
-    message_lower = message.lower()
+    intent = await classify_intent_by_keywords(message)
+    if intent is not None:
+        return intent
+    return await classify_intent_by_prototypes(query_vector)
+
+
+async def classify_intent_by_keywords(message: str) -> Optional[IntentType]:
+    """
+    Keyword fast path: needs no query vector.
+    
+    Returns:
+        The intent patterns or keyword hits decide, or None
+    """
+    with StageTimer("intent"):
+        return _classify_by_keywords(match_keywords(message))
+
+
+async def classify_intent_by_prototypes(query_vector: Optional[np.ndarray]) -> IntentType:
+    """
+    Fallback for messages the keywords do not decide: nearest prototype.
+    
+    Returns:
+        The prototype's intent, or SUPPORT when no prototype clearly wins
+        (or there is no query vector or no prototypes)
+    """
+    if query_vector is None or settings.intent_classifier != "prototype":
+        return IntentType.SUPPORT
     
+    with StageTimer("intent_prototype"):
+        # Imported here: the RAG engine imports this module
+        from core.rag_engine import get_intent_prototypes
+        intent = _classify_by_prototypes(query_vector, get_intent_prototypes())
+    return intent or IntentType.SUPPORT
+
+
+def _classify_by_prototypes(
+    query_vector: np.ndarray,
+    prototypes: Optional[IntentPrototypes]
+) -> Optional[IntentType]:
+    """Nearest prototype; None if undecided."""
+    if prototypes is None:
+        return None
+    
+    intent, score, margin = prototypes.classify(query_vector)
+    if margin < settings.intent_min_margin:
+        logger.debug("Prototype match too close, defaulting to support", intent=intent.value, margin=round(margin, 4))
+        return None
+    logger.debug("Classified by prototype", intent=intent.value, score=round(score, 4), margin=round(margin, 4))
+    return intent
+
+
+def _classify_by_keywords(hits: KeywordHits) -> Optional[IntentType]:
+    """Keyword and pattern thresholds; None without enough evidence."""
     # Check for sales intent
-    sales_keyword_score = _calculate_keyword_score(message, SALES_KEYWORDS)
-    sales_pattern_match = _check_patterns(message, SALES_PATTERNS)
+    sales_keyword_score = _keyword_score(hits, "sales", SALES_KEYWORDS)
+    sales_pattern_match = hits.pattern("sales")
     
     if sales_pattern_match or sales_keyword_score > 0.05:
         logger.debug("Classified as SALES", score=sales_keyword_score)
         return IntentType.SALES
     
     # Check for internal intent
-    internal_keyword_score = _calculate_keyword_score(message, INTERNAL_KEYWORDS)
-    internal_pattern_match = _check_patterns(message, INTERNAL_PATTERNS)
+    internal_keyword_score = _keyword_score(hits, "internal", INTERNAL_KEYWORDS)
+    internal_pattern_match = hits.pattern("internal")
     
     if internal_pattern_match or internal_keyword_score > 0.05:
         logger.debug("Classified as INTERNAL", score=internal_keyword_score)
         return IntentType.INTERNAL
     
-    # Default to support
-    logger.debug("Classified as SUPPORT (default)")
-    return IntentType.SUPPORT
+    return None
 
 
 async def get_intent_context(intent: IntentType) -> str:
@@ -0,0 +1,147 @@
+"""
+Project Dwight - Keyword Matcher
+One shared matcher for the intent keywords, intent patterns and lead
+triggers.
+
+The matcher is built once at import. Keywords that appear in several lists
+(e.g. "quote" is both a sales keyword and a lead trigger) are checked once,
+and a keyword is skipped when a shorter keyword it contains did not match
+("rates" is only looked for if "rate" was found). The message is lowercased
+once, and the hits of every list come back from one call. classify_intent
+and check_lead_trigger look at the same message, so the last results are
+cached and the second call is free.
+
+Matching keeps the original semantics: a keyword hits when it appears as a
+substring of the lowercased message, and a pattern hits when re.search
+finds it. One combined alternation regex over every keyword and pattern was
+measured 2-5x slower than this on CPython, whose regex engine has no
+literal prefilter for large alternations; see scripts/benchmark_keywords.py.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+import re
+
+# Keywords and patterns for intent classification
+SALES_KEYWORDS = [
+    "price", "pricing", "cost", "quote", "quotation", "rate", "rates",
+    "how much", "charges", "fee", "fees", "budget",
+    "get started", "become a customer", "onboard", "onboarding",
+    "sign up", "signup", "register", "contract", "agreement",
+    "payment terms", "credit", "partner", "partnership",
+    "interested in", "want to use", "looking for", "need shipping"
+]
+
+SALES_PATTERNS = [
+    r"how (?:much|do i|can i|to) (?:pay|start|begin|sign)",
+    r"(?:can you|could you) (?:give|send|provide) (?:me )?(?:a )?quote",
+    r"what (?:are|is) (?:the|your) (?:price|cost|rate|charge)",
+    r"i (?:want|need|am looking) to (?:ship|send|export|import)",
+    r"(?:pricing|quote|cost) for",
+]
+
+INTERNAL_KEYWORDS = [
+    "policy", "policies", "procedure", "procedures", "protocol",
+    "escalation", "escalate", "sla", "kpi", "standard",
+    "internal", "employee", "staff", "team", "department",
+    "quality standard", "compliance", "audit"
+]
+
+INTERNAL_PATTERNS = [
+    r"what is (?:the|our) (?:policy|procedure|protocol)",
+    r"how (?:do|should) (?:we|i|staff) (?:handle|process|escalate)",
+    r"(?:internal|staff|employee) (?:guide|guideline|policy)",
+]
+
+# Lead capture trigger keywords
+LEAD_TRIGGER_KEYWORDS = [
+    "quote", "quotation", "pricing", "price", "cost",
+    "get started", "how do i start", "become a customer",
+    "sign up", "onboard", "contact", "speak to someone",
+    "interested in", "want to ship", "need shipping",
+]
+
+
+class KeywordHits:
+    """Keyword and pattern hits of one message, by group."""
+
+    __slots__ = ("_keywords", "_patterns")
+
+    def __init__(self, keywords: Dict[str, Tuple[str, ...]], patterns: FrozenSet[str]):
+        self._keywords = keywords
+        self._patterns = patterns
+
+    def keywords(self, group: str) -> Tuple[str, ...]:
+        """Keywords of a group found in the message, in list order."""
+        return self._keywords.get(group, ())
+
+    def pattern(self, group: str) -> bool:
+        """Whether any pattern of a group matched."""
+        return group in self._patterns
+
+
+class KeywordMatcher:
+    """Matches several keyword lists and pattern lists in one call."""
+
+    def __init__(self, keywords: Dict[str, Sequence[str]], patterns: Dict[str, Sequence[str]]):
+        """
+        Args:
+            keywords: Keyword lists by group
+            patterns: Regex lists by group
+        """
+        self._groups = {group: tuple(words) for group, words in keywords.items()}
+
+        # Every distinct keyword once, shortest first, with the shorter
+        # keywords it contains: it cannot hit unless they all hit
+        vocabulary = sorted({w for words in keywords.values() for w in words}, key=lambda w: (len(w), w))
+        self._checks: List[Tuple[str, FrozenSet[str]]] = [
+            (word, frozenset(other for other in vocabulary[:i] if other in word))
+            for i, word in enumerate(vocabulary)
+        ]
+        self._patterns = [
+            (group, [re.compile(p) for p in group_patterns])
+            for group, group_patterns in patterns.items()
+        ]
+
+    def match(self, text: str) -> KeywordHits:
+        """
+        Find every keyword and pattern group in a message.
+
+        Args:
+            text: Message (matched case-insensitively)
+
+        Returns:
+            The hits of every group
+        """
+        text = text.lower()
+        found = set()
+        for word, requires in self._checks:
+            if (not requires or requires <= found) and word in text:
+                found.add(word)
+
+        return KeywordHits(
+            {group: tuple(w for w in words if w in found) for group, words in self._groups.items()},
+            frozenset(
+                group for group, compiled in self._patterns
+                if any(p.search(text) for p in compiled)
+            )
+        )
+
+
+MATCHER = KeywordMatcher(
+    keywords={
+        "sales": SALES_KEYWORDS,
+        "internal": INTERNAL_KEYWORDS,
+        "lead": LEAD_TRIGGER_KEYWORDS,
+    },
+    patterns={
+        "sales": SALES_PATTERNS,
+        "internal": INTERNAL_PATTERNS,
+    },
+)
+
+
+@lru_cache(maxsize=256)
+def match_keywords(message: str) -> KeywordHits:
+    """Match a message against every keyword list (cached per message)."""
+    return MATCHER.match(message)
@@ -0,0 +1,185 @@
+"""
+Project Dwight - Lexical Index
+Compact BM25 inverted index over the knowledge base chunks.
+
+Dense embeddings blur exact freight tokens such as "FCL", "AWB", "HS code"
+or port codes. The lexical index catches those, and its ranking is fused
+with the dense ranking at query time.
+
+The postings are stored as CSR-style numpy arrays. BM25 weights are
+precomputed per posting at build time, so a query is a gather plus one
+bincount over the postings of its terms. Rows match the chunk store rows.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import io
+import os
+import re
+import numpy as np
+
+LEXICAL_FILE = "lexical.npz"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Very common words carry no signal and would bloat the postings
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it
+its me my of on or our so that the their them there this to us was we what
+when where which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class LexicalIndex:
+    """BM25 index with precomputed per-posting weights."""
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        weights: np.ndarray,
+        num_docs: int,
+        k1: float,
+        b: float
+    ):
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+        self.weights = weights
+        self.num_docs = num_docs
+        self.k1 = k1
+        self.b = b
+        self._term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms.tolist())}
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> "LexicalIndex":
+        """
+        Build the index from chunk texts in chunk store row order.
+
+        Args:
+            texts: Chunk texts, one per row
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_rows: List[int] = []
+        doc_lengths: List[int] = []
+
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for token in tokens:
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            doc_rows.extend([row] * len(tokens))
+
+        num_docs = len(doc_lengths)
+        terms = np.array(sorted(vocabulary), dtype=str)
+        if num_docs == 0 or not term_ids:
+            return cls(terms, np.zeros(len(terms) + 1, dtype=np.int64), np.empty(0, dtype=np.int32),
+                       np.empty(0, dtype=np.float32), num_docs, k1, b)
+
+        # Remap to alphabetical term ids, then count (term, row) pairs
+        remap = np.empty(len(vocabulary), dtype=np.int64)
+        remap[[vocabulary[t] for t in terms.tolist()]] = np.arange(len(terms))
+        pair = remap[np.array(term_ids)] * num_docs + np.array(doc_rows, dtype=np.int64)
+        pairs, tf = np.unique(pair, return_counts=True)
+        posting_terms = pairs // num_docs
+        posting_rows = (pairs % num_docs).astype(np.int32)
+
+        # BM25 weight of each posting
+        lengths = np.array(doc_lengths, dtype=np.float32)
+        avg_length = max(float(lengths.mean()), 1.0)
+        df = np.bincount(posting_terms, minlength=len(terms))
+        idf = np.log(1 + (num_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths[posting_rows] / avg_length)
+        weights = (idf[posting_terms] * tf * (k1 + 1) / (tf + norm)).astype(np.float32)
+
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        return cls(terms, offsets, posting_rows, weights, num_docs, k1, b)
+
+    def search(self, query: str, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score chunks against a query.
+
+        Args:
+            query: Raw query text
+            k: Number of results
+            mask: Optional boolean array over rows restricting the results
+
+        Returns:
+            Tuple of (rows, scores) sorted by descending score
+        """
+        term_ids = [self._term_ids[t] for t in set(tokenize(query)) if t in self._term_ids]
+        if not term_ids or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        spans = [np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+        postings = np.concatenate(spans)
+        candidate_rows, inverse = np.unique(self.rows[postings], return_inverse=True)
+        scores = np.bincount(inverse, weights=self.weights[postings]).astype(np.float32)
+
+        if mask is not None:
+            keep = mask[candidate_rows]
+            candidate_rows, scores = candidate_rows[keep], scores[keep]
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidate_rows, scores = candidate_rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return candidate_rows[order].astype(np.int64), scores[order]
+
+    def save(self, path: Path):
+        """Persist the index (plain arrays, no pickle) via temp file + rename."""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            terms=self.terms,
+            offsets=self.offsets,
+            rows=self.rows,
+            weights=self.weights,
+            params=np.array([self.num_docs, self.k1, self.b], dtype=np.float64),
+        )
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        """Load a persisted index."""
+        with np.load(path, allow_pickle=False) as data:
+            num_docs, k1, b = data["params"].tolist()
+            return cls(
+                data["terms"], data["offsets"], data["rows"], data["weights"],
+                int(num_docs), k1, b
+            )
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse ranked row lists with reciprocal-rank fusion.
+
+    Args:
+        rankings: Row arrays, each ordered best first
+        k: RRF constant (higher flattens the rank contribution)
+
+    Returns:
+        Tuple of (rows, fused scores) sorted by descending score
+    """
+    rankings = [r for r in rankings if len(r)]
+    if not rankings:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    rows = np.concatenate(rankings)
+    contributions = np.concatenate([1.0 / (k + 1 + np.arange(len(r))) for r in rankings])
+    unique_rows, inverse = np.unique(rows, return_inverse=True)
+    scores = np.bincount(inverse, weights=contributions)
+    order = np.argsort(-scores, kind="stable")
+    return unique_rows[order], scores[order]
@@ -3,34 +3,101 @@ Project Dwight - LLM Client
 Handles interactions with the language model using Groq cloud API.
 """
 
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+from contextlib import asynccontextmanager
 from pathlib import Path
+import asyncio
+import time
+import httpx
 import structlog
-from groq import Groq
+from groq import AsyncGroq
 
 from config import settings
 from core.intent_classifier import IntentType
+from services.metrics import StageTimer, observe_stage, record_stage_error, record_tokens
 
 logger = structlog.get_logger()
 
+# Stands in for {query} in system prompts: the query is sent once, as the user message
+QUERY_REFERENCE = "(the user's message)"
+
+# Returned when the LLM call fails (never cached)
+LLM_ERROR_RESPONSE = "I'm having trouble processing your request right now. Please try again or contact us at info@tigerlogistics.in for assistance."
+
 # Cache for loaded prompts
 _prompt_cache: dict = {}
 
-# Groq client (lazy initialized)
-_groq_client = None
+# Groq client and its connection pool (lazy initialized)
+_groq_client: Optional[AsyncGroq] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Caps in-flight LLM calls per worker
+_llm_slots: Optional[asyncio.Semaphore] = None
 
 
-def _get_groq_client():
-    """Get or create Groq client."""
-    global _groq_client
+def _get_groq_client() -> AsyncGroq:
+    """
+    Get or create the async Groq client.
+    
+    All calls share one httpx connection pool, so requests reuse warm
+    keep-alive connections instead of paying a TLS handshake each time.
+    """
+    global _groq_client, _http_client, _llm_slots
     if _groq_client is None:
         if not settings.groq_api_key:
             raise ValueError("GROQ_API_KEY is required. Get one free at https://console.groq.com")
-        _groq_client = Groq(api_key=settings.groq_api_key)
-        logger.info("Groq client initialized", model=settings.groq_model)
+        timeout = httpx.Timeout(
+            settings.llm_read_timeout,
+            connect=settings.llm_connect_timeout,
+            pool=settings.llm_connect_timeout
+        )
+        _http_client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry
+            )
+        )
+        _groq_client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            base_url=settings.groq_base_url or None,
+            http_client=_http_client,
+            timeout=timeout,
+            max_retries=settings.llm_max_retries
+        )
+        _llm_slots = asyncio.Semaphore(settings.llm_max_concurrency)
+        logger.info(
+            "Groq client initialized",
+            model=settings.groq_model,
+            max_connections=settings.llm_max_connections,
+            max_concurrency=settings.llm_max_concurrency
+        )
     return _groq_client
 
 
+@asynccontextmanager
+async def _llm_slot():
+    """Hold one LLM concurrency slot, timing the wait for it as "llm_queue"."""
+    slots = _llm_slots
+    with StageTimer("llm_queue"):
+        await slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+async def close_llm_client():
+    """Close the connection pool (called on application shutdown)."""
+    global _groq_client, _http_client, _llm_slots
+    if _http_client is not None:
+        await _http_client.aclose()
+    _groq_client = None
+    _http_client = None
+    _llm_slots = None
+
+
 def load_system_prompt(intent: IntentType) -> str:
     """
     Load the appropriate system prompt for the given intent.
@@ -87,14 +154,29 @@ CONTEXT WILL BE PROVIDED BELOW:
 {context}
 ---
 
-USER QUERY:
-{query}
-
-Provide a helpful, accurate response based strictly on the context above."""
+Answer the user's message helpfully and accurately, based strictly on the context above."""
     
     return base
 
 
+def _build_messages(query: str, context: str, intent: IntentType) -> List[dict]:
+    """Build the chat messages for a query and its retrieved context."""
+    # Load appropriate system prompt
+    system_prompt = load_system_prompt(intent)
+    
+    # Handle empty context
+    if not context.strip():
+        context = "[No relevant context found in knowledge base]"
+    
+    # Format the prompt with the context; the query itself goes only in the user message
+    formatted_prompt = system_prompt.replace("{context}", context).replace("{query}", QUERY_REFERENCE)
+    
+    return [
+        {"role": "system", "content": formatted_prompt},
+        {"role": "user", "content": query}
+    ]
+
+
 async def generate_response(
     query: str,
     context: str,
@@ -115,43 +197,125 @@ async def generate_response(
     Returns:
         Generated response string
     """
-    try:
-        # Load appropriate system prompt
-        system_prompt = load_system_prompt(intent)
-        
-        # Format the prompt with context and query
-        formatted_prompt = system_prompt.replace("{context}", context).replace("{query}", query)
-        
-        # Handle empty context
-        if not context.strip():
-            formatted_prompt = system_prompt.replace(
-                "{context}",
-                "[No relevant context found in knowledge base]"
-            ).replace("{query}", query)
+    response, _ = await generate_completion(query, context, intent, temperature, max_tokens)
+    return response
+
+
+async def generate_completion(
+    query: str,
+    context: str,
+    intent: IntentType,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> Tuple[str, Optional[int]]:
+    """
+    Generate a response using the LLM and report the tokens it used.
+    
+    Args:
+        query: User's question
+        context: Retrieved context from RAG
+        intent: Classified intent type
+        temperature: Optional override for temperature
+        max_tokens: Optional override for max tokens
         
+    Returns:
+        Tuple of (generated response, total tokens used or None)
+    """
+    try:
         # Generate response using Groq
         client = _get_groq_client()
         
-        response = client.chat.completions.create(
-            model=settings.groq_model,
-            messages=[
-                {"role": "system", "content": formatted_prompt},
-                {"role": "user", "content": query}
-            ],
-            temperature=temperature or settings.llm_temperature,
-            max_tokens=max_tokens or settings.llm_max_tokens,
-        )
+        async with _llm_slot():
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=settings.groq_model,
+                    messages=_build_messages(query, context, intent),
+                    temperature=temperature or settings.llm_temperature,
+                    max_tokens=max_tokens or settings.llm_max_tokens,
+                )
+            finally:
+                observe_stage("llm", time.perf_counter() - start)
         
         generated_text = response.choices[0].message.content.strip()
+        usage = response.usage
+        if usage:
+            record_tokens(usage.prompt_tokens, usage.completion_tokens)
         
         logger.info(
             "Response generated",
             model=settings.groq_model,
-            tokens_used=response.usage.total_tokens if response.usage else None
+            tokens_used=usage.total_tokens if usage else None
         )
         
-        return generated_text
+        return generated_text, usage.total_tokens if usage else None
         
     except Exception as e:
         logger.error("LLM generation failed", error=str(e))
-        return "I'm having trouble processing your request right now. Please try again or contact us at info@tigerlogistics.in for assistance."
+        record_stage_error("llm")
+        return LLM_ERROR_RESPONSE, None
+
+
+async def stream_response(
+    query: str,
+    context: str,
+    intent: IntentType,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None
+) -> AsyncIterator[str]:
+    """
+    Stream a response from the LLM as it is generated.
+    
+    Args:
+        query: User's question
+        context: Retrieved context from RAG
+        intent: Classified intent type
+        temperature: Optional override for temperature
+        max_tokens: Optional override for max tokens
+        
+    Yields:
+        Text deltas in generation order
+        
+    Raises:
+        Any client error; the caller decides what the user sees
+    """
+    client = _get_groq_client()
+    count = 0
+    
+    # The slot is held until the stream is fully read. Only generation is
+    # timed as "llm": time suspended at a yield belongs to the consumer.
+    generating = 0.0
+    async with _llm_slot():
+        start = time.perf_counter()
+        try:
+            stream = await client.chat.completions.create(
+                model=settings.groq_model,
+                messages=_build_messages(query, context, intent),
+                temperature=temperature or settings.llm_temperature,
+                max_tokens=max_tokens or settings.llm_max_tokens,
+                stream=True,
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        count += 1
+                        generating += time.perf_counter() - start
+                        start = None
+                        yield chunk.choices[0].delta.content
+                        start = time.perf_counter()
+                    # Groq reports the usage on the last chunk
+                    usage = chunk.x_groq.usage if chunk.x_groq else None
+                    if usage:
+                        record_tokens(usage.prompt_tokens, usage.completion_tokens)
+            finally:
+                # Return the connection to the pool, also when the client went away
+                await stream.close()
+        except Exception:
+            record_stage_error("llm")
+            raise
+        finally:
+            if start is not None:
+                generating += time.perf_counter() - start
+            observe_stage("llm", generating)
+    
+    logger.info("Response streamed", model=settings.groq_model, chunks=count)
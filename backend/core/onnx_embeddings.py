@@ -0,0 +1,98 @@
+"""
+Project Dwight - ONNX Embedding Backend
+Runs the exported, int8-quantized embedding model with onnxruntime.
+
+A drop-in replacement for SentenceTransformer on CPU-only hosts: it only
+needs onnxruntime and the `tokenizers` library, so torch is never imported.
+The pipeline matches all-MiniLM-L6-v2 in sentence-transformers: tokenize
+with truncation, run the transformer, mean-pool the token embeddings over
+the attention mask, and L2-normalize.
+
+Export the model first with scripts/export_onnx.py.
+"""
+
+from typing import List
+from pathlib import Path
+import json
+import numpy as np
+
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+EXPORT_CONFIG_FILE = "export_config.json"
+
+
+class OnnxEmbeddingModel:
+    """Sentence embedding model backed by an onnxruntime session."""
+
+    def __init__(self, model_dir: Path, num_threads: int = 0):
+        """
+        Args:
+            model_dir: Directory written by scripts/export_onnx.py
+            num_threads: Intra-op threads (0 = onnxruntime default)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / MODEL_FILE
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_file}, run scripts/export_onnx.py first"
+            )
+
+        self.config = json.loads((model_dir / EXPORT_CONFIG_FILE).read_text(encoding="utf-8"))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config.get("pad_token_id", 0))
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, show_progress_bar: bool = False,
+               batch_size: int = 32) -> np.ndarray:
+        """
+        Encode texts to normalized sentence embeddings.
+
+        Mirrors SentenceTransformer.encode for the arguments this codebase
+        uses; show_progress_bar is accepted and ignored.
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        outputs = [
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        if not outputs:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.concatenate(outputs)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.config["dimension"])
@@ -0,0 +1,152 @@
+"""
+Project Dwight - Stage Pipeline
+Runs the stages of a request as a small dependency graph.
+
+Each stage declares the stages it needs. A stage starts as soon as those
+have finished, so independent stages (intent classification and query
+embedding, lead-trigger detection and answer generation) run concurrently
+and only the critical path sets the latency. A stage can also declare
+stages it only sometimes needs (`uses`) and wait for them on demand with
+`results.wait(name)`, e.g. intent classification waits for the query
+embedding only when keywords do not decide. Every run logs when each stage
+started and finished, and which chain of stages was the critical path.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+StageFn = Callable[["StageResults"], Awaitable[Any]]
+
+
+class StageResults(dict):
+    """The inputs and stage results of one run, by name."""
+
+    def __init__(self, inputs: Dict[str, Any], tasks: Dict[str, asyncio.Task]):
+        super().__init__(inputs)
+        self._tasks = tasks
+
+    async def wait(self, name: str) -> Any:
+        """Wait for a stage listed in the caller's `uses` and return its result."""
+        task = self._tasks.get(name)
+        if task is not None:
+            # Shielded: a cancelled waiter must not cancel the stage it waits for
+            await asyncio.shield(task)
+        return self[name]
+
+
+class Pipeline:
+    """A named graph of async stages."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._stages: Dict[str, Tuple[StageFn, Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._graph_logged = False
+
+    def stage(
+        self,
+        name: str,
+        fn: StageFn,
+        after: Tuple[str, ...] = (),
+        uses: Tuple[str, ...] = ()
+    ) -> "Pipeline":
+        """
+        Add a stage.
+
+        Args:
+            name: Stage name; its result is stored under this key
+            fn: Coroutine function called with the results so far
+            after: Stages (or run inputs) that must finish first. Stages
+                can only depend on names added before them, so the graph
+                is always acyclic.
+            uses: Earlier stages the stage may wait for itself, with
+                results.wait(name), instead of before it starts
+
+        Returns:
+            The pipeline, for chaining
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self._stages[name] = (fn, tuple(after), tuple(uses))
+        return self
+
+    def describe(self) -> str:
+        """The stage graph, e.g. "answer <- intent, query_vector"; uses are in parentheses."""
+        described = []
+        for name, (_, after, uses) in self._stages.items():
+            deps = list(after) + [f"({dep})" for dep in uses]
+            described.append(f"{name} <- {', '.join(deps)}" if deps else name)
+        return "; ".join(described)
+
+    async def run(self, **inputs: Any) -> Dict[str, Any]:
+        """
+        Run every stage, each as soon as its dependencies are done.
+
+        A failing stage cancels the stages still running and its error is
+        raised.
+
+        Args:
+            **inputs: Values available to every stage (e.g. message)
+
+        Returns:
+            The inputs and the result of every stage, by name
+        """
+        if not self._graph_logged:
+            logger.info("Pipeline graph", pipeline=self.name, graph=self.describe())
+            self._graph_logged = True
+
+        start = time.perf_counter()
+        spans: Dict[str, Tuple[float, float]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        results = StageResults(inputs, tasks)
+
+        async def run_stage(name: str, fn: StageFn, after: Tuple[str, ...]):
+            waits = [tasks[dep] for dep in after if dep in tasks]
+            if waits:
+                await asyncio.gather(*waits)
+            began = time.perf_counter()
+            results[name] = await fn(results)
+            spans[name] = (began - start, time.perf_counter() - start)
+
+        for name, (fn, after, uses) in self._stages.items():
+            missing = [dep for dep in after if dep not in tasks and dep not in inputs]
+            missing += [dep for dep in uses if dep not in tasks]
+            if missing:
+                raise ValueError(f"Stage {name} depends on unknown {missing}")
+            tasks[name] = asyncio.ensure_future(run_stage(name, fn, after))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        logger.info(
+            "Pipeline finished",
+            pipeline=self.name,
+            total_ms=_ms(time.perf_counter() - start),
+            critical_path=" -> ".join(self._critical_path(spans)),
+            stages={name: f"{_ms(began)}-{_ms(ended)}ms" for name, (began, ended) in spans.items()}
+        )
+        return results
+
+    def _critical_path(self, spans: Dict[str, Tuple[float, float]]) -> List[str]:
+        """Follow the last-finishing dependency back from the last stage."""
+        path: List[str] = []
+        current: Optional[str] = max(spans, key=lambda name: spans[name][1], default=None)
+        while current is not None:
+            path.append(current)
+            _, after, uses = self._stages[current]
+            # A used stage only counts if it finished first (it was waited for)
+            deps = [dep for dep in after if dep in spans]
+            deps += [dep for dep in uses if dep in spans and spans[dep][1] <= spans[current][1]]
+            current = max(deps, key=lambda name: spans[name][1], default=None)
+        return path[::-1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
@@ -0,0 +1,161 @@
+"""
+Project Dwight - Prompt Builder
+Packs retrieved chunks into a token-budgeted context for the LLM.
+
+Retrieval returns chunks in rank order. Adjacent chunks of one document
+share up to `chunk_overlap` characters, and the same passage can come back
+from both the intent's buckets and the others. Before the chunks reach the
+prompt, exact and contained duplicates are dropped, overlapping spans are
+trimmed, and chunks are packed best-first until the intent's token budget
+is spent. Tokens are counted with tiktoken; when its encoding is not
+available the count is estimated from the text length.
+"""
+
+from typing import Any, Dict, List, Tuple
+import re
+import structlog
+
+from config import settings
+from core.intent_classifier import IntentType
+
+logger = structlog.get_logger()
+
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+# Shared spans shorter than this are coincidence, not chunk overlap
+MIN_OVERLAP_CHARS = 50
+
+# Rough English average, used without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# tiktoken encoding (lazy loaded); False when unavailable
+_encoder = None
+
+
+def load_tokenizer() -> bool:
+    """
+    Load the token encoding (may download it once).
+
+    Returns:
+        True if tokens are counted exactly, False if they are estimated
+    """
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(settings.prompt_tokenizer)
+            logger.info("Prompt tokenizer loaded", encoding=settings.prompt_tokenizer)
+        except Exception as e:
+            logger.warning("Prompt tokenizer unavailable, estimating tokens", error=str(e))
+            _encoder = False
+    return bool(_encoder)
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the tokens of a text."""
+    if load_tokenizer():
+        return len(_encoder.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, at a sentence or word boundary if possible."""
+    if max_tokens <= 0:
+        return ""
+    if load_tokenizer():
+        tokens = _encoder.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = _encoder.decode(tokens[:max_tokens])
+    else:
+        if len(text) <= max_tokens * CHARS_PER_TOKEN:
+            return text
+        cut = text[:max_tokens * CHARS_PER_TOKEN]
+
+    # Prefer ending on a full sentence, then on a full word
+    boundary = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n"))
+    if boundary > len(cut) // 2:
+        return cut[:boundary + 1].rstrip()
+    boundary = cut.rfind(" ")
+    return cut[:boundary].rstrip() if boundary > 0 else cut
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of left that is also a prefix of right."""
+    if min(len(left), len(right)) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = right[:MIN_OVERLAP_CHARS]
+    start = left.find(probe, max(0, len(left) - len(right)))
+    while start != -1:
+        # The earliest match is the longest overlap
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(probe, start + 1)
+    return 0
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def get_context_budget(intent: IntentType) -> int:
+    """Context token budget for an intent (0 = unlimited)."""
+    return getattr(settings, f"context_token_budget_{intent.value}", 0)
+
+
+def pack_context(chunks: List[str], max_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the LLM context from ranked chunks.
+
+    Args:
+        chunks: Chunk texts, best first
+        max_tokens: Token budget for the context (0 = unlimited)
+
+    Returns:
+        Tuple of (context, stats). stats counts the tokens packed and the
+        chunks dropped as duplicates, trimmed for overlap and skipped for
+        the budget
+    """
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR)
+    selected: List[str] = []
+    selected_keys: List[str] = []
+    stats = {"chunks": 0, "tokens": 0, "duplicates": 0, "trimmed": 0, "over_budget": 0}
+
+    for text in chunks:
+        text = text.strip()
+        key = _normalize(text)
+        if not key or any(key in other for other in selected_keys):
+            stats["duplicates"] += 1
+            continue
+
+        # Cut the span this chunk shares with a neighbour already packed
+        original = text
+        for other in selected:
+            text = text[_overlap(other, text):].lstrip()
+            shared = _overlap(text, other)
+            if shared:
+                text = text[:len(text) - shared].rstrip()
+        if text != original:
+            stats["trimmed"] += 1
+            if len(text) < MIN_OVERLAP_CHARS:
+                stats["duplicates"] += 1
+                continue
+
+        cost = count_tokens(text) + (separator_tokens if selected else 0)
+        if max_tokens and stats["tokens"] + cost > max_tokens:
+            if selected:
+                # A smaller, lower-ranked chunk may still fit
+                stats["over_budget"] += 1
+                continue
+            # Never send an empty context because the best chunk is long
+            text = truncate_to_tokens(text, max_tokens)
+            cost = count_tokens(text)
+
+        selected.append(text)
+        selected_keys.append(key)
+        stats["tokens"] += cost
+
+    stats["chunks"] = len(selected)
+    return CONTEXT_SEPARATOR.join(selected), stats
@@ -3,44 +3,192 @@ Project Dwight - RAG Engine
 Handles document retrieval and context building.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
+import asyncio
+import hashlib
+import io
+import json
 import os
-import pickle
 import structlog
 import faiss
 import numpy as np
 
+try:
+    import fcntl
+except ImportError:  # Windows runs a single uvicorn process, nothing to lock against
+    fcntl = None
+
 from config import settings
-from core.embeddings import get_embedding, get_embeddings_batch
-from core.intent_classifier import IntentType
+from core.embeddings import get_embedding, get_embeddings_batch, get_embedding_dimension
+from core.chunk_store import ChunkStore, ChunkStoreError, CHUNKS_FILE
+from core.lexical_index import LexicalIndex, LEXICAL_FILE, reciprocal_rank_fusion
+from core.prompt_builder import get_context_budget, pack_context
+from core.reranker import rerank
+from services.metrics import CONTEXT_TOKENS, StageTimer
+from core.vector_index import (
+    create_index,
+    create_empty_index,
+    describe_index,
+    index_config,
+    search_params,
+    supports_in_place_update,
+)
+from core.intent_classifier import IntentPrototypes, IntentType
 
 logger = structlog.get_logger()
 
-# Global variables for RAG state
-_faiss_index: Optional[faiss.IndexFlatIP] = None
-_documents: List[Dict[str, Any]] = []
+# Live retrieval state, replaced as a whole on (re)load
+_snapshot: Optional["EngineSnapshot"] = None
 _is_initialized: bool = False
+_preloaded: bool = False
+
+# Serializes reloads; the retrieval path never takes it
+_reload_lock: Optional[asyncio.Lock] = None
+
+
+class IntentPartition:
+    """
+    FAISS search parameters restricting a search to one intent's chunks
+    (or to every other intent's chunks).
+    
+    The selectors are built once per loaded index so retrieval never has to
+    over-fetch and filter results in Python.
+    """
+    
+    def __init__(self, index: faiss.Index, mask: np.ndarray, ids: np.ndarray):
+        ids = ids[mask]
+        self.size = len(ids)
+        self.other_size = len(mask) - len(ids)
+        # Row masks restrict lexical search the same way
+        self.mask = mask
+        self.other_mask = ~mask
+        # Keep the selectors referenced for as long as the parameters live
+        self._selector = faiss.IDSelectorBatch(ids.astype(np.int64))
+        self._other_selector = faiss.IDSelectorNot(self._selector)
+        self.params = search_params(index, self._selector)
+        self.other_params = search_params(index, self._other_selector)
+
+
+def _build_partitions(index: faiss.Index, store: Optional[ChunkStore]) -> Dict[str, IntentPartition]:
+    """Build one search partition per intent present in the chunk store."""
+    if store is None or len(store) == 0:
+        return {}
+    codes = store.codes("intent")
+    return {
+        intent: IntentPartition(index, codes == code, store.ids)
+        for code, intent in enumerate(store.categories["intent"])
+    }
+
+
+class EngineSnapshot:
+    """
+    Everything retrieval reads, built once and never mutated.
+    
+    Reloading builds a new snapshot next to the live one and swaps the
+    module reference in a single assignment. Requests hold on to the
+    snapshot they started with, so in-flight retrievals finish on the old
+    index and the read path needs no lock.
+    """
+    
+    __slots__ = ("index", "store", "lexical", "partitions", "prototypes", "kb_version")
+    
+    def __init__(self, index: faiss.Index, store: Optional[ChunkStore], lexical: Optional[LexicalIndex]):
+        self.index = index
+        self.store = store
+        self.lexical = lexical
+        self.partitions = _build_partitions(index, store)
+        self.prototypes = _build_intent_prototypes(store)
+        self.kb_version = _compute_kb_version(store)
+
+
+def _build_intent_prototypes(store: Optional[ChunkStore]) -> Optional[IntentPrototypes]:
+    """Build the intent prototypes from the stored chunk vectors (None if unavailable)."""
+    if store is None or len(store) == 0 or settings.intent_classifier != "prototype":
+        return None
+    vectors_file = settings.vector_store_dir / VECTORS_FILE
+    try:
+        vectors = np.load(vectors_file, mmap_mode="r")
+    except (OSError, ValueError) as e:
+        logger.warning("Chunk vectors unavailable, intent prototypes disabled", error=str(e))
+        return None
+    if len(vectors) != len(store):
+        logger.warning("Chunk vectors do not match the chunk store, intent prototypes disabled")
+        return None
+    
+    categories = np.asarray(store.categories["bucket"], dtype=object)
+    prototypes = IntentPrototypes.build(
+        vectors,
+        categories[store.codes("bucket")],
+        BUCKET_INTENT_MAP,
+        per_bucket=settings.intent_prototypes_per_bucket
+    )
+    if prototypes is not None:
+        logger.info("Intent prototypes built", prototypes=len(prototypes.intents))
+    return prototypes
+
+
+def _activate(index: faiss.Index, store: Optional[ChunkStore], lexical: Optional[LexicalIndex] = None) -> EngineSnapshot:
+    """Make an index, its chunk store and lexical index the live retrieval state."""
+    global _snapshot
+    snapshot = EngineSnapshot(index, store, lexical)
+    _snapshot = snapshot
+    return snapshot
+
+
+def _compute_kb_version(store: Optional[ChunkStore]) -> str:
+    """Fingerprint the indexed chunks so caches can detect a rebuild."""
+    digest = hashlib.sha256()
+    digest.update(settings.embedding_model.encode("utf-8"))
+    digest.update((store.checksum if store is not None else "").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def get_intent_prototypes() -> Optional[IntentPrototypes]:
+    """Get the intent prototypes of the currently loaded knowledge base."""
+    snapshot = _snapshot
+    return snapshot.prototypes if snapshot is not None else None
+
+
+def get_index_size() -> int:
+    """Get the number of chunks in the live index."""
+    snapshot = _snapshot
+    return snapshot.index.ntotal if snapshot is not None else 0
+
+
+def get_kb_version() -> str:
+    """Get the version of the currently loaded knowledge base."""
+    snapshot = _snapshot
+    return snapshot.kb_version if snapshot is not None else ""
+
+
+# Files that make up the on-disk vector store
+INDEX_FILE = "index.faiss"
+VECTORS_FILE = "vectors.npy"
+MANIFEST_FILE = "manifest.json"
+BUILD_LOCK_FILE = ".build.lock"
+MANIFEST_VERSION = 2
+
+# Knowledge base buckets and the intent each one serves
+BUCKET_INTENT_MAP = {
+    "1_customer_support": IntentType.SUPPORT,
+    "2_services_pricing": IntentType.SUPPORT,  # Can be both support and sales
+    "3_sales_process": IntentType.SALES,
+    "4_internal_policies": IntentType.INTERNAL,
+}
 
 
 async def initialize_rag_engine():
     """
     Initialize the RAG engine by loading or building the vector store.
     """
-    global _faiss_index, _documents, _is_initialized
+    global _is_initialized
     
-    vector_store_path = settings.vector_store_dir
-    index_file = vector_store_path / "index.faiss"
-    docs_file = vector_store_path / "documents.pkl"
-    
-    if index_file.exists() and docs_file.exists():
-        # Load existing index
-        logger.info("Loading existing FAISS index")
-        _faiss_index = faiss.read_index(str(index_file))
-        with open(docs_file, "rb") as f:
-            _documents = pickle.load(f)
-        logger.info("FAISS index loaded", num_documents=len(_documents))
-    else:
+    if _preloaded:
+        # Loaded in the parent process before workers were forked
+        logger.info("Using preloaded vector store", kb_version=get_kb_version())
+    elif not await asyncio.to_thread(load_vector_store):
         # Build new index
         logger.info("Building new FAISS index")
         await build_vector_store()
@@ -48,26 +196,425 @@ async def initialize_rag_engine():
     _is_initialized = True
 
 
-async def build_vector_store():
+def load_vector_store() -> bool:
+    """
+    Load the persisted vector store and make it live, without building.
+    
+    Returns:
+        True if a usable store matching the current settings was loaded
+    """
+    vector_store_path = settings.vector_store_dir
+    if not (vector_store_path / INDEX_FILE).exists() or not (vector_store_path / CHUNKS_FILE).exists():
+        return False
+    
+    logger.info("Loading existing FAISS index", mmap=settings.index_mmap)
+    try:
+        index, store, lexical = _load_vector_store(vector_store_path, mmap=settings.index_mmap)
+    except ChunkStoreError as e:
+        logger.error("Chunk store unusable, rebuilding", error=str(e))
+        return False
+    
+    # A changed INDEX_TYPE rebuilds the index from the stored vectors
+    manifest = _read_manifest(vector_store_path)
+    if manifest is not None and manifest.get("index") != index_config():
+        logger.info("Index settings changed, rebuilding index", index=index_config())
+        return False
+    
+    snapshot = _activate(index, store, lexical)
+    logger.info(
+        "FAISS index loaded",
+        num_documents=len(snapshot.store),
+        index_type=describe_index(snapshot.index),
+        kb_version=snapshot.kb_version
+    )
+    return True
+
+
+def preload_vector_store() -> bool:
+    """
+    Load the vector store in a parent process before it forks workers.
+    
+    The snapshot (memory-mapped index and chunk store) is inherited by
+    every worker, whose initialize_rag_engine then skips loading.
+    """
+    global _preloaded
+    _preloaded = load_vector_store()
+    return _preloaded
+
+
+def _read_index(index_file: Path, mmap: bool = False) -> faiss.Index:
+    """
+    Read a FAISS index, optionally memory-mapped.
+    
+    With mmap the vector codes stay in the file-backed page cache, shared
+    by every process that maps the same file, instead of being copied into
+    each process. Mapped indexes are read-only. FAISS releases before 1.11
+    cannot map indexes and read a private copy instead.
+    """
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    if mmap and mmap_flag is None:
+        logger.warning("FAISS version cannot memory-map indexes, reading into memory", faiss_version=faiss.__version__)
+    elif mmap:
+        return faiss.read_index(str(index_file), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+    return faiss.read_index(str(index_file))
+
+
+def _serving_index(index: faiss.Index) -> faiss.Index:
+    """Index to serve from: the mapped on-disk copy when INDEX_MMAP is on."""
+    if not settings.index_mmap:
+        return index
+    return _read_index(settings.vector_store_dir / INDEX_FILE, mmap=True)
+
+
+def _load_vector_store(vector_store_path: Path, mmap: bool = False):
+    """
+    Load the FAISS index, memory-map its chunk store and load the lexical index.
+    
+    Stores written before chunk ids existed use a plain index whose ids are
+    row positions; their chunk store uses the same positions as ids.
+    
+    Args:
+        vector_store_path: Directory of the vector store
+        mmap: Memory-map the index (read-only, for serving)
+    """
+    index = _read_index(vector_store_path / INDEX_FILE, mmap=mmap)
+    store = ChunkStore.open(
+        vector_store_path / CHUNKS_FILE,
+        verify=settings.chunk_store_verify_checksum
+    )
+    if index.ntotal != len(store):
+        raise ChunkStoreError("Index and chunk store sizes differ")
+    return index, store, _load_lexical_index(vector_store_path, store)
+
+
+def _load_lexical_index(vector_store_path: Path, store: ChunkStore) -> LexicalIndex:
+    """Load the lexical index, rebuilding it from the chunk store if it is missing or stale."""
+    lexical_file = vector_store_path / LEXICAL_FILE
+    if lexical_file.exists():
+        try:
+            lexical = LexicalIndex.load(lexical_file)
+            if (lexical.num_docs, lexical.k1, lexical.b) == (len(store), settings.bm25_k1, settings.bm25_b):
+                return lexical
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable lexical index", error=str(e))
+    
+    logger.info("Building lexical index", num_documents=len(store))
+    lexical = _build_lexical_index(store.text(row) for row in range(len(store)))
+    lexical.save(lexical_file)
+    return lexical
+
+
+def _build_lexical_index(texts) -> LexicalIndex:
+    """Build the BM25 index over chunk texts in chunk store row order."""
+    return LexicalIndex.build(texts, k1=settings.bm25_k1, b=settings.bm25_b)
+
+
+def _hash_text(text: str) -> str:
+    """Content hash used by the ingestion manifest."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _chunk_id(file_key: str, content: str, occurrence: int) -> int:
+    """
+    Derive a stable FAISS id for a chunk.
+    
+    The id only depends on the file and the chunk text, so unchanged chunks
+    keep their id (and their vector) across ingestion runs.
+    """
+    digest = hashlib.sha256(f"{file_key}\0{occurrence}\0{content}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+def _read_manifest(vector_store_path: Path) -> Optional[Dict[str, Any]]:
+    """Read the ingestion manifest if it matches the current settings."""
+    manifest_file = vector_store_path / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning("Ignoring unreadable manifest", error=str(e))
+        return None
+    
+    expected = {
+        "version": MANIFEST_VERSION,
+        "embedding_model": settings.embedding_model,
+        "chunk_size": settings.chunk_size,
+        "chunk_overlap": settings.chunk_overlap,
+    }
+    if any(manifest.get(key) != value for key, value in expected.items()):
+        logger.info("Manifest settings changed, full rebuild required")
+        return None
+    return manifest
+
+
+@contextmanager
+def _build_lock(blocking: bool = True):
+    """
+    Hold the cross-process lock on the vector store directory.
+    
+    Gunicorn workers share one vector store directory, so builds (and
+    reloads from disk) are serialized across processes with an flock.
+    
+    Args:
+        blocking: Wait for the lock; otherwise yield False if another
+            process holds it
+    
+    Yields:
+        True if the lock is held
+    """
+    if fcntl is None:
+        yield True
+        return
+    
+    vector_store_path = settings.vector_store_dir
+    vector_store_path.mkdir(parents=True, exist_ok=True)
+    with open(vector_store_path / BUILD_LOCK_FILE, "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _is_build_running_elsewhere() -> bool:
+    """Check whether another process holds the build lock."""
+    with _build_lock(blocking=False) as acquired:
+        return not acquired
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write a file through a per-process temp file and an atomic rename."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+async def build_vector_store(incremental: bool = True) -> Dict[str, int]:
     """
     Build the vector store from source documents.
+    
+    With an existing store and a matching manifest only added or changed
+    chunks are embedded, and chunks that disappeared are removed from the
+    index. Otherwise every chunk is embedded from scratch. Normalized
+    vectors are kept in vectors.npy, so changing the index type rebuilds
+    the index without re-embedding anything.
+    
+    File IO, chunking and index building run in worker threads, so a
+    reload keeps serving requests from the current snapshot meanwhile.
+    
+    Only one process builds at a time (see _build_lock); a process that
+    waited for another one's build usually finds the store up to date.
+    
+    Args:
+        incremental: Reuse unchanged chunks from the existing store
+        
+    Returns:
+        Counts of added, removed and unchanged chunks
+    """
+    with ExitStack() as stack:
+        await asyncio.to_thread(stack.enter_context, _build_lock())
+        return await _build_vector_store(incremental)
+
+
+async def _build_vector_store(incremental: bool) -> Dict[str, int]:
+    """Build the vector store while holding the build lock."""
+    plan = await asyncio.to_thread(_plan_build, incremental)
+    stats = plan["stats"]
+    
+    if not plan["documents"]:
+        logger.warning("No documents found to index")
+        _activate(create_empty_index(await get_embedding_dimension()), None)
+        return stats
+    
+    if plan["up_to_date"]:
+        index = await asyncio.to_thread(_serving_index, plan["index"])
+        _activate(index, plan["existing_store"], plan["existing_lexical"])
+        logger.info("Vector store is up to date", num_documents=len(plan["existing_store"]))
+        return stats
+    
+    new_vectors = await _embed_documents(plan["to_embed"])
+    index, store, lexical = await asyncio.to_thread(_write_vector_store, plan, new_vectors)
+    snapshot = _activate(index, store, lexical)
+    
+    logger.info(
+        "Vector store built and saved",
+        num_documents=len(snapshot.store),
+        index_type=describe_index(index),
+        kb_version=snapshot.kb_version,
+        **stats
+    )
+    return stats
+
+
+def _plan_build(incremental: bool) -> Dict[str, Any]:
+    """
+    Load the reusable parts of the existing store and chunk the sources.
+    
+    Returns:
+        Build plan: documents, files, chunks to embed, ids to remove,
+        the existing index/store/vectors and stats
+    """
+    vector_store_path = settings.vector_store_dir
+    config = index_config()
+    
+    # Start from the existing store when it can be updated in place
+    index = None
+    existing_store: Optional[ChunkStore] = None
+    existing_lexical: Optional[LexicalIndex] = None
+    existing_vectors: Optional[np.ndarray] = None
+    manifest = _read_manifest(vector_store_path) if incremental else None
+    if manifest is not None:
+        try:
+            index, existing_store, existing_lexical = _load_vector_store(vector_store_path)
+            existing_vectors = np.load(vector_store_path / VECTORS_FILE, mmap_mode="r")
+            if len(existing_vectors) != len(existing_store):
+                raise ChunkStoreError("Vectors and chunk store sizes differ")
+        except (ChunkStoreError, OSError, ValueError, RuntimeError) as e:
+            logger.info("Existing store cannot be reused, full rebuild required", error=str(e))
+            index, existing_store, existing_lexical, existing_vectors, manifest = None, None, None, None, None
+    
+    existing_ids = set(existing_store.ids.tolist()) if existing_store is not None else set()
+    
+    old_files = manifest["files"] if manifest else {}
+    
+    # Load and chunk documents, reusing chunks of files that did not change
+    documents: List[Dict[str, Any]] = []
+    files: Dict[str, Dict[str, Any]] = {}
+    files_changed = 0
+    
+    for bucket_name, intent, file_path in _iter_source_files():
+        file_key = f"{bucket_name}/{file_path.name}"
+        try:
+            content = file_path.read_text(encoding="utf-8")
+        except Exception as e:
+            logger.error("Error processing file", file=str(file_path), error=str(e))
+            continue
+        
+        file_hash = _hash_text(content)
+        previous = old_files.get(file_key)
+        if previous and previous["hash"] == file_hash:
+            rows = existing_store.rows_for_ids([chunk["id"] for chunk in previous["chunks"]])
+            file_docs = [
+                {**existing_store.get(int(row)), "hash": chunk["hash"]}
+                for row, chunk in zip(rows, previous["chunks"])
+            ]
+        else:
+            file_docs = _chunk_file(bucket_name, intent, file_path, content)
+            files_changed += 1
+        
+        documents.extend(file_docs)
+        files[file_key] = {
+            "hash": file_hash,
+            "chunks": [{"id": doc["id"], "hash": doc["hash"]} for doc in file_docs],
+        }
+    
+    new_ids = {doc["id"] for doc in documents}
+    removed_ids = [chunk_id for chunk_id in existing_ids if chunk_id not in new_ids]
+    to_embed = [doc for doc in documents if doc["id"] not in existing_ids]
+    index_changed = manifest is not None and manifest.get("index") != config
+    
+    return {
+        "config": config,
+        "index": index,
+        "index_changed": index_changed,
+        "existing_store": existing_store,
+        "existing_lexical": existing_lexical,
+        "existing_vectors": existing_vectors,
+        "documents": documents,
+        "files": files,
+        "new_ids": new_ids,
+        "removed_ids": removed_ids,
+        "to_embed": to_embed,
+        "up_to_date": (
+            manifest is not None and not to_embed and not removed_ids
+            and files == old_files and not index_changed
+        ),
+        "stats": {
+            "added": len(to_embed),
+            "removed": len(removed_ids),
+            "unchanged": len(documents) - len(to_embed),
+            "files_changed": files_changed,
+        },
+    }
+
+
+def _write_vector_store(plan: Dict[str, Any], new_vectors: np.ndarray) -> Tuple[faiss.Index, ChunkStore, LexicalIndex]:
+    """
+    Update or rebuild the index from a build plan and save every store file.
+    
+    Returns:
+        Tuple of (index, chunk store, lexical index) ready to activate
     """
-    global _faiss_index, _documents
+    vector_store_path = settings.vector_store_dir
+    config = plan["config"]
+    index = plan["index"]
+    documents = plan["documents"]
+    to_embed = plan["to_embed"]
+    removed_ids = plan["removed_ids"]
+    existing_store = plan["existing_store"]
+    existing_vectors = plan["existing_vectors"]
+    
+    # Assemble every vector in chunk store row order (ascending id)
+    ids = np.array(sorted(plan["new_ids"]), dtype=np.int64)
+    vectors = np.empty((len(ids), new_vectors.shape[1] if len(to_embed) else existing_vectors.shape[1]), dtype=np.float32)
+    old_rows = existing_store.rows_for_ids(ids) if existing_store is not None else np.full(len(ids), -1)
+    reused = old_rows >= 0
+    if reused.any():
+        vectors[reused] = existing_vectors[old_rows[reused]]
+    if len(to_embed):
+        positions = np.searchsorted(ids, [doc["id"] for doc in to_embed])
+        vectors[positions] = new_vectors
+    
+    if index is not None and not plan["index_changed"] and (not removed_ids or supports_in_place_update(index)):
+        # Update the loaded index in place (the live snapshot has its own copy)
+        if removed_ids:
+            index.remove_ids(np.array(removed_ids, dtype=np.int64))
+            logger.info("Removed stale chunks", count=len(removed_ids))
+        if len(to_embed):
+            index.add_with_ids(new_vectors, np.array([doc["id"] for doc in to_embed], dtype=np.int64))
+    else:
+        logger.info("Building index", index_type=config["type"], num_vectors=len(vectors))
+        index = create_index(vectors, ids, config)
     
-    # Load and chunk documents
-    documents = await load_and_chunk_documents()
+    # Lexical index rows follow the chunk store (ascending id)
+    documents = sorted(documents, key=lambda doc: doc["id"])
+    lexical = _build_lexical_index(doc["content"] for doc in documents)
     
+    # Save index, chunks, vectors and manifest (manifest last, so a partial write forces a rebuild).
+    # Files are replaced by rename, so a live snapshot keeps reading its old mapped files.
+    vector_store_path.mkdir(parents=True, exist_ok=True)
+    _write_atomic(vector_store_path / INDEX_FILE, faiss.serialize_index(index).tobytes())
+    ChunkStore.write(vector_store_path / CHUNKS_FILE, documents)
+    lexical.save(vector_store_path / LEXICAL_FILE)
+    vectors_buffer = io.BytesIO()
+    np.save(vectors_buffer, vectors)
+    _write_atomic(vector_store_path / VECTORS_FILE, vectors_buffer.getvalue())
+    _write_atomic(vector_store_path / MANIFEST_FILE, json.dumps({
+        "version": MANIFEST_VERSION,
+        "embedding_model": settings.embedding_model,
+        "chunk_size": settings.chunk_size,
+        "chunk_overlap": settings.chunk_overlap,
+        "index": config,
+        "files": plan["files"],
+    }, indent=2).encode("utf-8"))
+    
+    return _serving_index(index), ChunkStore.open(vector_store_path / CHUNKS_FILE, verify=False), lexical
+
+
+async def _embed_documents(documents: List[Dict[str, Any]]) -> np.ndarray:
+    """Embed chunk texts in batches and L2-normalize them."""
     if not documents:
-        logger.warning("No documents found to index")
-        _documents = []
-        _faiss_index = faiss.IndexFlatIP(1536)  # OpenAI embedding dimension
-        return
+        return np.empty((0, 0), dtype=np.float32)
     
-    # Generate embeddings
     logger.info("Generating embeddings", num_docs=len(documents))
     texts = [doc["content"] for doc in documents]
     
-    # Process in batches to avoid rate limits
+    # Process in batches to bound memory per encode call
     batch_size = 100
     all_embeddings = []
     
@@ -77,25 +624,45 @@ async def build_vector_store():
         all_embeddings.extend(embeddings)
         logger.info("Processed batch", batch_num=i // batch_size + 1)
     
-    # Create FAISS index
     embeddings_array = np.array(all_embeddings).astype('float32')
     faiss.normalize_L2(embeddings_array)
+    return embeddings_array
+
+
+def _iter_source_files():
+    """Yield (bucket, intent, path) for every markdown file in the data buckets."""
+    data_dir = settings.data_dir_path
+    for bucket_name, intent in BUCKET_INTENT_MAP.items():
+        bucket_path = data_dir / bucket_name
+        if not bucket_path.exists():
+            continue
+        for file_path in sorted(bucket_path.glob("*.md")):
+            yield bucket_name, intent, file_path
+
+
+def _chunk_file(bucket_name: str, intent: IntentType, file_path: Path, content: str) -> List[Dict[str, Any]]:
+    """Split one file into chunk records with stable ids and content hashes."""
+    file_key = f"{bucket_name}/{file_path.name}"
+    chunks = chunk_text(content, file_path.name)
     
-    dimension = embeddings_array.shape[1]
-    _faiss_index = faiss.IndexFlatIP(dimension)
-    _faiss_index.add(embeddings_array)
-    
-    _documents = documents
-    
-    # Save index
-    vector_store_path = settings.vector_store_dir
-    vector_store_path.mkdir(parents=True, exist_ok=True)
-    
-    faiss.write_index(_faiss_index, str(vector_store_path / "index.faiss"))
-    with open(vector_store_path / "documents.pkl", "wb") as f:
-        pickle.dump(_documents, f)
+    documents = []
+    seen: Dict[str, int] = {}
+    for i, chunk in enumerate(chunks):
+        # Repeated identical chunks in one file still need distinct ids
+        occurrence = seen.get(chunk, 0)
+        seen[chunk] = occurrence + 1
+        documents.append({
+            "id": _chunk_id(file_key, chunk, occurrence),
+            "hash": _hash_text(chunk),
+            "content": chunk,
+            "source": file_path.name,
+            "bucket": bucket_name,
+            "intent": intent.value,
+            "chunk_index": i,
+        })
     
-    logger.info("Vector store built and saved", num_documents=len(_documents))
+    logger.debug("Processed file", file=file_path.name, chunks=len(chunks))
+    return documents
 
 
 async def load_and_chunk_documents() -> List[Dict[str, Any]]:
@@ -103,39 +670,13 @@ async def load_and_chunk_documents() -> List[Dict[str, Any]]:
     Load documents from data directory and split into chunks.
     """
     documents = []
-    data_dir = settings.data_dir_path
-    
-    # Define bucket mappings
-    bucket_intent_map = {
-        "1_customer_support": IntentType.SUPPORT,
-        "2_services_pricing": IntentType.SUPPORT,  # Can be both support and sales
-        "3_sales_process": IntentType.SALES,
-        "4_internal_policies": IntentType.INTERNAL,
-    }
     
-    for bucket_name, intent in bucket_intent_map.items():
-        bucket_path = data_dir / bucket_name
-        if not bucket_path.exists():
-            continue
-            
-        for file_path in bucket_path.glob("*.md"):
-            try:
-                content = file_path.read_text(encoding="utf-8")
-                chunks = chunk_text(content, file_path.name)
-                
-                for i, chunk in enumerate(chunks):
-                    documents.append({
-                        "content": chunk,
-                        "source": file_path.name,
-                        "bucket": bucket_name,
-                        "intent": intent.value,
-                        "chunk_index": i,
-                    })
-                    
-                logger.debug("Processed file", file=file_path.name, chunks=len(chunks))
-                
-            except Exception as e:
-                logger.error("Error processing file", file=str(file_path), error=str(e))
+    for bucket_name, intent, file_path in _iter_source_files():
+        try:
+            content = file_path.read_text(encoding="utf-8")
+            documents.extend(_chunk_file(bucket_name, intent, file_path, content))
+        except Exception as e:
+            logger.error("Error processing file", file=str(file_path), error=str(e))
     
     logger.info("Documents loaded", total_chunks=len(documents))
     return documents
@@ -194,6 +735,16 @@ async def retrieve_context(query: str, intent: IntentType, top_k: int = None) ->
     """
     Retrieve relevant context for a query.
     
+    Returns up to top_k chunks from the buckets serving the query's intent,
+    followed by up to `retrieval_other_top_k` chunks from the other buckets.
+    Dense results must clear the similarity threshold. With hybrid search
+    enabled they are fused with BM25 results by reciprocal rank, so chunks
+    that match exact terms such as "AWB" or "FCL" are retrieved too. With
+    reranking enabled, `rerank_candidates` chunks of the first group are
+    scored by a cross-encoder and only the best `rerank_top_n` are kept.
+    The chunks are then deduplicated and packed, best first, into the
+    intent's token budget (see core/prompt_builder.py).
+    
     Args:
         query: User query
         intent: Classified intent type
@@ -202,13 +753,13 @@ async def retrieve_context(query: str, intent: IntentType, top_k: int = None) ->
     Returns:
         Combined context string from relevant documents
     """
-    global _faiss_index, _documents
-    
-    if not _is_initialized or _faiss_index is None:
+    # Read the snapshot once: a concurrent reload cannot change it under us
+    snapshot = _snapshot
+    if not _is_initialized or snapshot is None or snapshot.store is None:
         logger.warning("RAG engine not initialized")
         return ""
     
-    if _faiss_index.ntotal == 0:
+    if snapshot.index.ntotal == 0:
         logger.warning("No documents in index")
         return ""
     
@@ -219,53 +770,267 @@ async def retrieve_context(query: str, intent: IntentType, top_k: int = None) ->
     query_vector = np.array([query_embedding]).astype('float32')
     faiss.normalize_L2(query_vector)
     
-    # Search
-    scores, indices = _faiss_index.search(query_vector, min(top_k * 2, _faiss_index.ntotal))
-    
-    # Filter by intent and similarity threshold
-    relevant_docs = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx < 0 or score < settings.similarity_threshold:
-            continue
-            
-        doc = _documents[idx]
-        
-        # Prioritize documents matching the intent, but include relevant ones from other buckets
-        intent_match = doc["intent"] == intent.value
-        
-        relevant_docs.append({
-            "content": doc["content"],
-            "source": doc["source"],
-            "score": float(score),
-            "intent_match": intent_match
-        })
-    
-    # Sort by intent match first, then by score
-    relevant_docs.sort(key=lambda x: (x["intent_match"], x["score"]), reverse=True)
-    
-    # Take top_k results
-    top_docs = relevant_docs[:top_k]
+    rows, intent_match, texts, lexical_hits, reranked = await _rank_chunks(
+        snapshot, query, query_vector, intent, top_k
+    )
     
-    if not top_docs:
+    if len(rows) == 0:
         logger.info("No relevant documents found", query=query[:50])
         return ""
     
-    # Combine context
-    context_parts = []
-    for doc in top_docs:
-        context_parts.append(doc["content"])
-    
-    context = "\n\n---\n\n".join(context_parts)
+    # Combine context within the intent's token budget
+    with StageTimer("prompt_build"):
+        context, packing = pack_context(
+            [texts.get(int(row)) or snapshot.store.text(row) for row in rows],
+            get_context_budget(intent)
+        )
+    CONTEXT_TOKENS.inc(intent.value, amount=packing["tokens"])
     
     logger.info(
         "Context retrieved",
-        num_docs=len(top_docs),
-        avg_score=sum(d["score"] for d in top_docs) / len(top_docs)
+        num_docs=len(rows),
+        intent_matches=int(intent_match.sum()),
+        lexical_hits=lexical_hits,
+        reranked=reranked,
+        **{f"packed_{name}": value for name, value in packing.items()}
     )
     
     return context
 
 
+async def _rank_chunks(snapshot: EngineSnapshot, query: str, query_vector: np.ndarray, intent: IntentType, top_k: int):
+    """
+    Rank the chunks retrieved for a query, best first, before packing.
+    
+    Returns:
+        Tuple of (rows, intent_match, texts, lexical_hits, reranked).
+        intent_match flags the rows from the intent's own buckets; texts
+        holds the chunk texts already read, by row
+    """
+    candidate_k = max(top_k, settings.rerank_candidates) if settings.rerank_enabled else top_k
+    
+    # Search the intent's partition, then the rest of the corpus
+    groups, lexical_hits = _search_partitioned(snapshot, query, query_vector, intent, candidate_k)
+    
+    # Rerank the first group's candidates, or cut them back to top_k
+    first_rows, first_is_own = groups[0]
+    store = snapshot.store
+    texts = {int(row): store.text(row) for row in first_rows}
+    order = None
+    if settings.rerank_enabled and len(first_rows) > 1:
+        with StageTimer("rerank"):
+            order = await rerank(
+                query,
+                store.ids[first_rows],
+                [texts[int(row)] for row in first_rows],
+                min(settings.rerank_top_n, top_k)
+            )
+    groups[0] = (first_rows[order] if order is not None else first_rows[:top_k], first_is_own)
+    
+    rows = np.concatenate([group_rows for group_rows, _ in groups])
+    intent_match = np.concatenate([np.full(len(group_rows), is_own) for group_rows, is_own in groups])
+    return rows, intent_match, texts, lexical_hits, order is not None
+
+
+def _search_partitioned(snapshot: EngineSnapshot, query: str, query_vector: np.ndarray, intent: IntentType, top_k: int):
+    """
+    Search the index restricted by intent.
+    
+    Returns:
+        Tuple of (groups, lexical_hits). groups is a list of (rows, is_own)
+        pairs, the intent's own chunks first, each in rank order;
+        lexical_hits counts the lexical candidates considered
+    """
+    partition = snapshot.partitions.get(intent.value)
+    if partition is None:
+        # No chunks for this intent: everything is "other"
+        searches = [(top_k, snapshot.index.ntotal, search_params(snapshot.index), None, False)]
+    else:
+        searches = [
+            (top_k, partition.size, partition.params, partition.mask, True),
+            (settings.retrieval_other_top_k, partition.other_size, partition.other_params, partition.other_mask, False),
+        ]
+    
+    groups, lexical_hits = [], 0
+    for k, size, params, mask, is_own in searches:
+        rows, hits = _search_group(snapshot, query, query_vector, min(k, size), size, params, mask)
+        groups.append((rows, is_own))
+        lexical_hits += hits
+    return groups, lexical_hits
+
+
+def _search_group(
+    snapshot: EngineSnapshot,
+    query: str,
+    query_vector: np.ndarray,
+    k: int,
+    size: int,
+    params,
+    mask: Optional[np.ndarray]
+):
+    """
+    Rank one partition group: dense search, fused with BM25 when enabled.
+    
+    Returns:
+        Tuple of (rows, lexical_hits)
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), 0
+    
+    hybrid = settings.hybrid_search_enabled and snapshot.lexical is not None
+    fetch_k = min(max(k, settings.hybrid_candidates), size) if hybrid else k
+    
+    with StageTimer("faiss_search"):
+        scores, ids = snapshot.index.search(query_vector, fetch_k, params=params)
+    rows = snapshot.store.rows_for_ids(ids[0])
+    dense_rows = rows[(rows >= 0) & (scores[0] >= settings.similarity_threshold)]
+    if not hybrid:
+        return dense_rows[:k], 0
+    
+    with StageTimer("lexical_search"):
+        lexical_rows, _ = snapshot.lexical.search(query, fetch_k, mask)
+    fused_rows, _ = reciprocal_rank_fusion([dense_rows, lexical_rows], settings.rrf_k)
+    return fused_rows[:k], len(lexical_rows)
+
+
+def warm_up_search():
+    """
+    Run one search against the live snapshot so the index, lexical postings
+    and mapped chunk pages are warm before the first request.
+    """
+    snapshot = _snapshot
+    if snapshot is None or snapshot.index.ntotal == 0:
+        return
+    query_vector = np.ones((1, snapshot.index.d), dtype=np.float32)
+    faiss.normalize_L2(query_vector)
+    _, ids = snapshot.index.search(query_vector, min(settings.top_k_results, snapshot.index.ntotal))
+    if snapshot.lexical is not None:
+        snapshot.lexical.search("shipment tracking", settings.top_k_results)
+    if snapshot.store is not None:
+        for row in snapshot.store.rows_for_ids(ids[0]):
+            if row >= 0:
+                snapshot.store.text(row)
+
+
 async def is_rag_ready() -> bool:
     """Check if RAG engine is ready."""
-    return _is_initialized and _faiss_index is not None
+    return _is_initialized and _snapshot is not None
+
+
+def is_reload_in_progress() -> bool:
+    """Check if a knowledge base reload is running."""
+    return _reload_lock is not None and _reload_lock.locked()
+
+
+async def reload_rag_engine() -> Dict[str, Any]:
+    """
+    Reload the knowledge base without restarting the service.
+    
+    Picks up changed source documents (embedding only new chunks) or a
+    store written by an external ingestion run, then swaps the live
+    snapshot. If anything fails, the current snapshot keeps serving.
+    
+    Returns:
+        Ingestion stats with the previous and new knowledge base versions
+    """
+    global _reload_lock, _watch_signature
+    if _reload_lock is None:
+        _reload_lock = asyncio.Lock()
+    
+    async with _reload_lock:
+        previous_version = get_kb_version()
+        logger.info("Reloading knowledge base", kb_version=previous_version)
+        stats = await build_vector_store()
+        _watch_signature = await asyncio.to_thread(_knowledge_base_signature)
+        
+        result = {
+            **stats,
+            "previous_kb_version": previous_version,
+            "kb_version": get_kb_version(),
+        }
+        logger.info("Knowledge base reloaded", **result)
+        return result
+
+
+# Last seen state of the source documents and the store manifest
+_watch_signature: Optional[Tuple] = None
+
+
+async def reload_from_disk() -> bool:
+    """
+    Swap in the store another process just built, without building.
+    
+    Returns:
+        True if the persisted store was loaded
+    """
+    global _reload_lock, _watch_signature
+    if _reload_lock is None:
+        _reload_lock = asyncio.Lock()
+    
+    async with _reload_lock:
+        with ExitStack() as stack:
+            # Wait for a build in progress so its files are read as a whole
+            await asyncio.to_thread(stack.enter_context, _build_lock())
+            loaded = await asyncio.to_thread(load_vector_store)
+        _watch_signature = await asyncio.to_thread(_knowledge_base_signature)
+    
+    if loaded:
+        logger.info("Knowledge base reloaded from disk", kb_version=get_kb_version())
+    else:
+        logger.warning("Persisted vector store unusable, keeping current snapshot")
+    return loaded
+
+
+def _knowledge_base_signature() -> Tuple:
+    """
+    Cheap fingerprint (paths, sizes, mtimes) of the sources and the manifest.
+    
+    Returns:
+        Tuple of (sources signature, manifest signature)
+    """
+    def stat_entry(path: Path) -> Tuple:
+        try:
+            stat = path.stat()
+            return (str(path), stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return (str(path), None, None)
+    
+    sources = tuple(stat_entry(file_path) for _, _, file_path in _iter_source_files())
+    return sources, stat_entry(settings.vector_store_dir / MANIFEST_FILE)
+
+
+async def watch_knowledge_base(interval: float):
+    """
+    Poll the data and vector store directories and reload on changes.
+    
+    Every gunicorn worker runs a watcher, but only one of them rebuilds
+    after a source change: the others see the build lock taken and reload
+    the written store once its manifest changes.
+    
+    Runs until cancelled (started by the application lifespan when
+    `reload_watch_interval` is set).
+    """
+    global _watch_signature
+    if _watch_signature is None:
+        _watch_signature = await asyncio.to_thread(_knowledge_base_signature)
+    logger.info("Watching knowledge base for changes", interval=interval)
+    
+    while True:
+        await asyncio.sleep(interval)
+        signature = await asyncio.to_thread(_knowledge_base_signature)
+        if signature == _watch_signature or is_reload_in_progress():
+            continue
+        sources, manifest = signature
+        try:
+            if sources != _watch_signature[0]:
+                if await asyncio.to_thread(_is_build_running_elsewhere):
+                    # Pick up that build through the manifest on a later poll
+                    _watch_signature = (sources, _watch_signature[1])
+                    continue
+                await reload_rag_engine()
+            else:
+                await reload_from_disk()
+        except Exception as e:
+            # Keep serving the current snapshot and retry on the next change
+            _watch_signature = signature
+            logger.error("Knowledge base reload failed", error=str(e))
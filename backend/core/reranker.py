@@ -0,0 +1,186 @@
+"""
+Project Dwight - Reranker
+Optional cross-encoder reranking of retrieved chunks.
+
+The candidates of a query are scored in one batched forward pass of a small
+local cross-encoder, so fewer, better chunks reach the LLM. Scoring runs on
+a dedicated worker thread under a per-request time budget. When the budget
+is exceeded the original retrieval order is used; a job still queued is
+cancelled, and one already running still lands its scores in the cache.
+Scores are cached per (normalized query, chunk id); chunk ids are
+content-derived, so cached scores stay valid across knowledge base rebuilds.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import time
+import numpy as np
+import structlog
+
+from config import settings
+from core.embeddings import normalize_query
+
+logger = structlog.get_logger()
+
+# Lazy-loaded cross-encoder model
+_reranker_model = None
+
+# Single worker: concurrent requests queue up, skip once over budget and drop their job
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_model():
+    """Get or create the cross-encoder model."""
+    global _reranker_model
+    if _reranker_model is None:
+        logger.info("Loading reranker model", model=settings.rerank_model)
+        from sentence_transformers import CrossEncoder
+        _reranker_model = CrossEncoder(settings.rerank_model)
+        logger.info("Reranker model loaded successfully")
+    return _reranker_model
+
+
+def _predict(pairs: List[Tuple[str, str]]) -> np.ndarray:
+    """Score (query, chunk) pairs in one batch. Runs on the reranker thread."""
+    model = _get_model()
+    return np.asarray(model.predict(pairs, show_progress_bar=False), dtype=np.float32)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Get or create the reranker worker thread."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+    return _executor
+
+
+class RerankScoreCache:
+    """Bounded LRU cache of cross-encoder scores keyed by (query, chunk id)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, int]) -> Optional[float]:
+        """Return the cached score, if any."""
+        score = self._entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key: Tuple[str, int], score: float):
+        """Store a score, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached scores."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_score_cache = RerankScoreCache(max_size=settings.rerank_cache_size)
+_counters = {"reranked": 0, "skipped_budget": 0, "errors": 0}
+
+
+def get_rerank_stats() -> Dict[str, object]:
+    """Get reranker counters and score cache statistics."""
+    return {**_counters, "cache": _score_cache.stats()}
+
+
+def shutdown_reranker():
+    """Stop the reranker worker (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def warm_up_reranker():
+    """Load the cross-encoder ahead of the first request."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_get_executor(), _get_model)
+
+
+async def rerank(query: str, chunk_ids: np.ndarray, texts: List[str], top_n: int) -> Optional[np.ndarray]:
+    """
+    Rerank retrieved chunks with the cross-encoder.
+
+    Args:
+        query: User query
+        chunk_ids: Stable chunk ids of the candidates (cache keys)
+        texts: Candidate texts, aligned with chunk_ids
+        top_n: Number of candidates to keep
+
+    Returns:
+        Positions of the best top_n candidates, best first, or None when
+        reranking was skipped (budget exceeded or model error)
+    """
+    if len(texts) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    start = time.perf_counter()
+    query_key = normalize_query(query)
+    keys = [(query_key, int(chunk_id)) for chunk_id in chunk_ids]
+    scores = np.array([_score_cache.get(key) for key in keys], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(scores))
+
+    if len(missing):
+        job = _get_executor().submit(_predict, [(query, texts[i]) for i in missing])
+        future = asyncio.wrap_future(job)
+
+        def store(done: asyncio.Future):
+            # Runs on the event loop, also after a budget timeout
+            if done.cancelled() or done.exception() is not None:
+                return
+            for i, score in zip(missing, done.result()):
+                _score_cache.put(keys[i], float(score))
+
+        future.add_done_callback(store)
+        try:
+            predicted = await asyncio.wait_for(
+                asyncio.shield(future), timeout=settings.rerank_budget_ms / 1000
+            )
+        except asyncio.TimeoutError:
+            # Drop the job if it is still queued, so stale work cannot pile up
+            # behind the single worker; a job already running fills the cache
+            job.cancel()
+            _counters["skipped_budget"] += 1
+            logger.info("Rerank budget exceeded, keeping retrieval order", candidates=len(texts))
+            return None
+        except Exception as e:
+            _counters["errors"] += 1
+            logger.error("Reranking failed", error=str(e))
+            return None
+        scores[missing] = predicted
+
+    _counters["reranked"] += 1
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    logger.debug(
+        "Reranked candidates",
+        candidates=len(texts),
+        scored=len(missing),
+        duration_ms=round((time.perf_counter() - start) * 1000, 2)
+    )
+    return order
@@ -0,0 +1,334 @@
+"""
+Project Dwight - Semantic Response Cache
+Serves validated answers for near-duplicate questions without calling the LLM.
+
+Past query embeddings live in a small FAISS index. Each entry maps to its
+validated answer, the intent it was answered under and the knowledge-base
+version that produced it. The cache persists to disk and drops entries
+whenever the knowledge base is rebuilt.
+"""
+
+from typing import Any, Dict, Optional, Set
+from contextlib import contextmanager
+from pathlib import Path
+import asyncio
+import json
+import os
+import threading
+import time
+import structlog
+import faiss
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single uvicorn process, nothing to lock against
+    fcntl = None
+
+from config import settings
+from core.intent_classifier import IntentType
+
+logger = structlog.get_logger()
+
+INDEX_FILE = "cache.faiss"
+ENTRIES_FILE = "cache_entries.json"
+LOCK_FILE = ".cache.lock"
+
+# Persist after this many new entries (and always on shutdown)
+SAVE_EVERY = 20
+
+# Candidates to inspect per lookup before giving up
+SEARCH_K = 8
+
+
+@contextmanager
+def _cache_lock(cache_dir: Path):
+    """
+    Hold the cross-process lock on the cache directory.
+    
+    Gunicorn workers share one cache directory; the index and entries files
+    are published (and read) under an flock so they always come as a pair.
+    """
+    if fcntl is None:
+        yield
+        return
+    
+    with open(cache_dir / LOCK_FILE, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SemanticResponseCache:
+    """FAISS-backed cache of answers keyed by query embedding."""
+    
+    def __init__(
+        self,
+        cache_dir: Path,
+        threshold: float,
+        max_entries: int,
+        ttl_seconds: float
+    ):
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.kb_version: Optional[str] = None
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._unsaved = 0
+        self._write_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def _as_query(vector: np.ndarray) -> np.ndarray:
+        query = np.array(vector, dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(query)
+        return query
+    
+    def _is_expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl > 0 and now - entry["created_at"] > self.ttl
+    
+    def _remove(self, ids):
+        if not ids:
+            return
+        self._index.remove_ids(np.array(ids, dtype=np.int64))
+        for entry_id in ids:
+            self._entries.pop(entry_id, None)
+    
+    def sync_kb_version(self, kb_version: str):
+        """Drop every entry when the knowledge base has been rebuilt."""
+        if self.kb_version == kb_version:
+            return
+        if self._entries:
+            logger.info(
+                "Knowledge base changed, clearing response cache",
+                old_version=self.kb_version,
+                new_version=kb_version,
+                dropped=len(self._entries)
+            )
+        self.clear()
+        self.kb_version = kb_version
+    
+    def lookup(self, vector: np.ndarray, intent: IntentType, kb_version: str) -> Optional[str]:
+        """
+        Find a cached answer for a semantically equivalent query.
+        
+        Args:
+            vector: Query embedding
+            intent: Classified intent of the new query
+            kb_version: Current knowledge-base version
+            
+        Returns:
+            Cached answer, or None on a miss
+        """
+        self.sync_kb_version(kb_version)
+        
+        if self._index is None or self._index.ntotal == 0:
+            self.misses += 1
+            return None
+        
+        now = time.time()
+        scores, ids = self._index.search(self._as_query(vector), min(SEARCH_K, self._index.ntotal))
+        expired = []
+        for score, entry_id in zip(scores[0], ids[0]):
+            if entry_id < 0 or score < self.threshold:
+                break
+            entry = self._entries[int(entry_id)]
+            if self._is_expired(entry, now):
+                expired.append(int(entry_id))
+                continue
+            if entry["intent"] != intent.value:
+                continue
+            entry["last_used"] = now
+            entry["hits"] += 1
+            self.hits += 1
+            self._remove(expired)
+            logger.info("Response cache hit", score=round(float(score), 4), intent=intent.value)
+            return entry["answer"]
+        
+        self._remove(expired)
+        self.misses += 1
+        return None
+    
+    def put(self, vector: np.ndarray, answer: str, intent: IntentType, kb_version: str) -> bool:
+        """
+        Store a validated answer.
+        
+        Returns:
+            True if the cache has enough unsaved changes to be persisted
+        """
+        self.sync_kb_version(kb_version)
+        query = self._as_query(vector)
+        
+        if self._index is None:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(query.shape[1]))
+        
+        now = time.time()
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add_with_ids(query, np.array([entry_id], dtype=np.int64))
+        self._entries[entry_id] = {
+            "answer": answer,
+            "intent": intent.value,
+            "created_at": now,
+            "last_used": now,
+            "hits": 0,
+        }
+        self._evict(now)
+        
+        self._unsaved += 1
+        return self._unsaved >= SAVE_EVERY
+    
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones over capacity."""
+        expired = [i for i, e in self._entries.items() if self._is_expired(e, now)]
+        self._remove(expired)
+        
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            by_age = sorted(self._entries, key=lambda i: self._entries[i]["last_used"])
+            self._remove(by_age[:overflow])
+            self.evictions += overflow
+    
+    def clear(self):
+        """Remove all entries."""
+        # The next put builds a new index, at the dimension of its vector
+        self._index = None
+        self._entries.clear()
+        self._unsaved += 1
+    
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Serialize the cache in memory so it can be written off the event loop."""
+        if self._index is None:
+            return None
+        self._unsaved = 0
+        return {
+            "index": faiss.serialize_index(self._index),
+            "entries": {
+                "kb_version": self.kb_version,
+                "next_id": self._next_id,
+                "entries": {str(i): e for i, e in self._entries.items()},
+            },
+        }
+    
+    def write(self, snapshot: Optional[Dict[str, Any]]):
+        """Write a snapshot to disk using temp files and atomic renames."""
+        if snapshot is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        with self._write_lock:
+            # Per-process temp names: several workers may save at once
+            index_tmp = self.cache_dir / f"{INDEX_FILE}.{os.getpid()}.tmp"
+            snapshot["index"].tofile(str(index_tmp))
+            entries_tmp = self.cache_dir / f"{ENTRIES_FILE}.{os.getpid()}.tmp"
+            entries_tmp.write_text(json.dumps(snapshot["entries"]), encoding="utf-8")
+            
+            with _cache_lock(self.cache_dir):
+                os.replace(index_tmp, self.cache_dir / INDEX_FILE)
+                os.replace(entries_tmp, self.cache_dir / ENTRIES_FILE)
+        logger.info("Response cache saved", entries=len(snapshot["entries"]["entries"]))
+    
+    def save(self):
+        """Persist the cache synchronously."""
+        self.write(self.snapshot())
+    
+    def load(self):
+        """Load a persisted cache, discarding it if the files disagree."""
+        index_file = self.cache_dir / INDEX_FILE
+        entries_file = self.cache_dir / ENTRIES_FILE
+        if not index_file.exists() or not entries_file.exists():
+            return
+        
+        try:
+            with _cache_lock(self.cache_dir):
+                index = faiss.read_index(str(index_file))
+                data = json.loads(entries_file.read_text(encoding="utf-8"))
+            entries = {int(i): e for i, e in data["entries"].items()}
+            if index.ntotal != len(entries):
+                raise ValueError("index and entries are out of sync")
+        except Exception as e:
+            logger.warning("Discarding unreadable response cache", error=str(e))
+            return
+        
+        self._index = index
+        self._entries = entries
+        self._next_id = data["next_id"]
+        self.kb_version = data["kb_version"]
+        self._unsaved = 0
+        logger.info("Response cache loaded", entries=len(entries), kb_version=self.kb_version)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "kb_version": self.kb_version,
+        }
+
+
+_response_cache = SemanticResponseCache(
+    cache_dir=settings.response_cache_dir,
+    threshold=settings.response_cache_threshold,
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl,
+)
+
+
+# Background disk writes (kept referenced until they finish)
+_pending_writes: Set[asyncio.Task] = set()
+
+
+def load_response_cache():
+    """Load the persisted cache (called on startup)."""
+    if settings.response_cache_enabled:
+        _response_cache.load()
+
+
+def save_response_cache():
+    """Persist the cache (called on shutdown)."""
+    if settings.response_cache_enabled:
+        _response_cache.save()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Get response cache counters."""
+    return _response_cache.stats()
+
+
+async def get_cached_response(
+    query_vector: np.ndarray,
+    intent: IntentType,
+    kb_version: str
+) -> Optional[str]:
+    """Return a cached answer for a near-duplicate query, if any."""
+    if not settings.response_cache_enabled or not kb_version:
+        return None
+    return _response_cache.lookup(query_vector, intent, kb_version)
+
+
+async def cache_response(
+    query_vector: np.ndarray,
+    answer: str,
+    intent: IntentType,
+    kb_version: str
+):
+    """Store a validated answer and persist in the background when due."""
+    if not settings.response_cache_enabled or not kb_version:
+        return
+    if _response_cache.put(query_vector, answer, intent, kb_version):
+        snapshot = _response_cache.snapshot()
+        task = asyncio.create_task(asyncio.to_thread(_response_cache.write, snapshot))
+        _pending_writes.add(task)
+        task.add_done_callback(_pending_writes.discard)
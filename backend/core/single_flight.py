@@ -0,0 +1,72 @@
+"""
+Project Dwight - Single-Flight Coalescing
+Shares one pipeline run between identical concurrent chat requests.
+
+When many users ask the same question at once (a marketing email going
+out), only the first request runs embedding, retrieval and the LLM call.
+Requests with the same key that arrive while it is in flight wait for it
+and get the same answer. The key is released as soon as the run finishes,
+so later requests go through the response cache as usual.
+"""
+
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run factory() once per key among concurrent callers.
+
+        The shared run is a task of its own: a caller that disconnects
+        (and is cancelled) does not cancel it for the others. Errors are
+        raised to every caller.
+
+        Args:
+            key: Identity of the work, e.g. (normalized message, intent)
+            factory: Creates the coroutine to run
+
+        Returns:
+            The result of the shared run
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced with in-flight request")
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, float]:
+        """Return coalescing counters for monitoring."""
+        requests = self.executed + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
+
+
+# Shared by the chat endpoint
+chat_flight = SingleFlight()
+
+
+def get_single_flight_stats() -> Dict[str, float]:
+    """Get chat request coalescing statistics."""
+    return chat_flight.stats()
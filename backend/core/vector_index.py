@@ -0,0 +1,140 @@
+"""
+Project Dwight - Vector Index Factory
+Builds the configured FAISS index type and its search parameters.
+
+Supported index types (INDEX_TYPE):
+    flat   Exact inner-product search (IndexFlatIP). Best up to ~100k chunks.
+    hnsw   Graph-based ANN (IndexHNSWFlat). Fast, high recall, more memory.
+    ivfpq  Inverted lists + product quantization (IndexIVFPQ). Smallest
+           memory footprint for very large corpora, needs training data.
+
+Every index is wrapped in an IndexIDMap so results carry stable chunk ids.
+"""
+
+from typing import Any, Dict, Optional
+import math
+import structlog
+import faiss
+import numpy as np
+
+from config import settings
+
+logger = structlog.get_logger()
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# IVF needs roughly this many training points per list
+_IVF_POINTS_PER_LIST = 39
+
+
+def index_config(index_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Index settings that affect the on-disk index (recorded in the manifest).
+    
+    Args:
+        index_type: Override for INDEX_TYPE (tuning knobs still come from settings)
+    """
+    index_type = (index_type or settings.index_type).lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown INDEX_TYPE '{index_type}', expected one of {INDEX_TYPES}")
+
+    config: Dict[str, Any] = {"type": index_type}
+    if index_type == "hnsw":
+        config.update(m=settings.hnsw_m, ef_construction=settings.hnsw_ef_construction)
+    elif index_type == "ivfpq":
+        config.update(nlist=settings.ivf_nlist, pq_m=settings.pq_m, pq_nbits=settings.pq_nbits)
+    return config
+
+
+def create_index(vectors: np.ndarray, ids: np.ndarray, config: Optional[Dict[str, Any]] = None) -> faiss.IndexIDMap:
+    """
+    Build an index over normalized vectors.
+    
+    Args:
+        vectors: float32 array of shape (n, dimension), L2-normalized
+        ids: int64 chunk ids, one per vector
+        config: Index settings (default from settings, see index_config)
+    
+    Returns:
+        Trained and populated IndexIDMap
+    """
+    config = config or index_config()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dimension = vectors.shape[1]
+    base = _create_base(config, dimension, len(vectors))
+
+    if not base.is_trained:
+        base.train(vectors)
+
+    index = faiss.IndexIDMap(base)
+    if len(vectors):
+        index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+    return index
+
+
+def create_empty_index(dimension: int) -> faiss.IndexIDMap:
+    """Build an empty exact index (used when there is nothing to index)."""
+    return faiss.IndexIDMap(faiss.IndexFlatIP(dimension))
+
+
+def _create_base(config: Dict[str, Any], dimension: int, num_vectors: int) -> faiss.Index:
+    """Create the untrained base index for a configuration."""
+    index_type = config["type"]
+
+    if index_type == "hnsw":
+        base = faiss.IndexHNSWFlat(dimension, config["m"], faiss.METRIC_INNER_PRODUCT)
+        base.hnsw.efConstruction = config["ef_construction"]
+        return base
+
+    if index_type == "ivfpq":
+        nlist = config["nlist"] or int(4 * math.sqrt(max(num_vectors, 1)))
+        nlist = max(1, min(nlist, num_vectors // _IVF_POINTS_PER_LIST))
+        pq_m = config["pq_m"]
+        enough_data = num_vectors >= 2 ** config["pq_nbits"] and dimension % pq_m == 0
+        if not enough_data:
+            logger.warning(
+                "Not enough vectors to train IVF-PQ, using a flat index",
+                num_vectors=num_vectors,
+                dimension=dimension
+            )
+            return faiss.IndexFlatIP(dimension)
+        quantizer = faiss.IndexFlatIP(dimension)
+        return faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, pq_m, config["pq_nbits"], faiss.METRIC_INNER_PRODUCT
+        )
+
+    return faiss.IndexFlatIP(dimension)
+
+
+def supports_in_place_update(index: faiss.Index) -> bool:
+    """Whether chunks can be removed from the index without rebuilding it."""
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    return not isinstance(base, faiss.IndexHNSW)
+
+
+def search_params(index: faiss.Index, selector: Optional[faiss.IDSelector] = None) -> faiss.SearchParameters:
+    """
+    Search parameters for an index, carrying the query-time tuning knobs.
+    
+    Args:
+        index: Index that will be searched
+        selector: Optional id filter
+    """
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+
+    if isinstance(base, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(efSearch=settings.hnsw_ef_search)
+    elif isinstance(base, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(nprobe=settings.ivf_nprobe)
+    else:
+        params = faiss.SearchParameters()
+
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def describe_index(index: faiss.Index) -> str:
+    """Short human-readable name of an index (for logs and benchmarks)."""
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    return type(base).__name__
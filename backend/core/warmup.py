@@ -0,0 +1,190 @@
+"""
+Project Dwight - Warm Start
+Loads the embedding model, vector index and caches in the background.
+
+With WARM_START enabled the server binds its port right away and
+/health/live answers immediately, while this module loads every component,
+runs a warm-up encode and search, and records each component's state and
+load time for /health/ready. Chat requests get a 503 until the required
+components are ready, instead of the first user paying for the model load.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import gc
+import time
+import structlog
+
+from config import settings
+from services.process_memory import get_process_memory
+
+logger = structlog.get_logger()
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ComponentStatus:
+    """Load state of one startup component."""
+
+    def __init__(self, name: str, required: bool = True):
+        self.name = name
+        self.required = required
+        self.state = PENDING
+        self.load_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "load_ms": self.load_ms,
+            "error": self.error,
+        }
+
+
+_components: Dict[str, ComponentStatus] = {}
+_startup: Dict[str, Optional[float]] = {"import_ms": None, "warm_up_ms": None}
+
+
+def record_import_time(seconds: float):
+    """Record how long importing the application took."""
+    _startup["import_ms"] = round(seconds * 1000, 1)
+
+
+def _register_components():
+    """Create the component table for the current settings."""
+    global _components
+    components = [
+        ComponentStatus("embedding_model"),
+        ComponentStatus("vector_index"),
+        # The app works without these, they only make it faster
+        ComponentStatus("response_cache", required=False),
+        ComponentStatus("prompt_tokenizer", required=False),
+    ]
+    if settings.rerank_enabled:
+        components.append(ComponentStatus("reranker", required=False))
+    _components = {component.name: component for component in components}
+
+
+def is_ready() -> bool:
+    """Check if every required component has loaded."""
+    return bool(_components) and all(
+        c.state == READY for c in _components.values() if c.required
+    )
+
+
+def component_state(name: str) -> Optional[str]:
+    """State of one component, or None if it is not tracked."""
+    component = _components.get(name)
+    return component.state if component is not None else None
+
+
+def get_readiness() -> Dict[str, Any]:
+    """Readiness summary with per-component state and load times."""
+    return {
+        "ready": is_ready(),
+        "components": {name: c.to_dict() for name, c in _components.items()},
+        "startup": dict(_startup),
+    }
+
+
+async def _load(name: str, loader: Callable[[], Awaitable[Any]]):
+    """Run one component loader and record its outcome."""
+    component = _components[name]
+    component.state = LOADING
+    start = time.perf_counter()
+    try:
+        await loader()
+        component.state = READY
+    except Exception as e:
+        component.state = FAILED
+        component.error = str(e)
+        logger.error("Component failed to load", component=name, error=str(e))
+    component.load_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("Component loaded", component=name, state=component.state, load_ms=component.load_ms)
+
+
+async def _warm_embedding_model():
+    """Load the model and run one forward pass (first inference is slowest)."""
+    from core.embeddings import get_embedding_dimension
+    await get_embedding_dimension()
+
+
+async def _warm_vector_index():
+    """Load (or build) the vector store and page it in with a warm-up search."""
+    from core.rag_engine import initialize_rag_engine, warm_up_search
+    await initialize_rag_engine()
+    await asyncio.to_thread(warm_up_search)
+
+
+async def _warm_response_cache():
+    from core.response_cache import load_response_cache
+    await asyncio.to_thread(load_response_cache)
+
+
+async def _warm_prompt_tokenizer():
+    # Without the encoding, token counts fall back to an estimate
+    from core.prompt_builder import load_tokenizer
+    await asyncio.to_thread(load_tokenizer)
+
+
+async def _warm_reranker():
+    from core.reranker import warm_up_reranker
+    await warm_up_reranker()
+
+
+async def warm_up() -> bool:
+    """
+    Load every startup component.
+
+    The model and the index load concurrently; the caches follow.
+
+    Returns:
+        True if every required component is ready
+    """
+    _register_components()
+    start = time.perf_counter()
+
+    await asyncio.gather(
+        _load("embedding_model", _warm_embedding_model),
+        _load("vector_index", _warm_vector_index),
+    )
+    await _load("response_cache", _warm_response_cache)
+    await _load("prompt_tokenizer", _warm_prompt_tokenizer)
+    if "reranker" in _components:
+        await _load("reranker", _warm_reranker)
+
+    _startup["warm_up_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info("Warm-up finished", ready=is_ready(), warm_up_ms=_startup["warm_up_ms"])
+    logger.info("Worker memory", **get_process_memory())
+    return is_ready()
+
+
+def preload_for_workers():
+    """
+    Load the model and vector store in a parent process before forking.
+    
+    Called by gunicorn (preload_app) once in the master. Workers inherit
+    the model weights copy-on-write and the memory-mapped index and chunk
+    store through the shared page cache, so N workers cost about the
+    memory of one. Each worker still runs warm_up(), which only does the
+    warm-up encode and search for components that are already loaded.
+    """
+    from core.embeddings import load_embedding_model
+    from core.rag_engine import preload_vector_store
+    
+    start = time.perf_counter()
+    load_embedding_model()
+    preloaded = preload_vector_store()
+    
+    # Keep the collector from touching (and so copying) inherited objects
+    gc.freeze()
+    logger.info(
+        "Preloaded shared state for workers",
+        vector_store=preloaded,
+        load_ms=round((time.perf_counter() - start) * 1000, 1),
+        **get_process_memory()
+    )
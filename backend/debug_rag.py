@@ -7,17 +7,16 @@ import numpy as np
 import faiss
 from core.embeddings import get_embedding
 from config import settings
-import pickle
+from core.chunk_store import ChunkStore, CHUNKS_FILE
 
 async def test():
     # Load index
     vector_store_path = settings.vector_store_dir
     index = faiss.read_index(str(vector_store_path / 'index.faiss'))
-    with open(vector_store_path / 'documents.pkl', 'rb') as f:
-        docs = pickle.load(f)
+    store = ChunkStore.open(vector_store_path / CHUNKS_FILE)
     
     print(f'Index has {index.ntotal} vectors')
-    print(f'Loaded {len(docs)} documents')
+    print(f'Loaded {len(store)} documents')
     print(f'Similarity threshold: {settings.similarity_threshold}')
     
     # Get query embedding
@@ -29,9 +28,9 @@ async def test():
     # Search without threshold
     scores, indices = index.search(query_vec, 5)
     print(f'\nTop 5 results for: "{query}"')
-    for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-        source = docs[idx]["source"]
-        content = docs[idx]["content"][:150].replace('\n', ' ')
+    for i, (score, row) in enumerate(zip(scores[0], store.rows_for_ids(indices[0]))):
+        source = store.category("source", row)
+        content = store.text(row)[:150].replace('\n', ' ')
         print(f'{i+1}. Score: {score:.4f} | {source}')
         print(f'   {content}...')
         print()
@@ -1,21 +1,20 @@
 import asyncio
 import faiss
-import pickle
 import numpy as np
 from pathlib import Path
 from core.embeddings import get_embedding, _get_model
+from core.chunk_store import ChunkStore, CHUNKS_FILE
 from config import settings
 
 async def debug():
     # Load index
     vector_store_path = settings.vector_store_dir
     index_file = vector_store_path / "index.faiss"
-    docs_file = vector_store_path / "documents.pkl"
+    chunks_file = vector_store_path / CHUNKS_FILE
     
     print(f"Loading from: {index_file}")
     index = faiss.read_index(str(index_file))
-    with open(docs_file, "rb") as f:
-        documents = pickle.load(f)
+    store = ChunkStore.open(chunks_file)
     
     print(f"Index has {index.ntotal} vectors")
     print(f"Index dimension: {index.d}")
@@ -34,9 +33,9 @@ async def debug():
     
     print(f"\nRaw search results:")
     print(f"Similarity threshold: {settings.similarity_threshold}")
-    for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-        if idx >= 0:
-            doc = documents[idx]
+    for i, (score, row) in enumerate(zip(scores[0], store.rows_for_ids(indices[0]))):
+        if row >= 0:
+            doc = store.get(row)
             print(f"{i+1}. Score: {score:.4f} | {doc['source']} | {doc['content'][:80]}...")
 
 if __name__ == "__main__":
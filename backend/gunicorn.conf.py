@@ -0,0 +1,38 @@
+"""
+Project Dwight - Gunicorn Configuration
+Multi-worker serving with one shared copy of the model and the index.
+
+With PRELOAD_MODELS (default) the master process imports the app, loads
+the embedding model and the memory-mapped vector store once, and then forks
+the workers. Model weights are shared copy-on-write; the FAISS index
+(INDEX_MMAP) and chunks.bin are file-backed mappings shared through the
+page cache. Compare per-worker memory with scripts/worker_memory.py or
+GET /health/stats.
+
+Usage:
+    gunicorn -c gunicorn.conf.py main:app
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import settings
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+graceful_timeout = 30
+
+# Import the app (and preload shared state) in the master before forking
+preload_app = settings.preload_models
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before workers are forked."""
+    if preload_app:
+        from core.warmup import preload_for_workers
+        preload_for_workers()
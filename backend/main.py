@@ -3,14 +3,28 @@ Project Dwight - FastAPI Application Entry Point
 Tiger Logistics AI Assistant Backend
 """
 
+import time
+
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import contextlib
 import structlog
 
 from config import settings
-from routers import chat, health
-from core.rag_engine import initialize_rag_engine
+from routers import admin, chat, health
+from core.rag_engine import watch_knowledge_base
+from core.embeddings import shutdown_embedding_executor
+from core.llm_client import close_llm_client
+from core.response_cache import save_response_cache
+from core.reranker import shutdown_reranker
+from core.warmup import READY, component_state, record_import_time, warm_up
+
+# Heavy libraries (torch, sentence-transformers) load later, in the background
+record_import_time(time.perf_counter() - _import_start)
 
 # Configure structured logging
 structlog.configure(
@@ -34,24 +48,47 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
+async def _background_startup(load: bool):
+    """Warm up (unless already done), then watch the knowledge base for changes."""
+    if load and not await warm_up():
+        return
+    if settings.reload_watch_interval > 0:
+        await watch_knowledge_base(settings.reload_watch_interval)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown."""
     # Startup
-    logger.info("Starting Project Dwight", version=settings.app_version)
+    logger.info(
+        "Starting Project Dwight",
+        version=settings.app_version,
+        warm_start=settings.warm_start,
+        import_ms=round((time.perf_counter() - _import_start) * 1000, 1)
+    )
     
-    # Initialize RAG engine
-    try:
-        await initialize_rag_engine()
-        logger.info("RAG engine initialized successfully")
-    except Exception as e:
-        logger.error("Failed to initialize RAG engine", error=str(e))
-        raise
+    if settings.warm_start:
+        # Bind the port now; models and index load in the background
+        background = asyncio.create_task(_background_startup(load=True))
+    else:
+        if not await warm_up():
+            logger.error("Failed to initialize required components")
+            raise RuntimeError("Startup failed, see component errors above")
+        background = asyncio.create_task(_background_startup(load=False))
     
     yield
     
     # Shutdown
     logger.info("Shutting down Project Dwight")
+    background.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await background
+    # Never overwrite the persisted cache with one that was not loaded yet
+    if component_state("response_cache") == READY:
+        save_response_cache()
+    await close_llm_client()
+    shutdown_embedding_executor()
+    shutdown_reranker()
 
 
 # Create FastAPI application
@@ -76,6 +113,7 @@ app.add_middleware(
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
 
 
 @app.get("/")
@@ -2,6 +2,6 @@
 Project Dwight - Routers Package
 """
 
-from . import chat, health
+from . import admin, chat, health
 
-__all__ = ["chat", "health"]
+__all__ = ["admin", "chat", "health"]
@@ -0,0 +1,46 @@
+"""
+Project Dwight - Admin Router
+Operational endpoints, protected by the ADMIN_TOKEN setting.
+"""
+
+from fastapi import APIRouter, Header, HTTPException
+from datetime import datetime
+import secrets
+import structlog
+
+from config import settings
+from core.rag_engine import reload_rag_engine, is_reload_in_progress
+
+router = APIRouter()
+logger = structlog.get_logger()
+
+
+def _require_admin(token: str):
+    """Reject the request unless admin endpoints are enabled and the token matches."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(token.encode("utf-8"), settings.admin_token.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.post("/admin/reload")
+async def reload_knowledge_base(x_admin_token: str = Header("")):
+    """
+    Reload the knowledge base without restarting the service.
+    
+    Changed documents are re-chunked and embedded in the background while
+    requests keep being served from the current index; the new index is
+    swapped in atomically once it is ready.
+    """
+    _require_admin(x_admin_token)
+    
+    if is_reload_in_progress():
+        raise HTTPException(status_code=409, detail="Reload already in progress")
+    
+    try:
+        result = await reload_rag_engine()
+    except Exception as e:
+        logger.error("Admin reload failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Reload failed, the current knowledge base is still active")
+    
+    return {**result, "timestamp": datetime.utcnow().isoformat()}
@@ -4,18 +4,27 @@ Main chat endpoint for the AI assistant.
 """
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import AsyncIterator, NamedTuple, Optional
 from datetime import datetime
+import json
+import time
 import structlog
 
 from config import settings
-from core.intent_classifier import classify_intent, IntentType
-from core.rag_engine import retrieve_context
-from core.llm_client import generate_response
-from core.guardrails import validate_response, check_lead_trigger
+from core.intent_classifier import classify_intent_by_keywords, classify_intent_by_prototypes, IntentType
+from core.rag_engine import retrieve_context, get_kb_version
+from core.llm_client import generate_completion, stream_response, LLM_ERROR_RESPONSE
+from core.guardrails import validate_response, check_lead_trigger, StreamingValidator, REFUSAL_RESPONSE
+from core.embeddings import get_embedding, normalize_query
+from core.response_cache import get_cached_response, cache_response
+from core.pipeline import Pipeline
+from core.single_flight import chat_flight
+from core.warmup import is_ready
 from services.lead_capture import capture_lead
 from services.logger import log_chat_interaction
+from services.metrics import REQUEST_SECONDS, StageTimer, record_stage_error
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -66,14 +75,18 @@ async def chat(request: ChatRequest, req: Request):
     Main chat endpoint for the AI assistant.
     
     Handles user queries by:
-    1. Classifying intent (support/sales/internal)
-    2. Retrieving relevant context via RAG
-    3. Generating response using LLM
-    4. Applying guardrails
-    5. Checking for lead capture triggers
+    1. Classifying intent (support/sales/internal), while the query is embedded
+    2. Serving near-duplicate questions from the semantic response cache
+       (identical concurrent questions share one pipeline run)
+    3. Retrieving relevant context via RAG
+    4. Generating response using LLM
+    5. Applying guardrails
+    6. Checking for lead capture triggers, alongside steps 2-5
     """
     start_time = datetime.utcnow()
     
+    _require_ready()
+    
     try:
         user_message = request.message.strip()
         session_id = request.session_id or "anonymous"
@@ -84,26 +97,15 @@ async def chat(request: ChatRequest, req: Request):
             message_length=len(user_message)
         )
         
-        # Step 1: Classify intent
-        intent = await classify_intent(user_message)
-        logger.info("Intent classified", intent=intent.value)
-        
-        # Step 2: Retrieve relevant context
-        context = await retrieve_context(user_message, intent)
-        logger.info("Context retrieved", context_length=len(context))
-        
-        # Step 3: Generate response
-        response = await generate_response(
-            query=user_message,
-            context=context,
-            intent=intent
-        )
-        
-        # Step 4: Apply guardrails
-        validated_response = await validate_response(response, context)
+        # Steps 1-6 as a stage graph (see _chat_pipeline)
+        results = await _chat_pipeline.run(message=user_message)
+        intent = results["intent"]
+        answer = results["response"]
+        validated_response = answer.response
+        lead_prompt = results["lead_prompt"]
         
-        # Step 5: Check for lead capture trigger
-        lead_prompt = await check_lead_trigger(user_message, intent)
+        duration_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
+        REQUEST_SECONDS.observe(duration_ms / 1000, "chat")
         
         # Log interaction
         await log_chat_interaction(
@@ -111,7 +113,9 @@ async def chat(request: ChatRequest, req: Request):
             message=user_message,
             response=validated_response,
             intent=intent.value,
-            duration_ms=(datetime.utcnow() - start_time).total_seconds() * 1000
+            duration_ms=duration_ms,
+            context_length=answer.context_length,
+            tokens_used=answer.tokens_used
         )
         
         return ChatResponse(
@@ -123,12 +127,231 @@ async def chat(request: ChatRequest, req: Request):
         
     except Exception as e:
         logger.error("Chat error", error=str(e), session_id=request.session_id)
+        record_stage_error("chat")
         raise HTTPException(
             status_code=500,
             detail="I'm having trouble processing your request. Please try again."
         )
 
 
+class _Answer(NamedTuple):
+    """Answer to a message, with what it cost (None for cache hits)."""
+    response: str
+    context_length: Optional[int] = None
+    tokens_used: Optional[int] = None
+
+
+async def _answer(user_message: str, intent: IntentType, query_vector) -> _Answer:
+    """Answer a message: response cache, retrieval, LLM and guardrails."""
+    # Step 2: Check the semantic response cache
+    kb_version = get_kb_version()
+    cached_response = await get_cached_response(query_vector, intent, kb_version)
+    
+    if cached_response is not None:
+        return _Answer(cached_response)
+    
+    # Step 3: Retrieve relevant context
+    context = await retrieve_context(user_message, intent)
+    logger.info("Context retrieved", context_length=len(context))
+    
+    # Step 4: Generate response
+    response, tokens_used = await generate_completion(
+        query=user_message,
+        context=context,
+        intent=intent
+    )
+    
+    # Step 5: Apply guardrails
+    validated_response = await validate_response(response, context)
+    
+    # Only grounded, successful answers are worth reusing
+    if (
+        context.strip()
+        and response != LLM_ERROR_RESPONSE
+        and validated_response != REFUSAL_RESPONSE
+    ):
+        await cache_response(query_vector, validated_response, intent, kb_version)
+    
+    return _Answer(validated_response, len(context), tokens_used)
+
+
+async def _coalesced_answer(results: dict) -> _Answer:
+    """Steps 2-5, shared with identical requests already in flight."""
+    message, intent = results["message"], results["intent"]
+    return await chat_flight.run(
+        (normalize_query(message), intent.value),
+        lambda: _answer(message, intent, results["query_vector"])
+    )
+
+
+async def _cached_on_hit(results: dict) -> Optional[str]:
+    return await get_cached_response(results["query_vector"], results["intent"], results["kb_version"])
+
+
+async def _context_on_miss(results: dict) -> Optional[str]:
+    if results["cached"] is not None:
+        return None
+    return await retrieve_context(results["message"], results["intent"])
+
+
+async def _intent(results: dict) -> IntentType:
+    """Keyword fast path; only messages it does not decide wait for the query vector."""
+    intent = await classify_intent_by_keywords(results["message"])
+    if intent is not None:
+        return intent
+    return await classify_intent_by_prototypes(await results.wait("query_vector"))
+
+
+# Intent classification runs alongside the embedding and only needs the
+# query vector (for prototypes) when keywords do not decide; the lead check
+# only needs the intent, so it never waits for retrieval or the LLM
+_chat_pipeline = (
+    Pipeline("chat")
+    .stage("query_vector", lambda r: get_embedding(r["message"]))
+    .stage("intent", _intent, uses=("query_vector",))
+    .stage("lead_prompt", lambda r: check_lead_trigger(r["message"], r["intent"]), after=("intent",))
+    .stage("response", _coalesced_answer, after=("intent", "query_vector"))
+)
+
+# Everything before the first token of /chat/stream
+_stream_pipeline = (
+    Pipeline("chat_stream")
+    .stage("query_vector", lambda r: get_embedding(r["message"]))
+    .stage("intent", _intent, uses=("query_vector",))
+    .stage("lead_prompt", lambda r: check_lead_trigger(r["message"], r["intent"]), after=("intent",))
+    .stage("cached", _cached_on_hit, after=("intent", "query_vector", "kb_version"))
+    .stage("context", _context_on_miss, after=("cached",))
+)
+
+
+def _require_ready():
+    """Answer 503 until the model and index have loaded."""
+    if not is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="The assistant is starting up. Please try again in a moment.",
+            headers={"Retry-After": "5"}
+        )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    
+    Runs the same pipeline as /chat but sends the answer as it is
+    generated, so the user sees the first words after retrieval instead of
+    after the whole completion. Events:
+    
+        token  {"text": "..."}  validated answer text, in order
+        done   {"intent", "lead_prompt", "cached", "timestamp", "timings"}
+        error  {"detail": "..."}
+    
+    Guardrails run incrementally on the stream (see StreamingValidator).
+    """
+    _require_ready()
+    return StreamingResponse(
+        _stream_chat(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _stream_chat(request: ChatRequest) -> AsyncIterator[str]:
+    """Produce the SSE events of one streamed chat answer."""
+    start = time.perf_counter()
+    timings = {}
+    user_message = request.message.strip()
+    session_id = request.session_id or "anonymous"
+    
+    try:
+        logger.info(
+            "Chat stream request received",
+            session_id=session_id,
+            message_length=len(user_message)
+        )
+        
+        kb_version = get_kb_version()
+        results = await _stream_pipeline.run(message=user_message, kb_version=kb_version)
+        intent, query_vector = results["intent"], results["query_vector"]
+        cached_response = results["cached"]
+        context_length = None
+        
+        if cached_response is not None:
+            timings["ttft_ms"] = _elapsed_ms(start)
+            validated_response = cached_response
+            yield _sse("token", {"text": cached_response})
+        else:
+            context = results["context"]
+            context_length = len(context)
+            timings["retrieval_ms"] = _elapsed_ms(start)
+            
+            validator = StreamingValidator(context)
+            parts = []
+            failed = False
+            
+            def emit(text: str):
+                if text:
+                    timings.setdefault("ttft_ms", _elapsed_ms(start))
+                    parts.append(text)
+                    return _sse("token", {"text": text})
+                return None
+            
+            try:
+                async for delta in stream_response(user_message, context, intent):
+                    event = emit(validator.feed(delta))
+                    if event:
+                        yield event
+                event = emit(validator.finish())
+            except Exception as e:
+                logger.error("LLM streaming failed", error=str(e))
+                failed = True
+                # Keep what was already sent; otherwise say something useful
+                event = emit(validator.finish() if parts else LLM_ERROR_RESPONSE)
+            if event:
+                yield event
+            
+            validated_response = "".join(parts)
+            
+            # Only grounded, successful answers are worth reusing
+            if context.strip() and not failed and validated_response != REFUSAL_RESPONSE:
+                await cache_response(query_vector, validated_response, intent, kb_version)
+        
+        timings["total_ms"] = _elapsed_ms(start)
+        REQUEST_SECONDS.observe(timings["total_ms"] / 1000, "chat_stream")
+        
+        yield _sse("done", {
+            "intent": intent.value,
+            "lead_prompt": results["lead_prompt"],
+            "cached": cached_response is not None,
+            "timestamp": datetime.utcnow().isoformat(),
+            "timings": timings,
+        })
+        
+        await log_chat_interaction(
+            session_id=session_id,
+            message=user_message,
+            response=validated_response,
+            intent=intent.value,
+            duration_ms=timings["total_ms"],
+            context_length=context_length
+        )
+        
+    except Exception as e:
+        logger.error("Chat stream error", error=str(e), session_id=request.session_id)
+        record_stage_error("chat_stream")
+        yield _sse("error", {"detail": "I'm having trouble processing your request. Please try again."})
+
+
 class LeadCaptureRequest(BaseModel):
     """Request model for lead capture."""
     email: str = Field(..., description="User email address")
@@ -157,13 +380,14 @@ async def submit_lead(request: LeadCaptureRequest):
             session_id=request.session_id
         )
         
-        success = await capture_lead(
-            email=request.email,
-            phone=request.phone,
-            name=request.name,
-            query_context=request.query_context,
-            session_id=request.session_id
-        )
+        with StageTimer("lead_capture"):
+            success = await capture_lead(
+                email=request.email,
+                phone=request.phone,
+                name=request.name,
+                query_context=request.query_context,
+                session_id=request.session_id
+            )
         
         if success:
             return LeadCaptureResponse(
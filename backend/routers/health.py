@@ -3,7 +3,8 @@ Project Dwight - Health Check Router
 Provides health and status endpoints.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
 
 from config import settings
@@ -28,20 +29,14 @@ async def health_check():
 @router.get("/health/ready")
 async def readiness_check():
     """
-    Readiness check - verifies all components are ready.
+    Readiness check - reports each component's load state and time.
+    Returns 503 while the model and index are still warming up.
     """
-    from core.rag_engine import is_rag_ready
+    from core.warmup import get_readiness
     
-    rag_status = await is_rag_ready()
-    
-    return {
-        "ready": rag_status,
-        "components": {
-            "rag_engine": rag_status,
-            "llm": True,  # Will be checked on first request
-        },
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    readiness = get_readiness()
+    readiness["timestamp"] = datetime.utcnow().isoformat()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
 
 
 @router.get("/health/live")
@@ -50,3 +45,39 @@ async def liveness_check():
     Liveness check - simple check that service is running.
     """
     return {"alive": True}
+
+
+@router.get("/health/stats")
+async def stats_check():
+    """
+    Cache statistics - hot-path cache and request coalescing counters.
+    Includes this worker's memory (PSS: its share of pages shared with other workers).
+    """
+    from core.embeddings import get_embedding_cache_stats
+    from core.response_cache import get_response_cache_stats
+    from core.reranker import get_rerank_stats
+    from core.single_flight import get_single_flight_stats
+    from services.process_memory import get_process_memory
+    
+    return {
+        "embedding_cache": get_embedding_cache_stats(),
+        "response_cache": get_response_cache_stats(),
+        "reranker": get_rerank_stats(),
+        "single_flight": get_single_flight_stats(),
+        "memory": get_process_memory(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics - per-stage latency histograms, token, cache and
+    error counters, and the index size of this worker.
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    from services.metrics import render_metrics
+    
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
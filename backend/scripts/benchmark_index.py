@@ -0,0 +1,144 @@
+"""
+Project Dwight - Vector Index Benchmark
+Compares the supported FAISS index types on recall, build time, memory and
+query latency, using the exact flat index as the ground truth.
+
+By default the benchmark runs on the vectors of the built knowledge base
+(vectors.npy). Use --synthetic to simulate a larger corpus by sampling
+noisy copies of those vectors.
+
+Usage:
+    python scripts/benchmark_index.py
+    python scripts/benchmark_index.py --synthetic 200000 --k 5
+    python scripts/benchmark_index.py --types flat hnsw --json results.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from core.rag_engine import VECTORS_FILE
+from core.vector_index import INDEX_TYPES, create_index, describe_index, index_config, search_params
+
+
+def load_vectors(synthetic: int, seed: int) -> np.ndarray:
+    """Load knowledge base vectors, optionally expanded to a synthetic corpus."""
+    vectors_file = settings.vector_store_dir / VECTORS_FILE
+    rng = np.random.default_rng(seed)
+
+    if vectors_file.exists():
+        base = np.load(vectors_file).astype(np.float32)
+    else:
+        print(f"No {VECTORS_FILE} found, using random vectors")
+        base = rng.standard_normal((1000, 384)).astype(np.float32)
+
+    if synthetic and synthetic > len(base):
+        picks = rng.integers(0, len(base), synthetic)
+        noise = rng.standard_normal((synthetic, base.shape[1])).astype(np.float32) * 0.05
+        base = base[picks] + noise
+
+    faiss.normalize_L2(base)
+    return base
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int) -> np.ndarray:
+    """Perturbed corpus vectors stand in for real user queries."""
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.integers(0, len(vectors), count)
+    queries = vectors[picks] + rng.standard_normal((count, vectors.shape[1])).astype(np.float32) * 0.1
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def benchmark(index_type: str, vectors: np.ndarray, queries: np.ndarray, k: int, truth: np.ndarray) -> dict:
+    """Build one index type and measure it."""
+    ids = np.arange(len(vectors), dtype=np.int64)
+
+    start = time.perf_counter()
+    index = create_index(vectors, ids, index_config(index_type))
+    build_s = time.perf_counter() - start
+
+    memory_bytes = len(faiss.serialize_index(index))
+    params = search_params(index)
+
+    # One query at a time, like the chat endpoint
+    latencies = []
+    results = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, found = index.search(query[None, :], k, params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results[i] = found[0]
+
+    recall = np.mean([
+        len(set(found) & set(expected)) / k
+        for found, expected in zip(results, truth)
+    ])
+
+    return {
+        "type": index_type,
+        "index": describe_index(index),
+        "recall_at_k": round(float(recall), 4),
+        "build_s": round(build_s, 3),
+        "memory_mb": round(memory_bytes / 1024 / 1024, 2),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "latency_mean_ms": round(float(np.mean(latencies)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types")
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--k", type=int, default=settings.top_k_results, help="Neighbours per query")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--synthetic", type=int, default=0, help="Expand corpus to this many vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Project Dwight - Vector Index Benchmark")
+    print("=" * 60)
+
+    vectors = load_vectors(args.synthetic, args.seed)
+    queries = make_queries(vectors, args.queries, args.seed)
+    k = min(args.k, len(vectors))
+    print(f"Corpus: {len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={k}")
+
+    # Ground truth from exact search
+    exact = create_index(vectors, np.arange(len(vectors), dtype=np.int64), {"type": "flat"})
+    _, truth = exact.search(queries, k)
+
+    results = [benchmark(t, vectors, queries, k, truth) for t in args.types]
+
+    print(f"\n{'type':<8}{'index':<15}{'recall@k':>10}{'build s':>10}{'mem MB':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 73)
+    for r in results:
+        print(
+            f"{r['type']:<8}{r['index']:<15}{r['recall_at_k']:>10.4f}{r['build_s']:>10.3f}"
+            f"{r['memory_mb']:>10.2f}{r['latency_p50_ms']:>10.3f}{r['latency_p95_ms']:>10.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "corpus_size": len(vectors),
+            "dimension": int(vectors.shape[1]),
+            "queries": len(queries),
+            "k": k,
+            "results": results,
+        }, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
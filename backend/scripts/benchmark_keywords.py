@@ -0,0 +1,145 @@
+"""
+Project Dwight - Keyword Matcher Benchmark
+Measures the per-message cost of intent and lead-trigger matching at
+growing message lengths.
+
+Compares:
+    per-list scan   what classify_intent + check_lead_trigger used to do:
+                    lowercase per check, scan every list, search every
+                    pattern, then rescan for lead triggers
+    matcher         core.keywords.KeywordMatcher.match (uncached)
+    combined regex  one precompiled alternation of every keyword and
+                    pattern, matched at every position (for reference)
+
+All three must agree on the hits of every test message.
+
+Usage:
+    python scripts/benchmark_keywords.py
+    python scripts/benchmark_keywords.py --lengths 100 2000 --repeat 5000
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.keywords import (
+    INTERNAL_KEYWORDS,
+    INTERNAL_PATTERNS,
+    LEAD_TRIGGER_KEYWORDS,
+    MATCHER,
+    SALES_KEYWORDS,
+    SALES_PATTERNS,
+)
+
+FILLER = (
+    "Hello, we export auto parts from Chennai to Hamburg every month and "
+    "want to understand transit times, documentation and cargo insurance. "
+)
+TAIL = "What is your pricing for a 40ft container, and who is the team contact?"
+
+
+def per_list_scan(message: str):
+    """The matching done before the shared matcher."""
+    sales = [k for k in SALES_KEYWORDS if k in message.lower()]
+    sales_pattern = any(re.search(p, message.lower()) for p in SALES_PATTERNS)
+    internal = [k for k in INTERNAL_KEYWORDS if k in message.lower()]
+    internal_pattern = any(re.search(p, message.lower()) for p in INTERNAL_PATTERNS)
+    lead = [k for k in LEAD_TRIGGER_KEYWORDS if k in message.lower()]
+    return sales, sales_pattern, internal, internal_pattern, lead
+
+
+def matcher(message: str):
+    hits = MATCHER.match(message)
+    return (
+        list(hits.keywords("sales")), hits.pattern("sales"),
+        list(hits.keywords("internal")), hits.pattern("internal"),
+        list(hits.keywords("lead")),
+    )
+
+
+ALL_KEYWORDS = sorted(set(SALES_KEYWORDS + INTERNAL_KEYWORDS + LEAD_TRIGGER_KEYWORDS), key=len, reverse=True)
+KEYWORD_RE = re.compile("|".join(re.escape(k) for k in ALL_KEYWORDS))
+# Shorter keywords that start a longer one: found whenever it is
+PREFIXES = {k: [p for p in ALL_KEYWORDS if k.startswith(p)] for k in ALL_KEYWORDS}
+
+
+def _combined_regex():
+    branches = [f"(?P<sp{i}>{p})" for i, p in enumerate(SALES_PATTERNS)]
+    branches += [f"(?P<ip{i}>{p})" for i, p in enumerate(INTERNAL_PATTERNS)]
+    branches += [f"(?P<kw>{KEYWORD_RE.pattern})"]
+    # Zero-width, so every start position is tried; one branch wins per position
+    return re.compile("(?=" + "|".join(branches) + ")")
+
+
+COMBINED = _combined_regex()
+
+
+def combined_regex(message: str):
+    text = message.lower()
+    found, patterns = set(), set()
+    for match in COMBINED.finditer(text):
+        if match.lastgroup == "kw":
+            keyword = match.group("kw")
+        else:
+            patterns.add(match.lastgroup[:2])
+            # A pattern won this position, look for a keyword separately
+            keyword_match = KEYWORD_RE.match(text, match.start())
+            keyword = keyword_match.group() if keyword_match else None
+        if keyword:
+            found.update(PREFIXES[keyword])
+    return (
+        [k for k in SALES_KEYWORDS if k in found], "sp" in patterns,
+        [k for k in INTERNAL_KEYWORDS if k in found], "ip" in patterns,
+        [k for k in LEAD_TRIGGER_KEYWORDS if k in found],
+    )
+
+
+def make_message(length: int) -> str:
+    """Filler text of about `length` characters ending with real hits."""
+    body = FILLER * (max(length - len(TAIL), 0) // len(FILLER) + 1)
+    return body[:max(length - len(TAIL), 0)] + TAIL
+
+
+def time_per_call(fn, message: str, repeat: int) -> float:
+    """Best-of-three mean microseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(message)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword matching")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 500, 2000, 10000])
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per timing")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Project Dwight - Keyword Matcher Benchmark")
+    print("=" * 60)
+
+    for length in args.lengths:
+        message = make_message(length)
+        expected = per_list_scan(message)
+        assert matcher(message) == expected, "matcher disagrees with the per-list scan"
+        assert combined_regex(message) == expected, "combined regex disagrees with the per-list scan"
+
+    candidates = [("per-list scan", per_list_scan), ("matcher", matcher), ("combined regex", combined_regex)]
+    print(f"\n{'chars':>7}" + "".join(f"{name:>17}" for name, _ in candidates) + "   (us per message)")
+    for length in args.lengths:
+        message = make_message(length)
+        repeat = max(args.repeat * 100 // max(length, 100), 20)
+        row = [time_per_call(fn, message, repeat) for _, fn in candidates]
+        print(f"{length:>7}" + "".join(f"{us:>17.1f}" for us in row))
+
+
+if __name__ == "__main__":
+    main()
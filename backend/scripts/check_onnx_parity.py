@@ -0,0 +1,115 @@
+"""
+Project Dwight - ONNX Parity Check
+Confirms the quantized ONNX embedding backend retrieves the same chunks as
+the PyTorch model on our knowledge base.
+
+For every test query the top-k chunks are computed against the stored
+corpus vectors (vectors.npy, built with PyTorch) using a PyTorch query
+vector and an ONNX query vector. This is the production case of switching
+backends without re-ingesting. It also checks the case where the corpus is
+re-embedded with ONNX. Reports embedding cosine agreement, top-k overlap,
+exact top-k matches and per-query encode latency for both backends.
+
+Exits with status 1 when the mean top-k overlap is below --min-overlap.
+
+Usage:
+    python scripts/check_onnx_parity.py
+    python scripts/check_onnx_parity.py --k 3 --min-overlap 0.95
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from core.chunk_store import ChunkStore, CHUNKS_FILE
+from core.onnx_embeddings import OnnxEmbeddingModel
+from core.rag_engine import VECTORS_FILE
+from scripts.test_queries import TEST_QUERIES
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    """Exact inner-product top-k rows per query."""
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def compare(name: str, expected: np.ndarray, actual: np.ndarray) -> float:
+    """Print and return the mean top-k overlap between two result sets."""
+    k = expected.shape[1]
+    overlap = np.mean([len(set(a) & set(e)) / k for a, e in zip(actual, expected)])
+    exact = np.mean([list(a) == list(e) for a, e in zip(actual, expected)])
+    print(f"  {name:<34} overlap@{k} {overlap:.4f}   identical top-{k} {exact:.2%}")
+    return float(overlap)
+
+
+def encode_timed(model, texts):
+    """Encode one query at a time, like the chat endpoint, and time it."""
+    vectors, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        vectors.append(model.encode([text], convert_to_numpy=True)[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return normalize(np.array(vectors)), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check ONNX embedding parity")
+    parser.add_argument("--k", type=int, default=settings.top_k_results, help="Chunks per query")
+    parser.add_argument("--min-overlap", type=float, default=0.9, help="Required mean top-k overlap")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Project Dwight - ONNX Parity Check")
+    print("=" * 60)
+
+    from sentence_transformers import SentenceTransformer
+
+    torch_model = SentenceTransformer(settings.embedding_model, device="cpu")
+    onnx_model = OnnxEmbeddingModel(settings.onnx_model_dir, settings.onnx_threads)
+
+    store = ChunkStore.open(settings.vector_store_dir / CHUNKS_FILE)
+    stored = normalize(np.load(settings.vector_store_dir / VECTORS_FILE))
+    texts = [store.text(row) for row in range(len(store))]
+    queries = [q for group in TEST_QUERIES.values() for q in group if q.strip()]
+    k = min(args.k, len(texts))
+    print(f"Corpus: {len(texts)} chunks, {len(queries)} queries, k={k}")
+
+    torch_queries, torch_ms = encode_timed(torch_model, queries)
+    onnx_queries, onnx_ms = encode_timed(onnx_model, queries)
+    onnx_corpus = normalize(onnx_model.encode(texts))
+
+    query_cos = np.sum(torch_queries * onnx_queries, axis=1)
+    corpus_cos = np.sum(stored * onnx_corpus, axis=1)
+    print("\nEmbedding agreement (cosine torch vs onnx)")
+    print(f"  queries  mean {query_cos.mean():.4f}  min {query_cos.min():.4f}")
+    print(f"  chunks   mean {corpus_cos.mean():.4f}  min {corpus_cos.min():.4f}")
+
+    expected = top_k(torch_queries, stored, k)
+    print("\nRetrieval parity (reference: torch queries vs stored vectors)")
+    overlap = compare("onnx queries, stored vectors", expected, top_k(onnx_queries, stored, k))
+    overlap_reingested = compare("onnx queries, onnx re-ingested", expected, top_k(onnx_queries, onnx_corpus, k))
+
+    print("\nQuery encode latency (ms)")
+    for name, latencies in (("torch", torch_ms), ("onnx", onnx_ms)):
+        print(f"  {name:<6} p50 {np.percentile(latencies, 50):7.2f}   mean {np.mean(latencies):7.2f}")
+
+    passed = min(overlap, overlap_reingested) >= args.min_overlap
+    print(f"\n{'PASS' if passed else 'FAIL'}: minimum overlap {min(overlap, overlap_reingested):.4f} "
+          f"(required {args.min_overlap})")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Project Dwight - Intent Classifier Evaluation
+Compares keyword and embedding-prototype intent classification on the
+labeled queries of scripts/test_queries.py: accuracy, confusion matrix,
+misclassified queries, how often the prototype classifier cannot decide
+(and defaults to support), and the time each classification takes
+(excluding the query embedding, which the chat pipeline computes for
+retrieval anyway). Both classifiers let keyword hits decide first.
+
+Needs a built vector store (vectors.npy) and the embedding model.
+
+Usage:
+    python scripts/eval_intents.py
+    python scripts/eval_intents.py --per-bucket 1 2 4 --margin 0.05
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from core.embeddings import get_embedding
+from core.intent_classifier import (
+    IntentPrototypes,
+    IntentType,
+    _classify_by_keywords,
+    _classify_by_prototypes,
+)
+from core.keywords import MATCHER
+from core.rag_engine import BUCKET_INTENT_MAP, VECTORS_FILE, _load_vector_store
+from scripts.test_queries import TEST_QUERIES
+
+INTENTS = [intent.value for intent in IntentType]
+
+
+def evaluate(name: str, classify, queries, vectors) -> dict:
+    """Classify every labeled query and time each call."""
+    predictions, latencies, fallbacks = [], [], 0
+    for (query, _), vector in zip(queries, vectors):
+        start = time.perf_counter()
+        hits = MATCHER.match(query)
+        intent, fell_back = classify(hits, vector)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        predictions.append(intent.value)
+        fallbacks += fell_back
+
+    expected = [label for _, label in queries]
+    confusion = {e: {p: 0 for p in INTENTS} for e in INTENTS}
+    for e, p in zip(expected, predictions):
+        confusion[e][p] += 1
+    return {
+        "name": name,
+        "accuracy": float(np.mean([e == p for e, p in zip(expected, predictions)])),
+        "confusion": confusion,
+        "errors": [(q, e, p) for (q, e), p in zip(queries, predictions) if e != p],
+        "fallback_rate": fallbacks / len(queries),
+        "p50_us": float(np.percentile(latencies, 50)),
+        "p95_us": float(np.percentile(latencies, 95)),
+    }
+
+
+def keyword_classifier(hits, vector):
+    return _classify_by_keywords(hits) or IntentType.SUPPORT, False
+
+
+def prototype_classifier(prototypes: IntentPrototypes):
+    def classify(hits, vector):
+        intent = _classify_by_keywords(hits) or _classify_by_prototypes(vector, prototypes)
+        if intent is None:
+            return IntentType.SUPPORT, True
+        return intent, False
+    return classify
+
+
+def print_result(result: dict):
+    print(f"\n{result['name']}")
+    print(f"  accuracy {result['accuracy']:.1%}  fallback {result['fallback_rate']:.1%}  "
+          f"p50 {result['p50_us']:.1f}us  p95 {result['p95_us']:.1f}us")
+    print("  expected \\ predicted " + "".join(f"{p:>10}" for p in INTENTS))
+    for e in INTENTS:
+        print(f"  {e:<21}" + "".join(f"{result['confusion'][e][p]:>10}" for p in INTENTS))
+    for query, expected, predicted in result["errors"]:
+        print(f"  x {query!r}: expected {expected}, got {predicted}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Evaluate intent classification")
+    parser.add_argument("--per-bucket", type=int, nargs="+", default=[1, 2, 4, 8], help="Prototypes per bucket")
+    parser.add_argument("--margin", type=float, default=settings.intent_min_margin, help="INTENT_MIN_MARGIN")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Project Dwight - Intent Classifier Evaluation")
+    print("=" * 60)
+
+    vector_store_path = settings.vector_store_dir
+    if not (vector_store_path / VECTORS_FILE).exists():
+        print(f"No {VECTORS_FILE} in {vector_store_path}; run scripts/ingest_documents.py first")
+        return
+    settings.intent_min_margin = args.margin
+    _, store, _ = _load_vector_store(vector_store_path)
+    chunk_vectors = np.load(vector_store_path / VECTORS_FILE)
+    buckets = np.asarray(store.categories["bucket"], dtype=object)[store.codes("bucket")]
+
+    queries = [
+        (query, label)
+        for label, group in TEST_QUERIES.items() if label in INTENTS
+        for query in group
+    ]
+    vectors = [await get_embedding(query) for query, _ in queries]
+    print(f"{len(queries)} labeled queries, {len(chunk_vectors)} chunk vectors, margin {args.margin}")
+
+    results = [evaluate("keyword", keyword_classifier, queries, vectors)]
+    for per_bucket in args.per_bucket:
+        prototypes = IntentPrototypes.build(chunk_vectors, buckets, BUCKET_INTENT_MAP, per_bucket=per_bucket)
+        name = f"prototype ({len(prototypes.intents)} prototypes, {per_bucket} per bucket)"
+        results.append(evaluate(name, prototype_classifier(prototypes), queries, vectors))
+
+    for result in results:
+        print_result(result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+"""
+Project Dwight - Retrieval Evaluation
+Scores retrieval on the labeled queries of scripts/test_queries.py
+(EXPECTED_SOURCES): recall@k, MRR and nDCG@k over the source files of the
+chunks retrieve_context would pack, with per-query search latency and
+query embedding time.
+
+Sweeps chunk_size, chunk_overlap, top_k_results and similarity_threshold.
+The current chunking is evaluated on the built vector store; every other
+chunking is built into a temporary directory, so the real store is left
+alone. Search latency covers the intent-partitioned FAISS search, BM25
+fusion and reranking as configured; the query is classified the way the
+chat pipeline does it.
+
+Usage:
+    python scripts/eval_retrieval.py
+    python scripts/eval_retrieval.py --top-k 3 5 8 --threshold 0.1 0.15 0.25
+    python scripts/eval_retrieval.py --chunk-size 500 1000 1500 --chunk-overlap 100 200 --json results.json
+    python scripts/eval_retrieval.py --queries labels.json   # {"query": ["file.md", ...], ...}
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import faiss
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from core import embeddings, rag_engine
+from core.embeddings import get_embedding
+from core.intent_classifier import classify_intent
+from core.rag_engine import build_vector_store, load_vector_store
+from scripts.test_queries import EXPECTED_SOURCES
+
+
+def score(ranked: Sequence[str], expected: Sequence[str], k: int) -> Dict[str, float]:
+    """
+    Score a ranked list of source files against the expected ones.
+
+    Args:
+        ranked: Distinct source files, best first
+        expected: Source files that answer the query
+        k: Cut-off for recall and nDCG
+
+    Returns:
+        recall@k, reciprocal rank of the first relevant source and nDCG@k
+    """
+    relevant = set(expected)
+    top = ranked[:k]
+    hits = [source in relevant for source in top]
+    first = next((rank for rank, source in enumerate(ranked, 1) if source in relevant), None)
+    dcg = sum(1 / math.log2(rank + 1) for rank, hit in enumerate(hits, 1) if hit)
+    ideal = sum(1 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return {
+        "recall": sum(hits) / len(relevant),
+        "rr": 1 / first if first else 0.0,
+        "ndcg": dcg / ideal if ideal else 0.0,
+    }
+
+
+def ranked_sources(rows: np.ndarray) -> List[str]:
+    """Distinct source files of the retrieved rows, in rank order."""
+    store = rag_engine._snapshot.store
+    return list(dict.fromkeys(store.category("source", int(row)) for row in rows))
+
+
+async def measure_embeddings(queries: Sequence[str]) -> Dict[str, float]:
+    """Embedding time per query, in ms, bypassing the query cache."""
+    await get_embedding("warm up")
+    times = {}
+    for query in queries:
+        embeddings._query_cache.clear()
+        start = time.perf_counter()
+        await get_embedding(query)
+        times[query] = (time.perf_counter() - start) * 1000
+    return times
+
+
+async def load_index(chunk_size: int, chunk_overlap: int, current: tuple, workdir: Path, rebuild: bool) -> float:
+    """
+    Make the index for a chunking live.
+
+    Returns:
+        Seconds spent building it (0 when the built store was loaded)
+    """
+    settings.chunk_size, settings.chunk_overlap = chunk_size, chunk_overlap
+    settings.processed_data_dir = current[2]
+    if (chunk_size, chunk_overlap) == current[:2] and not rebuild and load_vector_store():
+        return 0.0
+
+    settings.processed_data_dir = str(workdir / f"chunks_{chunk_size}_{chunk_overlap}")
+    start = time.perf_counter()
+    await build_vector_store(incremental=False)
+    return time.perf_counter() - start
+
+
+async def evaluate(labels: Dict[str, List[str]], top_k: int, threshold: float) -> dict:
+    """Retrieve every labeled query against the live index and score it."""
+    settings.similarity_threshold = threshold
+    snapshot = rag_engine._snapshot
+    per_query, latencies, chunks = [], [], []
+
+    for query, expected in labels.items():
+        query_vector = np.array([await get_embedding(query)], dtype=np.float32)
+        faiss.normalize_L2(query_vector)
+        intent = await classify_intent(query, query_vector[0])
+
+        start = time.perf_counter()
+        rows, _, _, _, _ = await rag_engine._rank_chunks(snapshot, query, query_vector, intent, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        sources = ranked_sources(rows)
+        chunks.append(len(rows))
+        per_query.append({
+            "query": query,
+            "intent": intent.value,
+            "sources": sources,
+            "search_ms": round(latencies[-1], 3),
+            **score(sources, expected, top_k),
+        })
+
+    return {
+        "recall": float(np.mean([q["recall"] for q in per_query])),
+        "mrr": float(np.mean([q["rr"] for q in per_query])),
+        "ndcg": float(np.mean([q["ndcg"] for q in per_query])),
+        "mean_chunks": float(np.mean(chunks)),
+        "search_p50_ms": float(np.percentile(latencies, 50)),
+        "search_p95_ms": float(np.percentile(latencies, 95)),
+        "queries": per_query,
+    }
+
+
+def load_labels(path: Path = None) -> Dict[str, List[str]]:
+    labels = json.loads(path.read_text()) if path else EXPECTED_SOURCES
+    return {query: sources for query, sources in labels.items() if sources}
+
+
+async def run(args) -> dict:
+    labels = load_labels(args.queries)
+    current = (settings.chunk_size, settings.chunk_overlap, settings.processed_data_dir)
+    chunkings = [
+        (size, overlap)
+        for size, overlap in itertools.product(args.chunk_size or [current[0]], args.chunk_overlap or [current[1]])
+        if overlap < size
+    ]
+    workdir = Path(tempfile.mkdtemp(prefix="dwight-eval-"))
+    results = []
+
+    try:
+        embedding_ms = await measure_embeddings(list(labels))
+        for chunk_size, chunk_overlap in chunkings:
+            build_s = await load_index(chunk_size, chunk_overlap, current, workdir, args.rebuild)
+            index_chunks = rag_engine.get_index_size()
+            for top_k, threshold in itertools.product(args.top_k, args.threshold):
+                result = await evaluate(labels, top_k, threshold)
+                results.append({
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "top_k": top_k,
+                    "similarity_threshold": threshold,
+                    "index_chunks": index_chunks,
+                    "build_s": round(build_s, 2),
+                    **result,
+                })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "labeled_queries": len(labels),
+        "embedding_ms": {
+            "mean": float(np.mean(list(embedding_ms.values()))),
+            "p95": float(np.percentile(list(embedding_ms.values()), 95)),
+            "per_query": {query: round(ms, 3) for query, ms in embedding_ms.items()},
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict, show_misses: bool):
+    embedding = report["embedding_ms"]
+    print(f"\nLabeled queries: {report['labeled_queries']}")
+    print(f"Query embedding: mean {embedding['mean']:.2f} ms, p95 {embedding['p95']:.2f} ms")
+    print(f"\n{'chunk':>6} {'overlap':>7} {'top_k':>5} {'thresh':>6} {'chunks':>6} "
+          f"{'recall@k':>8} {'MRR':>6} {'nDCG@k':>6} {'ctx':>5} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 86)
+    for r in report["results"]:
+        print(f"{r['chunk_size']:>6} {r['chunk_overlap']:>7} {r['top_k']:>5} {r['similarity_threshold']:>6.2f} "
+              f"{r['index_chunks']:>6} {r['recall']:>8.3f} {r['mrr']:>6.3f} {r['ndcg']:>6.3f} "
+              f"{r['mean_chunks']:>5.1f} {r['search_p50_ms']:>8.3f} {r['search_p95_ms']:>8.3f}")
+
+    if show_misses:
+        for r in report["results"]:
+            misses = [q for q in r["queries"] if q["recall"] < 1]
+            if misses:
+                print(f"\nMisses at chunk {r['chunk_size']}/{r['chunk_overlap']}, "
+                      f"top_k {r['top_k']}, threshold {r['similarity_threshold']}:")
+                for q in misses:
+                    print(f"  {q['query'][:50]:<50} [{q['intent']}] -> {', '.join(q['sources'][:4]) or '(none)'}")
+
+    print("\nctx: mean chunks retrieved per query (own and other buckets)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and speed")
+    parser.add_argument("--chunk-size", type=int, nargs="+", help="Chunk sizes (default: CHUNK_SIZE)")
+    parser.add_argument("--chunk-overlap", type=int, nargs="+", help="Chunk overlaps (default: CHUNK_OVERLAP)")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[settings.top_k_results], help="top_k values")
+    parser.add_argument("--threshold", type=float, nargs="+", default=[settings.similarity_threshold],
+                        help="Similarity thresholds")
+    parser.add_argument("--queries", type=Path, help="JSON file of {query: [expected source files]}")
+    parser.add_argument("--rebuild", action="store_true", help="Also rebuild the current chunking")
+    parser.add_argument("--show-misses", action="store_true", help="List queries that missed a source")
+    parser.add_argument("--json", type=Path, help="Write results (with per-query detail) to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Project Dwight - Retrieval Evaluation")
+    print("=" * 60)
+
+    report = asyncio.run(run(args))
+    print_report(report, args.show_misses)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Project Dwight - ONNX Export
+Exports the embedding model to ONNX and quantizes it to int8 for the
+onnxruntime backend (EMBEDDING_BACKEND=onnx).
+
+Writes to settings.onnx_model_dir:
+    model.onnx          full-precision export
+    model_int8.onnx     dynamically quantized (int8 weights), used at runtime
+    tokenizer.json      fast tokenizer, loaded with the `tokenizers` library
+    export_config.json  max sequence length, dimension, padding token
+
+Export needs torch, sentence-transformers and onnx; the runtime only needs
+onnxruntime. Verify the result with scripts/check_onnx_parity.py.
+
+Usage:
+    python scripts/export_onnx.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from core.onnx_embeddings import EXPORT_CONFIG_FILE, MODEL_FILE, TOKENIZER_FILE
+
+
+def export(output_dir: Path):
+    """Export the transformer of the sentence-transformers model to ONNX."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(settings.embedding_model, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    sample = tokenizer(["Export sample for FCL shipping"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_file = output_dir / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            str(fp32_file),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            do_constant_folding=True,
+        )
+
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILE))
+    config = {
+        "embedding_model": settings.embedding_model,
+        "max_seq_length": model.max_seq_length,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "pad_token_id": tokenizer.pad_token_id or 0,
+    }
+    (output_dir / EXPORT_CONFIG_FILE).write_text(json.dumps(config, indent=2), encoding="utf-8")
+    return fp32_file
+
+
+def quantize(fp32_file: Path, output_dir: Path) -> Path:
+    """Quantize weights to int8 (activations stay float, quantized on the fly)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_file = output_dir / MODEL_FILE
+    quantize_dynamic(str(fp32_file), str(int8_file), weight_type=QuantType.QInt8)
+    return int8_file
+
+
+def main():
+    print("=" * 60)
+    print("Project Dwight - ONNX Export")
+    print("=" * 60)
+
+    output_dir = settings.onnx_model_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"\nExporting {settings.embedding_model} to {output_dir}")
+    fp32_file = export(output_dir)
+    print(f"  {fp32_file.name}: {fp32_file.stat().st_size / 1024 / 1024:.1f} MB")
+
+    int8_file = quantize(fp32_file, output_dir)
+    print(f"  {int8_file.name}: {int8_file.stat().st_size / 1024 / 1024:.1f} MB")
+
+    print("\nDone. Set EMBEDDING_BACKEND=onnx after checking parity:")
+    print("  python scripts/check_onnx_parity.py")
+
+
+if __name__ == "__main__":
+    main()
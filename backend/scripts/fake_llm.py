@@ -0,0 +1,166 @@
+"""
+Project Dwight - Fake LLM Server
+A local stand-in for the Groq chat completions API, for load tests and CI.
+
+Serves POST /openai/v1/chat/completions (blocking and streamed) with a set
+latency before the first token, random jitter, a token rate and an error
+rate, so the backend can be driven at load without a Groq key or network.
+Point the backend at it with GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+Usage:
+    python scripts/fake_llm.py --port 8100
+    python scripts/fake_llm.py --latency-ms 400 --jitter-ms 150 --tokens-per-s 300 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER_WORDS = (
+    "Tiger Logistics handles FCL and LCL ocean freight, air freight and customs clearance "
+    "from all major Indian ports, with door-to-door tracking and dedicated support."
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behaviour of the fake LLM."""
+    latency_ms: float = 300.0  # Time to the first token
+    jitter_ms: float = 100.0  # Uniform +/- jitter on latency_ms
+    tokens_per_s: float = 400.0  # Generation speed after the first token
+    answer_tokens: int = 80  # Tokens per answer (one word each)
+    error_rate: float = 0.0  # Share of requests answered with HTTP 500
+    seed: int = 0
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    """Create the fake chat completions app."""
+    app = FastAPI(title="Fake LLM")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0}
+
+    def first_token_delay() -> float:
+        jitter = rng.uniform(-config.jitter_ms, config.jitter_ms)
+        return max(config.latency_ms + jitter, 0.0) / 1000
+
+    def usage(body: dict) -> dict:
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": config.answer_tokens,
+            "total_tokens": prompt_tokens + config.answer_tokens,
+        }
+
+    def tokens():
+        return [
+            (" " if i else "") + ANSWER_WORDS[i % len(ANSWER_WORDS)]
+            for i in range(config.answer_tokens)
+        ]
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(first_token_delay())
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "internal_server_error"}},
+                status_code=500
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "fake")
+        token_delay = 1 / config.tokens_per_s if config.tokens_per_s > 0 else 0
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * config.answer_tokens)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens())},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage(body),
+            }
+
+        async def events():
+            def chunk(delta: dict, finish_reason=None, **extra) -> str:
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    **extra,
+                }
+                return f"data: {json.dumps(data)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for i, token in enumerate(tokens()):
+                if i and token_delay:
+                    await asyncio.sleep(token_delay)
+                yield chunk({"content": token})
+            # Groq reports the usage on the last chunk
+            yield chunk({}, "stop", x_groq={"id": completion_id, "usage": usage(body)})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "config": asdict(config)}
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the fake LLM options to a parser (shared with the load test)."""
+    defaults = FakeLLMConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="+/- jitter on the latency")
+    parser.add_argument("--tokens-per-s", type=float, default=defaults.tokens_per_s, help="Token rate (0 = instant)")
+    parser.add_argument("--answer-tokens", type=int, default=defaults.answer_tokens, help="Tokens per answer")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Share of HTTP 500 answers")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeLLMConfig:
+    return FakeLLMConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_s=args.tokens_per_s,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Groq-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
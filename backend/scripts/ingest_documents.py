@@ -2,10 +2,15 @@
 Project Dwight - Document Ingestion Script
 Processes documents and builds the FAISS vector store.
 
+Only chunks that were added or changed since the last run are embedded;
+a manifest of per-file and per-chunk content hashes tracks what is indexed.
+
 Usage:
-    python scripts/ingest_documents.py
+    python scripts/ingest_documents.py          # incremental update
+    python scripts/ingest_documents.py --full   # re-embed everything
 """
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -17,7 +22,7 @@ from config import settings
 from core.rag_engine import build_vector_store, load_and_chunk_documents
 
 
-async def main():
+async def main(full: bool = False):
     """Main ingestion function."""
     print("=" * 50)
     print("Project Dwight - Document Ingestion")
@@ -54,14 +59,17 @@ async def main():
     print(f"Created {len(documents)} chunks")
     
     # Build vector store
-    print("\nBuilding vector store (this may take a moment)...")
-    await build_vector_store()
+    mode = "full rebuild" if full else "incremental"
+    print(f"\nBuilding vector store ({mode}, this may take a moment)...")
+    stats = await build_vector_store(incremental=not full)
     
     # Verify
     vector_store_path = settings.vector_store_dir
     if (vector_store_path / "index.faiss").exists():
         print(f"\n✅ Vector store created successfully!")
         print(f"   Location: {vector_store_path}")
+        print(f"   Files changed: {stats['files_changed']}")
+        print(f"   Chunks embedded: {stats['added']}, removed: {stats['removed']}, unchanged: {stats['unchanged']}")
     else:
         print("\n❌ Failed to create vector store")
         return
@@ -72,4 +80,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Build the Dwight vector store")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-embed every chunk")
+    args = parser.parse_args()
+    asyncio.run(main(full=args.full))
@@ -0,0 +1,419 @@
+"""
+Project Dwight - Load Test
+Drives /api/chat (or /api/chat/stream) at a fixed concurrency and reports
+latency percentiles, throughput and event-loop lag.
+
+By default everything runs in this process, with no network or Groq key:
+the fake LLM (scripts/fake_llm.py) and the backend are served by uvicorn
+on local ports, the backend talks to the fake LLM through GROQ_BASE_URL,
+and a probe on the backend's event loop measures how late its timers
+fire. The backend works on a copy of the vector store in a temp
+directory, with the response cache off unless --response-cache is given,
+so nothing on disk changes. With --url an already running server is
+driven instead (start it with GROQ_BASE_URL pointing at a fake LLM);
+event-loop lag is not available then.
+
+The driver shares a process (and the GIL) with the backend, so compare
+runs made with the same options on the same machine rather than reading
+the absolute numbers as production capacity. --json writes a result file,
+--compare prints the change against an earlier one.
+
+Usage:
+    python scripts/load_test.py --fake-embeddings
+    python scripts/load_test.py --concurrency 32 --requests 1000 --latency-ms 500 --json after.json --compare before.json
+    python scripts/load_test.py --stream --duration 30
+    python scripts/load_test.py --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.fake_llm import add_arguments, config_from_args, create_app
+from scripts.test_queries import TEST_QUERIES
+
+QUERIES = [query for group in TEST_QUERIES.values() for query in group]
+
+# Fields shown by --compare: (label, path in the result, lower is better)
+COMPARED = [
+    ("requests/s", ("requests_per_s",), False),
+    ("p50 ms", ("latency_ms", "p50"), True),
+    ("p95 ms", ("latency_ms", "p95"), True),
+    ("p99 ms", ("latency_ms", "p99"), True),
+    ("ttft p50 ms", ("ttft_ms", "p50"), True),
+    ("loop lag p99 ms", ("event_loop_lag_ms", "p99"), True),
+    ("error rate", ("error_rate",), True),
+]
+
+
+class HashEmbeddingModel:
+    """Deterministic stand-in for the embedding model (no download)."""
+
+    def __init__(self, dim: int = 384, ms_per_text: float = 0.0):
+        self.dim = dim
+        self.ms_per_text = ms_per_text
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        # Sleeping releases the GIL like real inference does
+        time.sleep(self.ms_per_text * len(texts) / 1000)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "big")
+            out[i] = np.random.default_rng(seed).standard_normal(self.dim)
+        return out
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+class ServerThread:
+    """Serve an ASGI app with uvicorn on its own thread and event loop."""
+
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.url = f"http://127.0.0.1:{port}"
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.server.serve(),), daemon=True)
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError(f"Server on {self.url} failed to start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+class LoopLagProbe:
+    """Measures how late a short sleep wakes up on a given event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = 0.01):
+        self.loop = loop
+        self.interval = interval
+        self.samples: List[float] = []
+        self._running = False
+        self._future = None
+
+    async def _run(self):
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def start(self):
+        self.samples.clear()
+        self._running = True
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self.loop)
+
+    def stop(self) -> List[float]:
+        self._running = False
+        self._future.result(timeout=5)
+        return self.samples
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(values: List[float], scale: float = 1000) -> Optional[Dict[str, float]]:
+    """p50/p95/p99/max/mean of seconds, in milliseconds."""
+    if not values:
+        return None
+    array = np.asarray(values) * scale
+    return {
+        "p50": round(float(np.percentile(array, 50)), 2),
+        "p95": round(float(np.percentile(array, 95)), 2),
+        "p99": round(float(np.percentile(array, 99)), 2),
+        "max": round(float(array.max()), 2),
+        "mean": round(float(array.mean()), 2),
+    }
+
+
+def parse_stage_totals(text: str) -> Dict[str, List[float]]:
+    """Stage [sum, count] pairs from a /metrics scrape."""
+    totals: Dict[str, List[float]] = {}
+    pattern = re.compile(r'^dwight_stage_duration_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$')
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if match:
+            kind, stage, value = match.groups()
+            totals.setdefault(stage, [0.0, 0.0])[0 if kind == "sum" else 1] = float(value)
+    return totals
+
+
+async def scrape_stages(client: httpx.AsyncClient) -> Dict[str, List[float]]:
+    try:
+        response = await client.get("/metrics")
+        return parse_stage_totals(response.text) if response.status_code == 200 else {}
+    except httpx.HTTPError:
+        return {}
+
+
+def stage_means(before: Dict[str, List[float]], after: Dict[str, List[float]]) -> Dict[str, float]:
+    """Mean ms per stage call during the run."""
+    means = {}
+    for stage, (total, count) in sorted(after.items()):
+        total -= before.get(stage, [0, 0])[0]
+        count -= before.get(stage, [0, 0])[1]
+        if count > 0:
+            means[stage] = round(total / count * 1000, 3)
+    return means
+
+
+async def send(client: httpx.AsyncClient, message: str, stream: bool) -> Dict:
+    """Send one chat request; returns its latency, time to first token and status."""
+    start = time.perf_counter()
+    if not stream:
+        response = await client.post("/api/chat", json={"message": message})
+        return {"latency": time.perf_counter() - start, "ok": response.status_code == 200}
+
+    ttft, ok = None, False
+    async with client.stream("POST", "/api/chat/stream", json={"message": message}) as response:
+        async for line in response.aiter_lines():
+            if line == "event: token" and ttft is None:
+                ttft = time.perf_counter() - start
+            elif line == "event: done":
+                ok = response.status_code == 200
+            elif line == "event: error":
+                ok = False
+    return {"latency": time.perf_counter() - start, "ttft": ttft, "ok": ok}
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    concurrency: int,
+    total: int,
+    duration: float,
+    stream: bool,
+    unique: bool
+) -> Dict:
+    """Closed-loop load: `concurrency` clients, each sending its next request when the last one returns."""
+    results: List[Dict] = []
+    counter = iter(range(total if total else 10**9))
+    deadline = time.perf_counter() + duration if duration else float("inf")
+
+    async def user():
+        for i in counter:
+            if time.perf_counter() >= deadline:
+                return
+            message = QUERIES[i % len(QUERIES)]
+            if unique:
+                # Defeats the embedding and response caches
+                message = f"{message} (request {i})"
+            try:
+                results.append(await send(client, message, stream))
+            except httpx.HTTPError:
+                results.append({"latency": None, "ok": False})
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies = [r["latency"] for r in results if r["ok"]]
+    errors = sum(not r["ok"] for r in results)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "duration_s": round(elapsed, 3),
+        "requests_per_s": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": percentiles(latencies),
+        "ttft_ms": percentiles([r["ttft"] for r in results if r.get("ttft") is not None]) if stream else None,
+    }
+
+
+def start_backend(args, llm_url: str, workdir: Path) -> ServerThread:
+    """Configure and start the backend in this process."""
+    from config import settings
+    from core import embeddings
+
+    original_store = settings.vector_store_dir
+    settings.processed_data_dir = str(workdir)
+    if original_store.exists() and not args.rebuild_index:
+        shutil.copytree(original_store, settings.vector_store_dir)
+    settings.groq_base_url = llm_url
+    settings.groq_api_key = settings.groq_api_key or "load-test"
+    settings.response_cache_enabled = args.response_cache
+    settings.reload_watch_interval = 0
+    if args.fake_embeddings:
+        settings.embedding_executor = "thread"
+        embeddings._embedding_model = HashEmbeddingModel(ms_per_text=args.fake_embedding_ms)
+
+    import main
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+    return ServerThread(main.app, free_port()).start()
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 600):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Backend did not become ready")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def lookup(result: Dict, path) -> Optional[float]:
+    for key in path:
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
+
+
+def print_report(result: Dict, baseline: Optional[Dict] = None):
+    print(f"\nRequests: {result['requests']} in {result['duration_s']}s "
+          f"({result['requests_per_s']} req/s), errors: {result['errors']} ({result['error_rate']:.2%})")
+    for name in ("latency_ms", "ttft_ms", "event_loop_lag_ms"):
+        if result.get(name):
+            values = "  ".join(f"{k} {v:.1f}" for k, v in result[name].items())
+            print(f"{name:<19}{values}")
+    if result.get("stages_ms"):
+        print("stage means (ms)   " + "  ".join(f"{k} {v}" for k, v in result["stages_ms"].items()))
+
+    if baseline:
+        print(f"\nCompared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+        for label, path, lower_is_better in COMPARED:
+            old, new = lookup(baseline, path), lookup(result, path)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            better = (change < 0) == lower_is_better or change == 0
+            print(f"  {label:<17}{old:>10.2f} -> {new:>10.2f}  {change:+6.1f}% {'' if better else '(worse)'}")
+
+
+async def run(args) -> Dict:
+    llm_server = backend = None
+    workdir = Path(tempfile.mkdtemp(prefix="dwight-load-"))
+    try:
+        llm_url = args.llm_url
+        if not args.url and not llm_url:
+            llm_server = ServerThread(create_app(config_from_args(args)), free_port()).start()
+            llm_url = llm_server.url
+        if args.url:
+            base_url = args.url
+        else:
+            backend = start_backend(args, llm_url, workdir)
+            base_url = backend.url
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_ready(client)
+            if args.warmup:
+                await run_load(client, min(args.concurrency, args.warmup), args.warmup, 0, args.stream, args.unique)
+
+            stages_before = await scrape_stages(client)
+            probe = LoopLagProbe(backend.loop) if backend else None
+            if probe:
+                probe.start()
+            result = await run_load(client, args.concurrency, args.requests, args.duration, args.stream, args.unique)
+            result["event_loop_lag_ms"] = percentiles(probe.stop()) if probe else None
+            result["stages_ms"] = stage_means(stages_before, await scrape_stages(client))
+    finally:
+        if backend:
+            backend.stop()
+        if llm_server:
+            llm_server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "endpoint": "/api/chat/stream" if args.stream else "/api/chat",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "duration": args.duration,
+            "unique_messages": args.unique,
+            "response_cache": args.response_cache,
+            "fake_embeddings": args.fake_embeddings,
+            "fake_llm": None if (args.url or args.llm_url) else vars(config_from_args(args)),
+        },
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat endpoint")
+    parser.add_argument("--url", help="Drive this running server instead of an in-process one")
+    parser.add_argument("--llm-url", help="Use this LLM server instead of starting the fake one")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests (0 = until --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 = no limit)")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout (seconds)")
+    parser.add_argument("--stream", action="store_true", help="Use /api/chat/stream and report time to first token")
+    parser.add_argument("--repeat", dest="unique", action="store_false", help="Resend the same queries (cache hits)")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the semantic response cache on")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Hashed stand-in for the embedding model")
+    parser.add_argument("--fake-embedding-ms", type=float, default=2.0, help="Stand-in encode time per text")
+    parser.add_argument("--rebuild-index", action="store_true", help="Build the index at startup instead of copying it")
+    parser.add_argument("--json", type=Path, help="Write the result to this file")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show backend logs")
+    add_arguments(parser)
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        parser.error("--requests 0 needs --duration")
+
+    # Read the baseline up front, so a bad path does not throw away a finished run
+    baseline = None
+    if args.compare:
+        try:
+            baseline = json.loads(args.compare.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            parser.error(f"cannot read --compare file: {e}")
+
+    print("=" * 60)
+    print("Project Dwight - Load Test")
+    print("=" * 60)
+
+    result = asyncio.run(run(args))
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2))
+    print_report(result, baseline)
+
+    if args.json:
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
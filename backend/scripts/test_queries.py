@@ -13,6 +13,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.embeddings import get_embedding
 from core.rag_engine import initialize_rag_engine, retrieve_context
 from core.intent_classifier import classify_intent, IntentType
 from core.llm_client import generate_response
@@ -46,6 +47,25 @@ TEST_QUERIES = {
     ]
 }
 
+# Source files that answer each test query, for scripts/eval_retrieval.py.
+# Queries without an entry (greetings, refusals) are not scored.
+EXPECTED_SOURCES = {
+    "What services does Tiger Logistics offer?": ["customer_faq.md"],
+    "How can I track my shipment?": ["tracking_guide.md"],
+    "What documents do I need for customs clearance?": ["documentation_requirements.md", "customs_clearance.md"],
+    "What is the difference between FCL and LCL?": ["sea_freight_services.md", "customer_faq.md"],
+    "Does Tiger Logistics handle air freight?": ["air_cargo_services.md"],
+    "How much does shipping to Europe cost?": ["pricing_structure.md"],
+    "How can I get a quote?": ["how_to_get_quote.md"],
+    "How do I become a customer?": ["onboarding_process.md"],
+    "What are your payment terms?": ["pricing_structure.md", "onboarding_process.md"],
+    "I want to ship goods from Mumbai to London.": ["how_to_get_quote.md", "sea_freight_services.md"],
+    "What is the escalation protocol?": ["escalation_protocol.md"],
+    "What are the quality standards?": ["quality_standards.md"],
+    "How do I handle customer complaints?": ["escalation_protocol.md", "operational_procedures.md"],
+    "Can you give me an exact price for shipping?": ["pricing_structure.md"],
+}
+
 
 async def test_single_query(query: str, expected_intent: str = None):
     """Test a single query through the pipeline."""
@@ -54,7 +74,7 @@ async def test_single_query(query: str, expected_intent: str = None):
     print("-" * 60)
     
     # Classify intent
-    intent = await classify_intent(query)
+    intent = await classify_intent(query, await get_embedding(query))
     print(f"Intent: {intent.value}")
     
     if expected_intent:
@@ -0,0 +1,72 @@
+"""
+Project Dwight - Worker Memory Report
+Shows the memory of a gunicorn master and its workers.
+
+PSS (proportional set size) splits shared pages between the processes that
+map them, so the PSS total is the real footprint of the whole server. With
+preloading and a memory-mapped index, adding a worker should add far less
+than one worker's RSS.
+
+Usage:
+    python scripts/worker_memory.py             # finds the gunicorn master
+    python scripts/worker_memory.py --master 1234
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.process_memory import get_process_memory
+
+
+def find_master() -> int:
+    """Find the oldest gunicorn process serving main:app."""
+    candidates = []
+    for proc in Path("/proc").iterdir():
+        if not proc.name.isdigit():
+            continue
+        try:
+            cmdline = (proc / "cmdline").read_bytes().replace(b"\0", b" ").decode()
+        except OSError:
+            continue
+        if "gunicorn" in cmdline and "main:app" in cmdline:
+            candidates.append(int(proc.name))
+    if not candidates:
+        sys.exit("No gunicorn process found, pass --master")
+    return min(candidates)
+
+
+def children(pid: int):
+    """Direct child process ids."""
+    found = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        found.extend(int(c) for c in (task / "children").read_text().split())
+    return sorted(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report gunicorn worker memory")
+    parser.add_argument("--master", type=int, help="gunicorn master pid")
+    args = parser.parse_args()
+
+    master = args.master or find_master()
+    rows = [("master", get_process_memory(master))]
+    rows += [("worker", get_process_memory(pid)) for pid in children(master)]
+
+    print(f"{'role':<8}{'pid':>8}{'RSS MB':>10}{'PSS MB':>10}{'shared':>10}{'private':>10}")
+    print("-" * 56)
+    for role, mem in rows:
+        print(
+            f"{role:<8}{mem['pid']:>8}{mem.get('rss_mb', 0):>10.1f}{mem.get('pss_mb', 0):>10.1f}"
+            f"{mem.get('shared_mb', 0):>10.1f}{mem.get('private_mb', 0):>10.1f}"
+        )
+    print("-" * 56)
+    print(f"{'total':<16}{sum(m.get('rss_mb', 0) for _, m in rows):>10.1f}"
+          f"{sum(m.get('pss_mb', 0) for _, m in rows):>10.1f}   (PSS total = real footprint)")
+
+
+if __name__ == "__main__":
+    main()
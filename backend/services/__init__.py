@@ -2,6 +2,6 @@
 Project Dwight - Services Package
 """
 
-from . import lead_capture, logger
+from . import lead_capture, logger, metrics, process_memory
 
-__all__ = ["lead_capture", "logger"]
+__all__ = ["lead_capture", "logger", "metrics", "process_memory"]
@@ -0,0 +1,277 @@
+"""
+Project Dwight - Metrics
+Per-stage latency histograms and counters, exposed at /metrics in the
+Prometheus text format.
+
+Stages are timed where they run (intent, embedding, FAISS search, prompt
+build, LLM, guardrails, lead capture), so a slow p99 can be traced to the
+stage that caused it. Recording is a bisect and two additions, with no
+locks: every observation is made on the event loop. Cache sizes, hit
+counters and the index size are read from their owners at scrape time.
+
+Metrics are per process. With several gunicorn workers each scrape reads
+the worker that answered it, so scrape each worker or aggregate by
+instance.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import time
+
+# Seconds; covers cache hits (sub-ms) up to slow LLM calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[str]:
+        for values, count in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, values)} {_format_value(count)}"
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum, per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        bounds = self.buckets + (float("inf"),)
+        for values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(self.labels, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, values)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric:
+    """A gauge or counter whose values are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        read: Callable[[], Dict[LabelValues, float]],
+        labels: Sequence[str] = ()
+    ):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labels = tuple(labels)
+        self._read = read
+
+    def samples(self) -> Iterable[str]:
+        for values, value in sorted(self._read().items()):
+            yield f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """The metrics of this process, in registration order."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format (0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception:
+                # A failing callback must not break the scrape
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "dwight_stage_duration_seconds", "Time spent in each request stage", ["stage"]
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "dwight_request_duration_seconds", "End-to-end chat request time", ["endpoint"]
+))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    "dwight_stage_errors_total", "Errors raised by each request stage", ["stage"]
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "dwight_llm_tokens_total", "LLM tokens used", ["kind"]
+))
+CONTEXT_TOKENS = REGISTRY.register(Counter(
+    "dwight_context_tokens_total", "Context tokens packed into prompts", ["intent"]
+))
+
+
+class StageTimer:
+    """
+    Times a stage into dwight_stage_duration_seconds.
+
+    Errors raised inside are counted for the stage and re-raised;
+    cancellation is not an error.
+
+        with StageTimer("faiss_search"):
+            scores, ids = index.search(...)
+    """
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            STAGE_ERRORS.inc(self.stage)
+        return False
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage duration measured by the caller."""
+    STAGE_SECONDS.observe(seconds, stage)
+
+
+def record_stage_error(stage: str):
+    """Count an error a stage handled itself (e.g. an LLM fallback answer)."""
+    STAGE_ERRORS.inc(stage)
+
+
+def record_tokens(prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    """Count the tokens of one LLM call."""
+    if prompt_tokens:
+        LLM_TOKENS.inc("prompt", amount=prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.inc("completion", amount=completion_tokens)
+
+
+def _cache_requests() -> Dict[LabelValues, float]:
+    from core.embeddings import get_embedding_cache_stats
+    from core.response_cache import get_response_cache_stats
+    from core.reranker import get_rerank_stats
+
+    values = {}
+    for cache, stats in (
+        ("embedding", get_embedding_cache_stats()),
+        ("response", get_response_cache_stats()),
+        ("rerank", get_rerank_stats()["cache"]),
+    ):
+        values[(cache, "hit")] = stats["hits"]
+        values[(cache, "miss")] = stats["misses"]
+    return values
+
+
+def _cache_entries() -> Dict[LabelValues, float]:
+    from core.embeddings import get_embedding_cache_stats
+    from core.response_cache import get_response_cache_stats
+
+    return {
+        ("embedding",): get_embedding_cache_stats()["size"],
+        ("response",): get_response_cache_stats()["size"],
+    }
+
+
+def _index_chunks() -> Dict[LabelValues, float]:
+    from core.rag_engine import get_index_size
+    return {(): get_index_size()}
+
+
+def _coalesced_requests() -> Dict[LabelValues, float]:
+    from core.single_flight import get_single_flight_stats
+    return {(): get_single_flight_stats()["coalesced"]}
+
+
+REGISTRY.register(CallbackMetric(
+    "dwight_cache_requests_total", "Cache lookups by result", "counter", _cache_requests, ["cache", "result"]
+))
+REGISTRY.register(CallbackMetric(
+    "dwight_cache_entries", "Entries held by each cache", "gauge", _cache_entries, ["cache"]
+))
+REGISTRY.register(CallbackMetric(
+    "dwight_index_chunks", "Chunks in the live vector index", "gauge", _index_chunks
+))
+REGISTRY.register(CallbackMetric(
+    "dwight_coalesced_requests_total", "Chat requests served by an identical in-flight request",
+    "counter", _coalesced_requests
+))
+
+
+def render_metrics() -> str:
+    """Render this process's metrics for a Prometheus scrape."""
+    return REGISTRY.render()
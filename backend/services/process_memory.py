@@ -0,0 +1,58 @@
+"""
+Project Dwight - Process Memory
+Reports per-process memory so multi-worker deployments can verify that the
+index, chunk store and model weights are shared between workers.
+
+RSS counts shared pages in full for every process that maps them, so adding
+up the RSS of N workers overstates real usage. PSS divides each shared page
+between the processes that map it; the sum of PSS over all workers is the
+real footprint.
+"""
+
+from typing import Dict, Optional, Union
+from pathlib import Path
+import os
+import resource
+
+# smaps_rollup field -> reported key
+_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+    "Anonymous": "anonymous_mb",
+}
+
+
+def get_process_memory(pid: Union[int, str] = "self") -> Dict[str, Optional[float]]:
+    """
+    Memory of one process in MB, from /proc/<pid>/smaps_rollup (Linux).
+
+    Falls back to the peak RSS from getrusage on other platforms.
+
+    Args:
+        pid: Process id, or "self"
+
+    Returns:
+        Dict with pid and rss/pss/shared/private/anonymous sizes
+    """
+    memory: Dict[str, Optional[float]] = {"pid": os.getpid() if pid == "self" else int(pid)}
+    rollup = Path(f"/proc/{pid}/smaps_rollup")
+    try:
+        lines = rollup.read_text().splitlines()
+    except OSError:
+        if pid == "self":
+            # ru_maxrss is in kB on Linux and bytes on macOS; only used as a rough hint
+            memory["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        return memory
+
+    for line in lines:
+        name, _, value = line.partition(":")
+        key = _FIELDS.get(name)
+        if key:
+            memory[key] = round(int(value.split()[0]) / 1024, 1)
+    memory["shared_mb"] = round(memory.get("shared_clean_mb", 0) + memory.get("shared_dirty_mb", 0), 1)
+    memory["private_mb"] = round(memory.get("private_clean_mb", 0) + memory.get("private_dirty_mb", 0), 1)
+    return memory
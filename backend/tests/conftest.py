@@ -0,0 +1,60 @@
+"""
+Project Dwight - Test Configuration
+Makes the backend packages importable and provides a fake embedding model
+so unit tests never download model weights.
+"""
+
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import Settings  # noqa: E402
+from core import embeddings  # noqa: E402
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer."""
+
+    def __init__(self, delay: float = 0.0, dim: int = 16):
+        self.delay = delay
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "big")
+            out[i] = np.random.default_rng(seed).standard_normal(self.dim)
+        return out
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(embeddings, "_embedding_model", model)
+    monkeypatch.setattr(embeddings, "_query_cache", embeddings.QueryEmbeddingCache(16, 0))
+    yield model
+    embeddings.shutdown_embedding_executor()
+
+
+@pytest.fixture
+def kb_dirs(tmp_path, monkeypatch):
+    """Point the data and vector store directories at a temp tree."""
+    data_dir = tmp_path / "data"
+    store_dir = tmp_path / "faiss_index"
+    data_dir.mkdir()
+    monkeypatch.setattr(Settings, "data_dir_path", property(lambda self: data_dir))
+    monkeypatch.setattr(Settings, "vector_store_dir", property(lambda self: store_dir))
+    return data_dir, store_dir
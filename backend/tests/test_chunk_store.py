@@ -0,0 +1,50 @@
+"""
+Project Dwight - Chunk Store Tests
+Run with: pytest tests/test_chunk_store.py -v
+"""
+
+import numpy as np
+import pytest
+
+from core.chunk_store import ChunkStore, ChunkStoreError
+
+
+DOCS = [
+    {"id": 42, "content": "## Tracking\nUse the AWB number.", "source": "tracking_guide.md",
+     "bucket": "1_customer_support", "intent": "support", "chunk_index": 0},
+    {"id": 7, "content": "## Escalation — SLA 4h", "source": "escalation_protocol.md",
+     "bucket": "4_internal_policies", "intent": "internal", "chunk_index": 3},
+    {"id": 99, "content": "## FCL vs LCL", "source": "tracking_guide.md",
+     "bucket": "1_customer_support", "intent": "support", "chunk_index": 1},
+]
+
+
+def test_roundtrip_by_faiss_id(tmp_path):
+    path = tmp_path / "chunks.bin"
+    ChunkStore.write(path, DOCS)
+    store = ChunkStore.open(path)
+
+    assert len(store) == 3
+    rows = store.rows_for_ids(np.array([99, 7, 42, -1, 5]))
+    assert rows.tolist()[3:] == [-1, -1]
+    for doc, row in zip([DOCS[2], DOCS[1], DOCS[0]], rows):
+        assert store.get(int(row)) == doc
+    assert store.categories["source"] == ["escalation_protocol.md", "tracking_guide.md"]
+
+
+def test_corruption_is_detected(tmp_path):
+    path = tmp_path / "chunks.bin"
+    ChunkStore.write(path, DOCS)
+    data = bytearray(path.read_bytes())
+    data[-3] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ChunkStoreError):
+        ChunkStore.open(path)
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "chunks.bin"
+    path.write_bytes(b"\x80\x04not a chunk store at all")
+    with pytest.raises(ChunkStoreError):
+        ChunkStore.open(path)
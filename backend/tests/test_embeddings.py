@@ -0,0 +1,126 @@
+"""
+Project Dwight - Embeddings Tests
+Runs against a fake model so no weights need to be downloaded.
+Run with: pytest tests/test_embeddings.py -v
+"""
+
+import asyncio
+
+import numpy as np
+
+from core import embeddings
+
+
+def test_encoding_does_not_block_event_loop(fake_model):
+    """The loop keeps ticking while a slow encode runs on the executor."""
+    fake_model.delay = 0.3
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await embeddings.get_embedding("How can I track my shipment?")
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def test_batch_returns_one_vector_per_text(fake_model):
+    vectors = asyncio.run(embeddings.get_embeddings_batch(["a", "bb", "ccc"]))
+    assert len(vectors) == 3
+    assert all(len(v) == fake_model.dim for v in vectors)
+
+
+def test_normalize_query_ignores_case_whitespace_and_punctuation():
+    assert embeddings.normalize_query("  What is FCL?? ") == "what is fcl"
+    assert embeddings.normalize_query("How can I   track my shipment!") == (
+        embeddings.normalize_query("how can i track my shipment")
+    )
+
+
+def test_concurrent_queries_share_one_encode_call(fake_model):
+    queries = [f"query number {i}" for i in range(10)]
+
+    async def run():
+        return await asyncio.gather(*(embeddings.get_embedding(q) for q in queries))
+
+    vectors = asyncio.run(run())
+    assert len(fake_model.calls) == 1
+    assert fake_model.calls[0] == queries
+    for query, vector in zip(queries, vectors):
+        assert np.array_equal(vector, fake_model.encode([query])[0])
+
+
+def test_batches_are_capped_at_max_size(fake_model, monkeypatch):
+    monkeypatch.setattr(embeddings.settings, "embedding_max_batch_size", 4)
+    monkeypatch.setattr(embeddings, "_batcher", None)
+
+    async def run():
+        await asyncio.gather(*(embeddings.get_embedding(f"q{i}") for i in range(10)))
+
+    asyncio.run(run())
+    assert [len(c) for c in fake_model.calls] == [4, 4, 2]
+
+
+def test_repeated_queries_skip_the_model(fake_model):
+    async def run():
+        first = await embeddings.get_embedding("What is FCL?")
+        second = await embeddings.get_embedding("what is  fcl")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(fake_model.calls) == 1
+    assert first is second
+    assert first.dtype == np.float32
+    assert not first.flags.writeable
+    stats = embeddings.get_embedding_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = embeddings.QueryEmbeddingCache(max_size=2, ttl_seconds=0)
+    cache.put("a", np.ones(2))
+    cache.put("b", np.ones(2))
+    cache.get("a")
+    cache.put("c", np.ones(2))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_onnx_backend_mean_pools_real_tokens_and_normalizes():
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+    from core.onnx_embeddings import OnnxEmbeddingModel
+
+    vocab = {"[PAD]": 0, "fcl": 1, "lcl": 2, "rates": 3}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[PAD]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_padding(pad_id=0)
+
+    class FakeSession:
+        """Token embedding = one-hot of the token id, padding would add noise."""
+        def run(self, _, feeds):
+            ids = feeds["input_ids"]
+            out = np.eye(4, dtype=np.float32)[ids]
+            out[ids == 0] = 100.0
+            return [out]
+
+    model = OnnxEmbeddingModel.__new__(OnnxEmbeddingModel)
+    model.config = {"dimension": 4}
+    model.session = FakeSession()
+    model.tokenizer = tokenizer
+    model._input_names = {"input_ids", "attention_mask"}
+
+    vectors = model.encode(["fcl", "lcl rates"])
+    np.testing.assert_allclose(vectors[0], [0, 1, 0, 0], atol=1e-6)
+    np.testing.assert_allclose(vectors[1], [0, 0, 2 ** -0.5, 2 ** -0.5], atol=1e-6)
+    assert model.encode([]).shape == (0, 4)
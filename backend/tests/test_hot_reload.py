@@ -0,0 +1,104 @@
+"""
+Project Dwight - Hot Reload Tests
+Run with: pytest tests/test_hot_reload.py -v
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import rag_engine
+from core.intent_classifier import IntentType
+from routers import admin
+
+
+@pytest.fixture
+def knowledge_base(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    faq = data_dir / "1_customer_support" / "faq.md"
+    faq.parent.mkdir(parents=True)
+    faq.write_text("## Tracking\nTracking details.\n## Claims\nClaims details.", encoding="utf-8")
+    monkeypatch.setattr(rag_engine.settings, "similarity_threshold", -1.0)
+    monkeypatch.setattr(rag_engine, "_is_initialized", True)
+    monkeypatch.setattr(rag_engine, "_reload_lock", None)
+    asyncio.run(rag_engine.build_vector_store(incremental=False))
+    return faq
+
+
+def test_reload_swaps_snapshot_while_serving(knowledge_base, fake_model):
+    old_snapshot = rag_engine._snapshot
+    knowledge_base.write_text(
+        knowledge_base.read_text(encoding="utf-8") + "\n## Demurrage\nDemurrage details.",
+        encoding="utf-8"
+    )
+    fake_model.delay = 0.02
+
+    async def scenario():
+        queries = [rag_engine.retrieve_context(f"tracking {i}", IntentType.SUPPORT, top_k=5) for i in range(5)]
+        return await asyncio.gather(rag_engine.reload_rag_engine(), *queries)
+
+    result, *contexts = asyncio.run(scenario())
+
+    assert result["added"] == 1
+    assert result["kb_version"] != result["previous_kb_version"]
+    assert all(contexts)
+    assert rag_engine._snapshot is not old_snapshot
+    assert rag_engine._snapshot.index.ntotal == 3
+    # The replaced snapshot is untouched and still readable
+    assert old_snapshot.index.ntotal == 2
+    assert "Claims" in old_snapshot.store.text(0) + old_snapshot.store.text(1)
+
+
+def test_admin_reload_requires_token(knowledge_base, monkeypatch):
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api")
+    client = TestClient(app)
+
+    monkeypatch.setattr(admin.settings, "admin_token", "")
+    assert client.post("/api/admin/reload").status_code == 404
+
+    monkeypatch.setattr(admin.settings, "admin_token", "s3cret")
+    assert client.post("/api/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    response = client.post("/api/admin/reload", headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json()["kb_version"] == rag_engine.get_kb_version()
+
+
+def test_watcher_leaves_rebuild_to_the_building_process(knowledge_base, kb_dirs, monkeypatch):
+    _, store_dir = kb_dirs
+    calls = []
+
+    async def fake_reload(name):
+        calls.append(name)
+        rag_engine._watch_signature = rag_engine._knowledge_base_signature()
+
+    monkeypatch.setattr(rag_engine, "reload_rag_engine", lambda: fake_reload("build"))
+    monkeypatch.setattr(rag_engine, "reload_from_disk", lambda: fake_reload("load"))
+    monkeypatch.setattr(rag_engine, "_watch_signature", rag_engine._knowledge_base_signature())
+
+    async def watch_briefly():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(rag_engine.watch_knowledge_base(0.01), timeout=0.2)
+
+    # Another process is building: a source change must not start a second build
+    with rag_engine._build_lock():
+        knowledge_base.write_text(knowledge_base.read_text(encoding="utf-8") + "\nMore.", encoding="utf-8")
+        asyncio.run(watch_briefly())
+    assert calls == []
+
+    # Its new manifest is then loaded from disk instead of rebuilt
+    manifest = store_dir / rag_engine.MANIFEST_FILE
+    manifest.write_text(manifest.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    asyncio.run(watch_briefly())
+    assert calls == ["load"]
+
+
+def test_reload_from_disk_swaps_in_persisted_store(knowledge_base):
+    old_snapshot = rag_engine._snapshot
+
+    assert asyncio.run(rag_engine.reload_from_disk())
+    assert rag_engine._snapshot is not old_snapshot
+    assert rag_engine._snapshot.kb_version == old_snapshot.kb_version
@@ -0,0 +1,80 @@
+"""
+Project Dwight - Incremental Ingestion Tests
+Run with: pytest tests/test_ingestion.py -v
+"""
+
+import asyncio
+import json
+
+from core import rag_engine
+from core.rag_engine import build_vector_store, MANIFEST_FILE
+
+
+def _write(data_dir, bucket, name, sections):
+    path = data_dir / bucket / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("# Title\n\n" + "\n".join(f"## {s}\n{s} details." for s in sections), encoding="utf-8")
+    return path
+
+
+def _embedded(model):
+    return sum(len(call) for call in model.calls)
+
+
+def test_only_changed_chunks_are_embedded(fake_model, kb_dirs):
+    data_dir, store_dir = kb_dirs
+    _write(data_dir, "1_customer_support", "faq.md", ["Tracking", "Documents"])
+    _write(data_dir, "3_sales_process", "quote.md", ["Quotes", "Onboarding"])
+
+    first = asyncio.run(build_vector_store())
+    assert first["added"] == 6 and first["removed"] == 0
+    assert rag_engine._snapshot.index.ntotal == 6
+    assert _embedded(fake_model) == 6
+
+    # Edit one section: only that chunk is re-embedded, its old version removed
+    _write(data_dir, "3_sales_process", "quote.md", ["Quotes", "Onboarding steps"])
+    second = asyncio.run(build_vector_store())
+    assert second == {"added": 1, "removed": 1, "unchanged": 5, "files_changed": 1}
+    assert _embedded(fake_model) == 7
+    assert rag_engine._snapshot.index.ntotal == 6
+
+    # Delete a file: its chunks leave the index without any embedding
+    (data_dir / "1_customer_support" / "faq.md").unlink()
+    third = asyncio.run(build_vector_store())
+    assert third["removed"] == 3 and third["added"] == 0
+    assert _embedded(fake_model) == 7
+    assert set(rag_engine._snapshot.store.ids.tolist()) == set(
+        rag_engine.faiss.vector_to_array(rag_engine._snapshot.index.id_map).tolist()
+    )
+
+    manifest = json.loads((store_dir / MANIFEST_FILE).read_text())
+    assert list(manifest["files"]) == ["3_sales_process/quote.md"]
+
+
+def test_chunk_ids_are_stable(fake_model, kb_dirs):
+    data_dir, _ = kb_dirs
+    _write(data_dir, "4_internal_policies", "sla.md", ["Escalation"])
+
+    asyncio.run(build_vector_store())
+    ids = rag_engine._snapshot.store.ids.tolist()
+    asyncio.run(build_vector_store(incremental=False))
+    assert rag_engine._snapshot.store.ids.tolist() == ids
+
+
+def test_index_type_change_reuses_stored_vectors(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    _write(data_dir, "1_customer_support", "faq.md", ["Tracking", "Documents"])
+    asyncio.run(build_vector_store())
+    embedded = _embedded(fake_model)
+
+    monkeypatch.setattr(rag_engine.settings, "index_type", "hnsw")
+    stats = asyncio.run(build_vector_store())
+    assert stats["added"] == 0
+    assert _embedded(fake_model) == embedded
+    assert rag_engine.describe_index(rag_engine._snapshot.index) == "IndexHNSWFlat"
+
+    # HNSW cannot remove ids in place, so a removal rebuilds from stored vectors
+    _write(data_dir, "1_customer_support", "faq.md", ["Tracking"])
+    stats = asyncio.run(build_vector_store())
+    assert stats["removed"] == 1 and stats["added"] == 0
+    assert rag_engine._snapshot.index.ntotal == 2
@@ -0,0 +1,71 @@
+"""
+Project Dwight - Intent Prototype Tests
+Run with: pytest tests/test_intent_prototypes.py -v
+"""
+
+import asyncio
+
+import numpy as np
+
+from core import intent_classifier, rag_engine
+from core.intent_classifier import IntentPrototypes, IntentType, classify_intent
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_nearest_prototype_and_margin():
+    vectors = np.stack([_unit(1, 0.1, 0), _unit(1, -0.1, 0), _unit(0, 1, 0), _unit(0, 0, 1)])
+    buckets = ["support", "support", "sales", "internal"]
+    prototypes = IntentPrototypes.build(
+        vectors, buckets,
+        {"support": IntentType.SUPPORT, "sales": IntentType.SALES, "internal": IntentType.INTERNAL}
+    )
+    assert len(prototypes.intents) == 3
+
+    intent, score, margin = prototypes.classify(np.array([0, 3, 0.5], dtype=np.float32))
+    assert intent == IntentType.SALES
+    assert score > 0.9 and margin > 0.5
+
+    # Equally close to support and sales: no clear winner
+    _, _, margin = prototypes.classify(_unit(1, 1, 0))
+    assert abs(margin) < 0.01
+
+
+def test_classify_intent_uses_prototypes(monkeypatch):
+    vectors = np.stack([_unit(1, 0, 0), _unit(0, 1, 0), _unit(0, 0, 1)])
+    prototypes = IntentPrototypes.build(
+        vectors, ["a", "b", "c"],
+        {"a": IntentType.SUPPORT, "b": IntentType.SALES, "c": IntentType.INTERNAL}
+    )
+    monkeypatch.setattr(rag_engine, "get_intent_prototypes", lambda: prototypes)
+    monkeypatch.setattr(intent_classifier.settings, "intent_classifier", "prototype")
+    monkeypatch.setattr(intent_classifier.settings, "intent_min_margin", 0.1)
+
+    def classify(message, vector=None):
+        return asyncio.run(classify_intent(message, vector))
+
+    # No keyword hits, but the embedding is close to the sales bucket
+    assert classify("shipping a container to Rotterdam", _unit(0.1, 1, 0)) == IntentType.SALES
+    # Patterns and keyword hits decide before any prototype is compared
+    assert classify("what is our policy on returns", _unit(0.1, 1, 0)) == IntentType.INTERNAL
+    assert classify("what is the team size", _unit(0.1, 1, 0)) == IntentType.INTERNAL
+    # Too close to call, or no vector: support
+    assert classify("shipping a container to Rotterdam", _unit(1, 1, 0)) == IntentType.SUPPORT
+    assert classify("shipping a container to Rotterdam") == IntentType.SUPPORT
+
+
+def test_snapshot_builds_prototypes(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    for key in ["1_customer_support/faq.md", "3_sales_process/quote.md", "4_internal_policies/sla.md"]:
+        path = data_dir / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"## {key}\nDetails about {key}.", encoding="utf-8")
+    monkeypatch.setattr(rag_engine.settings, "intent_classifier", "prototype")
+    asyncio.run(rag_engine.build_vector_store(incremental=False))
+
+    prototypes = rag_engine.get_intent_prototypes()
+    assert sorted(p.value for p in prototypes.intents) == ["internal", "sales", "support"]
+    assert np.allclose(np.linalg.norm(prototypes.vectors, axis=1), 1.0)
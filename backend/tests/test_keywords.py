@@ -0,0 +1,50 @@
+"""
+Project Dwight - Keyword Matcher Tests
+Run with: pytest tests/test_keywords.py -v
+"""
+
+import asyncio
+import random
+import re
+
+from core.guardrails import check_lead_trigger
+from core.intent_classifier import IntentType, classify_intent
+from core.keywords import (
+    INTERNAL_KEYWORDS,
+    INTERNAL_PATTERNS,
+    LEAD_TRIGGER_KEYWORDS,
+    MATCHER,
+    SALES_KEYWORDS,
+    SALES_PATTERNS,
+)
+
+
+def test_matcher_agrees_with_per_list_scan():
+    rng = random.Random(7)
+    words = SALES_KEYWORDS + INTERNAL_KEYWORDS + LEAD_TRIGGER_KEYWORDS + [
+        "how do i pay", "could you send me a quote", "what is our policy", "staff guideline",
+        "separate", "steam", "Rates", "FEES", "the", "Dubai", "FCL", "?",
+    ]
+    for _ in range(500):
+        message = " ".join(rng.choice(words) for _ in range(rng.randint(1, 10)))
+        text = message.lower()
+        hits = MATCHER.match(message)
+        for group, keywords in (("sales", SALES_KEYWORDS), ("internal", INTERNAL_KEYWORDS),
+                                ("lead", LEAD_TRIGGER_KEYWORDS)):
+            assert hits.keywords(group) == tuple(k for k in keywords if k in text)
+        assert hits.pattern("sales") == any(re.search(p, text) for p in SALES_PATTERNS)
+        assert hits.pattern("internal") == any(re.search(p, text) for p in INTERNAL_PATTERNS)
+
+
+def test_classification_and_lead_trigger():
+    cases = {
+        "What is FCL shipping?": (IntentType.SUPPORT, False),
+        "Can you send me a quote for Dubai?": (IntentType.SALES, True),
+        "What are the rates and fees?": (IntentType.SALES, False),
+        "What is the escalation procedure?": (IntentType.INTERNAL, False),
+        "How do I contact you?": (IntentType.SUPPORT, True),
+    }
+    for message, (intent, lead) in cases.items():
+        classified = asyncio.run(classify_intent(message))
+        assert classified == intent, message
+        assert asyncio.run(check_lead_trigger(message, IntentType.SUPPORT)) == lead, message
@@ -0,0 +1,56 @@
+"""
+Project Dwight - Lexical Index Tests
+Run with: pytest tests/test_lexical_index.py -v
+"""
+
+import numpy as np
+
+from core.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+TEXTS = [
+    "FCL rates for a full container load from Mumbai",
+    "LCL consolidation: shared container space",
+    "An AWB is the air waybill for air freight",
+    "Find the HS code of your goods before export",
+]
+
+
+def test_tokenize_keeps_freight_codes():
+    assert tokenize("What is the HS code for an AWB?") == ["hs", "code", "awb"]
+
+
+def test_search_ranks_exact_terms_and_respects_mask():
+    index = LexicalIndex.build(TEXTS)
+
+    rows, scores = index.search("awb number", k=3)
+    assert rows.tolist() == [2]
+    assert scores[0] > 0
+
+    rows, _ = index.search("container", k=3)
+    assert sorted(rows.tolist()) == [0, 1]
+
+    mask = np.array([False, True, True, True])
+    rows, _ = index.search("container", k=3, mask=mask)
+    assert rows.tolist() == [1]
+
+    assert len(index.search("unknown words", k=3)[0]) == 0
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = LexicalIndex.build(TEXTS, k1=1.5, b=0.5)
+    index.save(tmp_path / "lexical.npz")
+    loaded = LexicalIndex.load(tmp_path / "lexical.npz")
+
+    assert (loaded.num_docs, loaded.k1, loaded.b) == (4, 1.5, 0.5)
+    for query in ("hs code", "container load", "air freight"):
+        expected, expected_scores = index.search(query, k=4)
+        rows, scores = loaded.search(query, k=4)
+        assert rows.tolist() == expected.tolist()
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    rows, _ = reciprocal_rank_fusion([np.array([5, 1, 2]), np.array([1, 7])], k=60)
+    assert rows[0] == 1
+    assert set(rows.tolist()) == {1, 2, 5, 7}
@@ -0,0 +1,123 @@
+"""
+Project Dwight - LLM Client Tests
+Run with: pytest tests/test_llm_client.py -v
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from core import llm_client
+from core.intent_classifier import IntentType
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test-model",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def test_concurrent_calls_overlap_on_a_shared_pool(monkeypatch):
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        query = json.loads(request.content)["messages"][-1]["content"]
+        return httpx.Response(200, json=_completion(f"answer to {query}"))
+
+    monkeypatch.setattr(llm_client.settings, "groq_api_key", "test-key")
+    monkeypatch.setattr(llm_client.settings, "llm_max_concurrency", 3)
+
+    class MockedClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", MockedClient)
+
+    async def scenario():
+        start = time.perf_counter()
+        answers = await asyncio.gather(*[
+            llm_client.generate_response(f"q{i}", "context", IntentType.SUPPORT) for i in range(6)
+        ])
+        elapsed = time.perf_counter() - start
+        pool = llm_client._http_client
+        await llm_client.close_llm_client()
+        return answers, elapsed, pool
+
+    answers, elapsed, pool = asyncio.run(scenario())
+
+    assert answers == [f"answer to q{i}" for i in range(6)]
+    # Calls run concurrently, capped by LLM_MAX_CONCURRENCY
+    assert peak == 3
+    assert elapsed < 0.45
+    assert pool.is_closed and llm_client._groq_client is None
+
+
+def test_fake_llm_server_speaks_the_groq_protocol(monkeypatch):
+    from scripts.fake_llm import FakeLLMConfig, create_app
+    from services import metrics
+
+    fake = create_app(FakeLLMConfig(latency_ms=0, jitter_ms=0, tokens_per_s=0, answer_tokens=5))
+
+    class FakeServerClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.ASGITransport(app=fake), **kwargs)
+
+    monkeypatch.setattr(llm_client.settings, "groq_api_key", "test-key")
+    monkeypatch.setattr(llm_client.settings, "groq_base_url", "http://fake-llm")
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", FakeServerClient)
+    completion_tokens = metrics.LLM_TOKENS.value("completion")
+
+    async def scenario():
+        answer, tokens = await llm_client.generate_completion("q", "context", IntentType.SUPPORT)
+        streamed = [t async for t in llm_client.stream_response("q", "context", IntentType.SUPPORT)]
+        await llm_client.close_llm_client()
+        return answer, tokens, streamed
+
+    answer, tokens, streamed = asyncio.run(scenario())
+
+    assert len(answer.split()) == 5 and tokens > 5
+    assert "".join(streamed) == answer
+    # Usage from the blocking call and from the last stream chunk
+    assert metrics.LLM_TOKENS.value("completion") == completion_tokens + 10
+
+
+def test_llm_stage_times_generation_only(monkeypatch):
+    from scripts.fake_llm import FakeLLMConfig, create_app
+    from services import metrics
+
+    fake = create_app(FakeLLMConfig(latency_ms=0, jitter_ms=0, tokens_per_s=0, answer_tokens=5))
+
+    class FakeServerClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.ASGITransport(app=fake), **kwargs)
+
+    monkeypatch.setattr(llm_client.settings, "groq_api_key", "test-key")
+    monkeypatch.setattr(llm_client.settings, "groq_base_url", "http://fake-llm")
+    monkeypatch.setattr(llm_client.httpx, "AsyncClient", FakeServerClient)
+    observed = []
+    monkeypatch.setattr(llm_client, "observe_stage", lambda stage, seconds: observed.append((stage, seconds)))
+    queued = metrics.STAGE_SECONDS.count("llm_queue")
+
+    async def scenario():
+        async for _ in llm_client.stream_response("q", "context", IntentType.SUPPORT):
+            await asyncio.sleep(0.05)  # A slow client
+        await llm_client.close_llm_client()
+
+    asyncio.run(scenario())
+
+    # Time the consumer spends between deltas is not LLM time
+    [(stage, seconds)] = observed
+    assert stage == "llm" and seconds < 0.2
+    assert metrics.STAGE_SECONDS.count("llm_queue") == queued + 1
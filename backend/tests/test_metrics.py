@@ -0,0 +1,59 @@
+"""
+Project Dwight - Metrics Tests
+Run with: pytest tests/test_metrics.py -v
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import health
+from services import metrics
+from services.metrics import Histogram, MetricsRegistry, StageTimer
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("test_seconds", "Test", ["stage"], buckets=[0.1, 1.0]))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "llm")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP test_seconds Test", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="llm",le="0.1"} 2',
+        'test_seconds_bucket{stage="llm",le="1.0"} 3',
+        'test_seconds_bucket{stage="llm",le="+Inf"} 4',
+        'test_seconds_sum{stage="llm"} 3.65',
+        'test_seconds_count{stage="llm"} 4',
+    ]
+
+
+def test_stage_timer_counts_errors():
+    observed = metrics.STAGE_SECONDS.count("test_stage")
+    errors = metrics.STAGE_ERRORS.value("test_stage")
+
+    with StageTimer("test_stage"):
+        pass
+    with pytest.raises(ValueError):
+        with StageTimer("test_stage"):
+            raise ValueError("boom")
+
+    assert metrics.STAGE_SECONDS.count("test_stage") == observed + 2
+    assert metrics.STAGE_ERRORS.value("test_stage") == errors + 1
+
+
+def test_metrics_endpoint(monkeypatch):
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+
+    metrics.observe_stage("embedding", 0.002)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'dwight_stage_duration_seconds_count{stage="embedding"}' in response.text
+    assert "# TYPE dwight_index_chunks gauge" in response.text
+
+    monkeypatch.setattr(health.settings, "metrics_enabled", False)
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,85 @@
+"""
+Project Dwight - Stage Pipeline Tests
+Run with: pytest tests/test_pipeline.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from core.pipeline import Pipeline
+
+
+def _sleep_then(value, seconds):
+    async def stage(results):
+        await asyncio.sleep(seconds)
+        return value(results) if callable(value) else value
+    return stage
+
+
+def test_independent_stages_run_concurrently():
+    pipeline = (
+        Pipeline("test")
+        .stage("intent", _sleep_then("support", 0.05))
+        .stage("vector", _sleep_then([0.1], 0.05))
+        .stage("lead", _sleep_then(lambda r: r["intent"] == "sales", 0.05), after=("intent",))
+        .stage("answer", _sleep_then(lambda r: f"{r['message']}:{r['intent']}", 0.05), after=("intent", "vector"))
+    )
+
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run(message="hi"))
+
+    assert results["answer"] == "hi:support" and results["lead"] is False
+    # Two levels of 50ms each, not four stages in sequence
+    assert time.perf_counter() - start < 0.15
+    assert pipeline.describe() == "intent; vector; lead <- intent; answer <- intent, vector"
+
+
+def test_failing_stage_cancels_the_rest():
+    finished = []
+
+    async def broken(results):
+        raise RuntimeError("search failed")
+
+    async def slow(results):
+        await asyncio.sleep(0.2)
+        finished.append("slow")
+
+    pipeline = Pipeline("test").stage("slow", slow).stage("broken", broken)
+    with pytest.raises(RuntimeError, match="search failed"):
+        asyncio.run(pipeline.run())
+    assert finished == []
+
+    with pytest.raises(ValueError):
+        asyncio.run(Pipeline("test").stage("answer", slow, after=("intent",)).run())
+
+
+def test_used_stage_is_awaited_only_on_demand():
+    finished = {}
+
+    async def intent(results):
+        if results["message"] == "quote":
+            return "sales"
+        return f"near {await results.wait('vector')}"
+
+    async def lead(results):
+        finished["lead"] = time.perf_counter()
+        return results["intent"]
+
+    pipeline = (
+        Pipeline("test")
+        .stage("vector", _sleep_then("sales bucket", 0.1))
+        .stage("intent", intent, uses=("vector",))
+        .stage("lead", lead, after=("intent",))
+    )
+    assert pipeline.describe() == "vector; intent <- (vector); lead <- intent"
+
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run(message="quote"))
+    assert results["lead"] == "sales"
+    # Decided without the vector: the lead stage did not wait for it
+    assert finished["lead"] - start < 0.05
+
+    results = asyncio.run(pipeline.run(message="hello"))
+    assert results["lead"] == "near sales bucket"
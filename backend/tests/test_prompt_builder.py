@@ -0,0 +1,60 @@
+"""
+Project Dwight - Prompt Builder Tests
+Run with: pytest tests/test_prompt_builder.py -v
+"""
+
+import pytest
+
+from core import prompt_builder
+from core.intent_classifier import IntentType
+from core.llm_client import _build_messages
+from core.prompt_builder import CONTEXT_SEPARATOR, count_tokens, pack_context
+from core.rag_engine import chunk_text
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Deterministic counts without downloading the tiktoken encoding
+    monkeypatch.setattr(prompt_builder, "_encoder", False)
+
+
+def _section(words):
+    return "## Rates\n" + " ".join(f"word{i}" for i in range(words))
+
+
+def test_overlapping_and_duplicate_chunks_are_removed():
+    chunks = chunk_text(_section(400), "rates.md")
+    assert len(chunks) >= 2 and chunks[1].split()[0] in chunks[0]
+
+    context, stats = pack_context([chunks[1], chunks[0], chunks[0], chunks[1][:300]], max_tokens=0)
+
+    assert stats["duplicates"] == 2 and stats["trimmed"] == 1
+    parts = context.split(CONTEXT_SEPARATOR)
+    assert parts[0] == chunks[1]
+    # Each word of the two chunks appears once
+    words = context.replace(CONTEXT_SEPARATOR, " ").split()
+    assert len(words) == len(set(words))
+    assert set(words) == set(chunks[0].split()) | set(chunks[1].split())
+
+
+def test_chunks_are_packed_best_first_within_budget():
+    best = "FCL means full container load. " * 10
+    long = "Long detailed chunk about customs paperwork. " * 40
+    short = "Cold chain keeps reefer cargo between 2 and 8 degrees Celsius."
+
+    context, stats = pack_context([best, long, short], max_tokens=150)
+
+    assert context == best.strip() + CONTEXT_SEPARATOR + short
+    assert stats["over_budget"] == 1
+    assert count_tokens(context) <= stats["tokens"] <= 150
+
+    # A single chunk over budget is cut at a sentence boundary, never dropped
+    context, stats = pack_context([long], max_tokens=50)
+    assert context and context.endswith(".") and count_tokens(context) <= 50
+
+
+def test_query_is_sent_once():
+    messages = _build_messages("What is the FCL transit time to Dubai?", "context", IntentType.SUPPORT)
+    prompt = " ".join(m["content"] for m in messages)
+    assert prompt.count("What is the FCL transit time to Dubai?") == 1
+    assert messages[-1] == {"role": "user", "content": "What is the FCL transit time to Dubai?"}
@@ -0,0 +1,84 @@
+"""
+Project Dwight - Reranker Tests
+Run with: pytest tests/test_reranker.py -v
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from core import reranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the chunk contains."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    def predict(self, pairs, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        time.sleep(self.delay)
+        return [sum(word in text.lower() for word in query.lower().split()) for query, text in pairs]
+
+
+@pytest.fixture
+def cross_encoder(monkeypatch):
+    def install(delay=0.0):
+        model = FakeCrossEncoder(delay)
+        monkeypatch.setattr(reranker, "_reranker_model", model)
+        monkeypatch.setattr(reranker, "_score_cache", reranker.RerankScoreCache(64))
+        return model
+    yield install
+    reranker.shutdown_reranker()
+
+
+TEXTS = ["Air freight basics", "FCL container rates to Rotterdam", "Rotterdam port guide"]
+IDS = np.array([11, 22, 33])
+
+
+def test_rerank_batches_and_caches_scores(cross_encoder):
+    model = cross_encoder()
+
+    order = asyncio.run(reranker.rerank("FCL rates Rotterdam", IDS, TEXTS, top_n=2))
+    assert order.tolist() == [1, 2]
+    assert len(model.calls) == 1 and len(model.calls[0]) == 3
+
+    # Same query (after normalization): served from the score cache
+    order = asyncio.run(reranker.rerank("fcl rates, rotterdam?", IDS, TEXTS, top_n=2))
+    assert order.tolist() == [1, 2]
+    assert len(model.calls) == 1
+
+
+def test_rerank_skips_when_over_budget(cross_encoder, monkeypatch):
+    model = cross_encoder(delay=0.2)
+    monkeypatch.setattr(reranker.settings, "rerank_budget_ms", 20)
+
+    async def scenario():
+        skipped = await reranker.rerank("FCL rates", IDS, TEXTS, top_n=2)
+        await asyncio.sleep(0.3)  # Let the background scoring finish
+        return skipped, await reranker.rerank("FCL rates", IDS, TEXTS, top_n=2)
+
+    skipped, order = asyncio.run(scenario())
+    assert skipped is None
+    assert order.tolist()[0] == 1
+    assert len(model.calls) == 1
+
+
+def test_rerank_drops_queued_jobs_over_budget(cross_encoder, monkeypatch):
+    model = cross_encoder(delay=0.2)
+    monkeypatch.setattr(reranker.settings, "rerank_budget_ms", 20)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            reranker.rerank(f"FCL rates {i}", IDS, TEXTS, top_n=2) for i in range(5)
+        ))
+        await asyncio.sleep(0.3)  # Let the running job finish
+        return results
+
+    assert asyncio.run(scenario()) == [None] * 5
+    # Only the job that had started was scored; the queued ones were cancelled
+    assert len(model.calls) == 1
@@ -0,0 +1,102 @@
+"""
+Project Dwight - Semantic Response Cache Tests
+Run with: pytest tests/test_response_cache.py -v
+"""
+
+import multiprocessing
+import sys
+
+import numpy as np
+import pytest
+
+from core.intent_classifier import IntentType
+from core.response_cache import SemanticResponseCache
+
+
+def _vec(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def _cache(tmp_path, **overrides):
+    options = dict(cache_dir=tmp_path, threshold=0.9, max_entries=10, ttl_seconds=0)
+    options.update(overrides)
+    return SemanticResponseCache(**options)
+
+
+def test_near_duplicate_query_hits(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(_vec(1, 0, 0), "FCL means full container load.", IntentType.SUPPORT, "v1")
+
+    assert cache.lookup(_vec(0.98, 0.05, 0), IntentType.SUPPORT, "v1") == "FCL means full container load."
+    assert cache.lookup(_vec(0, 1, 0), IntentType.SUPPORT, "v1") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_intent_must_match(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(_vec(1, 0, 0), "answer", IntentType.SUPPORT, "v1")
+    assert cache.lookup(_vec(1, 0, 0), IntentType.SALES, "v1") is None
+
+
+def test_new_kb_version_invalidates_entries(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(_vec(1, 0, 0), "answer", IntentType.SUPPORT, "v1")
+    assert cache.lookup(_vec(1, 0, 0), IntentType.SUPPORT, "v2") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put(_vec(1, 0, 0), "a", IntentType.SUPPORT, "v1")
+    cache.put(_vec(0, 1, 0), "b", IntentType.SUPPORT, "v1")
+    cache.lookup(_vec(1, 0, 0), IntentType.SUPPORT, "v1")
+    cache.put(_vec(0, 0, 1), "c", IntentType.SUPPORT, "v1")
+
+    assert cache.lookup(_vec(0, 1, 0), IntentType.SUPPORT, "v1") is None
+    assert cache.lookup(_vec(1, 0, 0), IntentType.SUPPORT, "v1") == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_survives_restart(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(_vec(1, 0, 0), "answer", IntentType.INTERNAL, "v1")
+    cache.save()
+
+    restored = _cache(tmp_path)
+    restored.load()
+    assert restored.lookup(_vec(1, 0, 0), IntentType.INTERNAL, "v1") == "answer"
+    restored.put(_vec(0, 1, 0), "second", IntentType.INTERNAL, "v1")
+    assert restored.stats()["size"] == 2
+
+
+def test_new_embedding_dimension_after_kb_change(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(_vec(1, 0, 0), "answer", IntentType.SUPPORT, "v1")
+
+    # A new embedding model changes both the KB version and the dimension
+    cache.put(_vec(1, 0, 0, 0), "new answer", IntentType.SUPPORT, "v2")
+    assert cache.lookup(_vec(1, 0, 0, 0), IntentType.SUPPORT, "v2") == "new answer"
+
+
+def _save_repeatedly(cache_dir, size):
+    cache = SemanticResponseCache(cache_dir, threshold=0.9, max_entries=100, ttl_seconds=0)
+    for i in range(size):
+        cache.put(_vec(i, 1, 0), f"answer {i}", IntentType.SUPPORT, "v1")
+    for _ in range(30):
+        cache.save()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test_concurrent_worker_saves_publish_matching_files(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_save_repeatedly, args=(tmp_path, size)) for size in (3, 7)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    restored = _cache(tmp_path)
+    restored.load()
+    # Index and entries come from the same worker
+    assert restored.stats()["size"] in (3, 7)
+    assert not list(tmp_path.glob("*.tmp"))
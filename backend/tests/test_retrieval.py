@@ -0,0 +1,89 @@
+"""
+Project Dwight - Retrieval Tests
+Run with: pytest tests/test_retrieval.py -v
+"""
+
+import asyncio
+
+import pytest
+
+from core import rag_engine, reranker
+from core.intent_classifier import IntentType
+
+
+SECTIONS = {
+    "1_customer_support/faq.md": ["Tracking", "Documents", "Delays", "Claims"],
+    "3_sales_process/quote.md": ["Quotes", "Onboarding"],
+    "4_internal_policies/sla.md": ["Escalation", "Audits", "Complaints"],
+}
+
+
+@pytest.fixture
+def knowledge_base(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    for key, sections in SECTIONS.items():
+        path = data_dir / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(f"## {s}\n{s} details." for s in sections), encoding="utf-8")
+    monkeypatch.setattr(rag_engine.settings, "similarity_threshold", -1.0)
+    monkeypatch.setattr(rag_engine, "_is_initialized", True)
+    asyncio.run(rag_engine.build_vector_store(incremental=False))
+
+
+def _sources(context):
+    return [part.split("\n")[0] for part in context.split("\n\n---\n\n")]
+
+
+def test_own_bucket_first_then_other_buckets(knowledge_base, monkeypatch):
+    monkeypatch.setattr(rag_engine.settings, "retrieval_other_top_k", 2)
+    context = asyncio.run(rag_engine.retrieve_context("escalate a complaint", IntentType.INTERNAL, top_k=2))
+    headers = _sources(context)
+
+    internal = {"## Escalation", "## Audits", "## Complaints"}
+    assert len(headers) == 4
+    assert set(headers[:2]) <= internal
+    assert not set(headers[2:]) & internal
+
+
+def test_exact_top_k_from_small_bucket(knowledge_base, monkeypatch):
+    monkeypatch.setattr(rag_engine.settings, "retrieval_other_top_k", 0)
+    context = asyncio.run(rag_engine.retrieve_context("get a quote", IntentType.SALES, top_k=5))
+    assert sorted(_sources(context)) == ["## Onboarding", "## Quotes"]
+
+
+def test_lexical_match_survives_dense_threshold(knowledge_base, monkeypatch):
+    # No dense result clears this threshold, so only BM25 can find the chunk
+    monkeypatch.setattr(rag_engine.settings, "similarity_threshold", 2.0)
+    monkeypatch.setattr(rag_engine.settings, "retrieval_other_top_k", 0)
+    context = asyncio.run(rag_engine.retrieve_context("claims", IntentType.SUPPORT, top_k=3))
+    assert _sources(context) == ["## Claims"]
+
+    monkeypatch.setattr(rag_engine.settings, "hybrid_search_enabled", False)
+    assert asyncio.run(rag_engine.retrieve_context("claims", IntentType.SUPPORT, top_k=3)) == ""
+
+
+def test_rerank_keeps_best_candidates(knowledge_base, monkeypatch):
+    class KeywordCrossEncoder:
+        def predict(self, pairs, show_progress_bar=False):
+            return [float(query.lower() in text.lower()) for query, text in pairs]
+
+    monkeypatch.setattr(reranker, "_reranker_model", KeywordCrossEncoder())
+    monkeypatch.setattr(reranker, "_score_cache", reranker.RerankScoreCache(64))
+    monkeypatch.setattr(rag_engine.settings, "rerank_enabled", True)
+    monkeypatch.setattr(rag_engine.settings, "rerank_top_n", 1)
+    monkeypatch.setattr(rag_engine.settings, "retrieval_other_top_k", 0)
+
+    context = asyncio.run(rag_engine.retrieve_context("delays", IntentType.SUPPORT, top_k=3))
+    reranker.shutdown_reranker()
+    assert _sources(context) == ["## Delays"]
+
+
+def test_eval_scores_ranked_sources():
+    from scripts.eval_retrieval import score
+
+    # Relevant sources at ranks 2 and 4; only rank 2 is within k=3
+    result = score(["a.md", "b.md", "c.md", "d.md"], ["b.md", "d.md"], k=3)
+    assert result["recall"] == 0.5
+    assert result["rr"] == 0.5
+    assert result["ndcg"] == pytest.approx((1 / 1.585) / (1 + 1 / 1.585), rel=1e-3)
+    assert score(["a.md"], ["b.md"], k=3) == {"recall": 0.0, "rr": 0.0, "ndcg": 0.0}
@@ -0,0 +1,80 @@
+"""
+Project Dwight - Single-Flight Tests
+Run with: pytest tests/test_single_flight.py -v
+"""
+
+import asyncio
+
+from core.intent_classifier import IntentType
+from core.single_flight import SingleFlight
+from routers import chat
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    async def work(value):
+        runs.append(value)
+        await asyncio.sleep(0.02)
+        return value * 2
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        results = await asyncio.gather(*[flight.run("a", lambda: work(1)) for _ in range(5)],
+                                       flight.run("b", lambda: work(2)))
+        # A cancelled caller does not cancel the shared run
+        first = asyncio.ensure_future(flight.run("c", lambda: work(3)))
+        second = asyncio.ensure_future(flight.run("c", lambda: work(3)))
+        await asyncio.sleep(0)
+        first.cancel()
+        results.append(await second)
+        errors = await asyncio.gather(flight.run("d", failing), flight.run("d", failing),
+                                      return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(scenario())
+
+    assert results == [2, 2, 2, 2, 2, 4, 6]
+    assert runs == [1, 2, 3]
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    stats = flight.stats()
+    assert (stats["executed"], stats["coalesced"], stats["in_flight"]) == (4, 6, 0)
+
+
+def test_identical_chat_requests_are_coalesced(monkeypatch):
+    calls = []
+
+    async def classify(message):
+        return IntentType.SUPPORT
+
+    async def embed(message):
+        return None
+
+    async def answer(message, intent, query_vector):
+        calls.append(message)
+        await asyncio.sleep(0.02)
+        return chat._Answer("FCL means full container load.")
+
+    async def log(**kwargs):
+        pass
+
+    monkeypatch.setattr(chat, "is_ready", lambda: True)
+    monkeypatch.setattr(chat, "classify_intent_by_keywords", classify)
+    monkeypatch.setattr(chat, "get_embedding", embed)
+    monkeypatch.setattr(chat, "_answer", answer)
+    monkeypatch.setattr(chat, "log_chat_interaction", log)
+    monkeypatch.setattr(chat, "chat_flight", SingleFlight())
+
+    async def scenario():
+        messages = ["What is FCL?", "what is fcl", "What is FCL?!", "What is LCL?"]
+        return await asyncio.gather(*[chat.chat(chat.ChatRequest(message=m), None) for m in messages])
+
+    responses = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert {r.response for r in responses} == {"FCL means full container load."}
+    assert chat.chat_flight.stats()["coalesced"] == 2
@@ -0,0 +1,110 @@
+"""
+Project Dwight - Streaming Chat Tests
+Run with: pytest tests/test_streaming.py -v
+"""
+
+import asyncio
+import json
+import random
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.guardrails import REFUSAL_RESPONSE, StreamingValidator, validate_response
+from core.intent_classifier import IntentType
+from routers import chat
+
+
+def _stream(text, context, seed):
+    """Feed text to a StreamingValidator in random-sized chunks."""
+    rng = random.Random(seed)
+    validator = StreamingValidator(context)
+    out, pos = [], 0
+    while pos < len(text):
+        size = rng.randint(1, 6)
+        out.append(validator.feed(text[pos:pos + size]))
+        pos += size
+    out.append(validator.finish())
+    return out
+
+
+def test_streaming_validator_matches_batch_validation():
+    answers = [
+        "  I'm sorry, but FCL means full container load. I think it suits large shipments.  ",
+        "We offer cold chain. As an AI I don't have access to real-time rates, maybe ask sales.",
+        "Typically in the industry rates vary.",
+        "  probably ",
+    ]
+    for context in ("FCL context", ""):
+        for answer in answers:
+            expected = asyncio.run(validate_response(answer, context))
+            for seed in range(5):
+                assert "".join(_stream(answer, context, seed)) == expected
+
+    # Text is released before the answer is complete when there is context
+    chunks = _stream("Tiger Logistics ships full containers worldwide every week. " * 3, "ctx", 0)
+    assert any(chunks[:-1])
+    # Without context nothing is released until the answer can be checked as a whole
+    chunks = _stream("Generally speaking, the transit time is 20 days.", "", 0)
+    assert not any(chunks[:-1]) and chunks[-1] == REFUSAL_RESPONSE
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_emits_tokens_then_done(monkeypatch):
+    cached = []
+
+    async def classify(message):
+        return IntentType.SALES
+
+    async def embed(message):
+        return np.ones(4, dtype=np.float32)
+
+    async def no_cache(*args):
+        return None
+
+    async def store(vector, response, intent, kb_version):
+        cached.append(response)
+
+    async def context(message, intent):
+        return "Tiger Logistics offers FCL."
+
+    async def tokens(query, context, intent):
+        for token in ["We ", "offer ", "I think ", "FCL ", "shipping."]:
+            yield token
+
+    async def log(**kwargs):
+        pass
+
+    monkeypatch.setattr(chat, "is_ready", lambda: True)
+    monkeypatch.setattr(chat, "classify_intent_by_keywords", classify)
+    monkeypatch.setattr(chat, "get_embedding", embed)
+    monkeypatch.setattr(chat, "get_cached_response", no_cache)
+    monkeypatch.setattr(chat, "cache_response", store)
+    monkeypatch.setattr(chat, "retrieve_context", context)
+    monkeypatch.setattr(chat, "stream_response", tokens)
+    monkeypatch.setattr(chat, "log_chat_interaction", log)
+
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    response = TestClient(app).post("/api/chat/stream", json={"message": "I want a quote"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [name for name, _ in events[:-1]] == ["token"] * (len(events) - 1)
+    answer = "".join(data["text"] for _, data in events[:-1])
+    assert answer == asyncio.run(validate_response("We offer I think FCL shipping.", "ctx"))
+    assert "think" not in answer
+    name, done = events[-1]
+    assert name == "done"
+    assert (done["intent"], done["lead_prompt"], done["cached"]) == ("sales", True, False)
+    assert {"ttft_ms", "retrieval_ms", "total_ms"} <= set(done["timings"])
+    assert cached == [answer]
@@ -0,0 +1,102 @@
+"""
+Project Dwight - Warm Start Tests
+Run with: pytest tests/test_warmup.py -v
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import rag_engine, warmup
+from routers import chat, health
+
+
+def _app():
+    app = FastAPI()
+    app.include_router(health.router)
+    app.include_router(chat.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_warm_up_loads_components_and_reports_ready(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    faq = data_dir / "1_customer_support" / "faq.md"
+    faq.parent.mkdir(parents=True)
+    faq.write_text("## Tracking\nTracking details.", encoding="utf-8")
+    monkeypatch.setattr(warmup.settings, "response_cache_enabled", False)
+    monkeypatch.setattr(warmup, "_components", {})
+
+    client = _app()
+    assert client.get("/health/ready").status_code == 503
+
+    assert asyncio.run(warmup.warm_up()) is True
+    response = client.get("/health/ready")
+    body = response.json()
+    assert response.status_code == 200
+    assert {"embedding_model", "vector_index", "response_cache"} <= set(body["components"])
+    assert all(c["state"] == "ready" and c["load_ms"] is not None for c in body["components"].values())
+    assert rag_engine.get_kb_version()
+
+
+def test_failed_component_keeps_service_unready(monkeypatch):
+    async def broken_index():
+        raise RuntimeError("index missing")
+
+    async def noop():
+        pass
+
+    monkeypatch.setattr(warmup, "_components", {})
+    monkeypatch.setattr(warmup, "_warm_embedding_model", noop)
+    monkeypatch.setattr(warmup, "_warm_vector_index", broken_index)
+    monkeypatch.setattr(warmup, "_warm_response_cache", noop)
+
+    assert asyncio.run(warmup.warm_up()) is False
+    client = _app()
+    body = client.get("/health/ready").json()
+    index_status = body["components"]["vector_index"]
+    assert (index_status["state"], index_status["error"]) == ("failed", "index missing")
+    assert body["components"]["embedding_model"]["state"] == "ready"
+    assert client.get("/health/live").status_code == 200
+
+    response = client.post("/api/chat", json={"message": "Where is my shipment?"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+
+def test_preloaded_store_is_reused_by_workers(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    faq = data_dir / "1_customer_support" / "faq.md"
+    faq.parent.mkdir(parents=True)
+    faq.write_text("## Tracking\nTracking details.\n## Claims\nClaims details.", encoding="utf-8")
+    monkeypatch.setattr(warmup.settings, "response_cache_enabled", False)
+    monkeypatch.setattr(warmup, "_components", {})
+    monkeypatch.setattr(rag_engine, "_preloaded", False)
+    monkeypatch.setattr(rag_engine.settings, "index_mmap", True)
+    monkeypatch.setattr(warmup.gc, "freeze", lambda: None)
+    asyncio.run(rag_engine.build_vector_store(incremental=False))
+
+    # Parent process: load once before forking
+    warmup.preload_for_workers()
+    preloaded = rag_engine._snapshot
+    assert preloaded.index.ntotal == 2
+
+    # Worker: warm-up keeps the inherited snapshot instead of reloading it
+    assert asyncio.run(warmup.warm_up()) is True
+    assert rag_engine._snapshot is preloaded
+    memory = warmup.get_process_memory()
+    assert memory["pid"] > 0
+
+
+def test_mmap_falls_back_on_faiss_without_mapped_io(fake_model, kb_dirs, monkeypatch):
+    data_dir, _ = kb_dirs
+    faq = data_dir / "1_customer_support" / "faq.md"
+    faq.parent.mkdir(parents=True)
+    faq.write_text("## Tracking\nTracking details.\n## Claims\nClaims details.", encoding="utf-8")
+    monkeypatch.setattr(rag_engine.settings, "index_mmap", True)
+    asyncio.run(rag_engine.build_vector_store(incremental=False))
+
+    # FAISS < 1.11 has no IO_FLAG_MMAP_IFC
+    monkeypatch.delattr(rag_engine.faiss, "IO_FLAG_MMAP_IFC", raising=False)
+    assert rag_engine.load_vector_store() is True
+    assert rag_engine._snapshot.index.ntotal == 2
@@ -10,6 +10,7 @@ const CONFIG = {
     API_BASE_URL: 'https://dwight-the-chatbot-international-freight-fo-production.up.railway.app',
     ENDPOINTS: {
         CHAT: '/api/chat',
+        CHAT_STREAM: '/api/chat/stream',
         LEAD: '/api/lead',
         HEALTH: '/health'
     }
@@ -116,21 +117,12 @@ async function sendMessage(message) {
     showTyping();
     
     try {
-        const response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.CHAT}`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ message })
-        });
-        
-        const data = await response.json();
+        // Fall back to the plain endpoint if streaming is unavailable
+        const data = await streamChat(message) || await postChat(message);
         
         hideTyping();
         
-        if (response.ok) {
-            addMessage(data.response, 'bot');
-            
+        if (data) {
             // Store conversation
             conversationHistory.push({
                 user: message,
@@ -155,6 +147,102 @@ async function sendMessage(message) {
     }
 }
 
+/**
+ * Send a message to the streaming endpoint and render the answer as it arrives.
+ * Returns the chat result, or null if nothing was rendered (endpoint
+ * unavailable or failed before the first token); the caller then retries
+ * with the plain endpoint.
+ */
+async function streamChat(message) {
+    let response;
+    try {
+        response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.CHAT_STREAM}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({ message })
+        });
+    } catch (error) {
+        // Network, CORS or proxy error on the streaming endpoint
+        console.warn('Streaming unavailable:', error);
+        return null;
+    }
+    
+    if (!response.ok || !response.body) return null;
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let contentDiv = null;
+    
+    while (true) {
+        let chunk;
+        try {
+            chunk = await reader.read();
+        } catch (error) {
+            // Connection dropped mid-stream: keep what was shown, if anything
+            console.warn('Stream interrupted:', error);
+            break;
+        }
+        const { value, done } = chunk;
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const { event, data } = parseEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            
+            if (event === 'token') {
+                if (!contentDiv) {
+                    hideTyping();
+                    contentDiv = addMessage('', 'bot');
+                }
+                text += data.text;
+                contentDiv.innerHTML = `<p>${formatMessage(text)}</p>`;
+                scrollToBottom();
+            } else if (event === 'done') {
+                return { ...data, response: text };
+            } else if (event === 'error') {
+                return contentDiv ? { response: text } : null;
+            }
+        }
+    }
+    
+    // Stream closed or failed early: keep what was shown
+    return contentDiv ? { response: text } : null;
+}
+
+async function postChat(message) {
+    const response = await fetch(`${CONFIG.API_BASE_URL}${CONFIG.ENDPOINTS.CHAT}`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ message })
+    });
+    
+    const data = await response.json();
+    if (!response.ok) return null;
+    
+    addMessage(data.response, 'bot');
+    return data;
+}
+
+function parseEvent(block) {
+    let event = 'message';
+    let data = '';
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+    }
+    return { event, data: data ? JSON.parse(data) : {} };
+}
+
 function addMessage(content, sender) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${sender}`;
@@ -171,6 +259,8 @@ function addMessage(content, sender) {
     
     // Scroll to bottom
     scrollToBottom();
+    
+    return contentDiv;
 }
 
 function formatMessage(text) {